@@ -1,88 +1,190 @@
 """AI client for Aliyun Bailian (DashScope) API."""
 
-from openai import OpenAI
+import json
+import time
 
+import openai
+from openai import AsyncOpenAI
+
+from .json_parser import parse_json, recover_truncated_json
+from .resilience import LLMResponseError, call_stats, with_hedging, with_retries
+from .scheduler import current_priority, scheduler
+from .telemetry import record_usage
 from ..config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Lazy initialization
-_client: OpenAI | None = None
+_client: AsyncOpenAI | None = None
 
 
-def get_client() -> OpenAI:
+def get_client() -> AsyncOpenAI:
     """Get or create OpenAI-compatible client for DashScope."""
     global _client
     if _client is None:
-        _client = OpenAI(
+        _client = AsyncOpenAI(
             api_key=settings.llm_api_key,
             base_url=settings.llm_base_url,
+            max_retries=0,  # 重试由 resilience.with_retries 统一处理
         )
     return _client
 
 
+def estimate_tokens(prompt: str, system: str, max_tokens: int) -> int:
+    """粗略估算一次调用的 token 数（中文约 1 字 1 token，输出按上限的 1/4 估算）"""
+    return len(prompt) + len(system) + max_tokens // 4
+
+
+async def _complete(
+    prompt: str,
+    system: str,
+    max_tokens: int,
+    temperature: float,
+    priority: str | None,
+    response_format: dict | None = None,
+    feature: str = "other",
+):
+    """发送一次对话请求，返回完整响应（含 finish_reason、usage）
+
+    调用经过全局调度器排队；priority 为空时使用 llm_priority() 上下文中的级别。
+    429/5xx/超时自动退避重试，交互级调用可选对冲请求（见 resilience.py）。
+    成功请求的 token 用量和耗时按 feature 记录（见 telemetry.py）。
+    """
+    client = get_client()
+    priority = priority or current_priority()
+    estimate = estimate_tokens(prompt, system, max_tokens)
+
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    extra = {"response_format": response_format} if response_format else {}
+
+    async def attempt():
+        async with scheduler.slot(priority, estimate) as ticket:
+            started = time.perf_counter()
+            response = await client.chat.completions.create(
+                model=settings.chat_model,
+                max_tokens=max_tokens,
+                messages=messages,
+                temperature=temperature,
+                timeout=settings.llm_timeout,
+                **extra,
+            )
+            latency_ms = (time.perf_counter() - started) * 1000
+            ticket.record_usage(response.usage.total_tokens if response.usage else None)
+        record_usage(feature, response.usage, latency_ms)
+        return response
+
+    hedge_after = settings.llm_hedge_after if priority == "interactive" else 0
+    return await with_retries(lambda: with_hedging(attempt, hedge_after))
+
+
 async def chat(
     prompt: str,
     system: str = "",
     max_tokens: int = 4096,
     temperature: float = 0.7,
+    priority: str | None = None,
+    feature: str = "other",
 ) -> str:
     """Send a chat message to Qwen model."""
-    client = get_client()
+    response = await _complete(prompt, system, max_tokens, temperature, priority, feature=feature)
+    return response.choices[0].message.content or ""
 
-    messages = []
-    if system:
-        messages.append({"role": "system", "content": system})
-    messages.append({"role": "user", "content": prompt})
 
-    response = client.chat.completions.create(
-        model=settings.chat_model,
-        max_tokens=max_tokens,
-        messages=messages,
-        temperature=temperature,
-    )
+JSON_REPAIR_PROMPT = """下面这段内容本应是合法的 JSON，但解析失败（{error}）。
+请修复格式问题（引号、逗号、括号、转义等）后输出完整的 JSON，不要增删或改写任何内容。
+如果内容在结尾被截断，补全必要的括号使其闭合即可。
+
+{response}
+"""
 
-    return response.choices[0].message.content
+# 服务端不支持 response_format 时置为 True，之后只靠提示词约束 JSON
+_json_format_unsupported = False
+
+
+async def _complete_json(
+    prompt: str, system: str, max_tokens: int, priority: str | None, feature: str
+):
+    """请求 JSON 输出：优先使用服务端 JSON 模式，不支持时回退到纯提示词"""
+    global _json_format_unsupported
+    if not settings.llm_json_response_format or _json_format_unsupported:
+        return await _complete(prompt, system, max_tokens, 0.3, priority, feature=feature)
+
+    try:
+        return await _complete(
+            prompt, system, max_tokens, 0.3, priority,
+            response_format={"type": "json_object"}, feature=feature,
+        )
+    except openai.BadRequestError as e:
+        if "response_format" not in str(e).lower():
+            raise
+        _json_format_unsupported = True
+        logger.warning(f"Provider rejected response_format, falling back to prompt-only JSON: {e}")
+        return await _complete(prompt, system, max_tokens, 0.3, priority, feature=feature)
 
 
 async def chat_json(
     prompt: str,
     system: str = "",
     max_tokens: int = 8192,  # 增加 token 限制以支持 V2 详细输出
+    priority: str | None = None,
+    strict: bool = False,
+    feature: str = "other",
 ) -> dict:
-    """Send a chat message and parse JSON response."""
-    import json
-    import re
+    """Send a chat message and parse JSON response.
 
+    输出因 max_tokens 截断时先在本地恢复已完整生成的部分（不额外调用模型）；
+    其他解析失败时把原输出连同错误信息交给模型修复（最多 settings.llm_json_repair_attempts 次）。
+    仍然失败时：strict=True 抛出 LLMResponseError，否则返回空字典。
+    结果不能为空的调用（如章节分析）应使用 strict，避免空结果被当作成功保存。
+    """
     system_with_json = system + "\n\nRespond with valid JSON only. No markdown code blocks."
 
-    response = await chat(prompt, system_with_json, max_tokens, temperature=0.3)
-
-    # Clean up response
-    response = response.strip()
-
-    # Remove markdown code blocks
-    if response.startswith("```"):
-        lines = response.split("\n")
-        # Find closing ```
-        end_idx = len(lines) - 1
-        for i in range(len(lines) - 1, 0, -1):
-            if lines[i].strip() == "```":
-                end_idx = i
-                break
-        response = "\n".join(lines[1:end_idx])
-
-    # 尝试提取 JSON（处理可能的前后缀文本）
-    json_match = re.search(r'\{[\s\S]*\}', response)
-    if json_match:
-        response = json_match.group()
+    completion = await _complete_json(prompt, system_with_json, max_tokens, priority, feature)
+    choice = completion.choices[0]
+    response = choice.message.content or ""
 
     try:
-        return json.loads(response)
+        return parse_json(response)
     except json.JSONDecodeError as e:
+        call_stats["json_parse_failures"] += 1
+        error = f"position {e.pos}: {e.msg}"
         # 日志记录失败的响应（截断以避免日志过长）
-        from ..utils.logger import get_logger
-        logger = get_logger(__name__)
-        logger.warning(f"JSON parse error at position {e.pos}: {e.msg}")
+        logger.warning(f"JSON parse error at {error}")
         logger.debug(f"Response preview: {response[:500]}...")
 
-        # 返回空结果而非崩溃
-        return {}
+    if choice.finish_reason == "length":
+        call_stats["json_truncated"] += 1
+        partial = recover_truncated_json(response)
+        if partial is not None:
+            call_stats["json_truncated_recovered"] += 1
+            logger.warning(f"Response truncated at max_tokens={max_tokens}, recovered partial JSON")
+            return partial
+
+    for _ in range(settings.llm_json_repair_attempts):
+        completion = await _complete_json(
+            JSON_REPAIR_PROMPT.format(error=error, response=response),
+            "Respond with valid JSON only. No markdown code blocks.",
+            max_tokens,
+            priority,
+            f"{feature}_repair",
+        )
+        response = completion.choices[0].message.content or ""
+        try:
+            result = parse_json(response)
+            call_stats["json_repaired"] += 1
+            return result
+        except json.JSONDecodeError as e:
+            error = f"position {e.pos}: {e.msg}"
+            logger.warning(f"JSON repair failed at {error}")
+
+    call_stats["json_repair_failed"] += 1
+    if strict:
+        raise LLMResponseError(f"Invalid JSON response ({error})")
+
+    # 返回空结果而非崩溃
+    return {}
@@ -0,0 +1,82 @@
+"""JSON extraction from model output.
+
+- parse_json: 从第一个 "{" 开始用 raw_decode 解析一个完整对象，
+  忽略前后缀文本和 markdown 代码块，不再对整段输出做贪婪正则匹配
+- recover_truncated_json: 输出因 max_tokens 被截断时，回退到最后一个完整的元素，
+  补齐未闭合的括号，尽量保留已经生成的内容
+"""
+
+import json
+
+_decoder = json.JSONDecoder()
+
+# 截断恢复时最多尝试的截断点数（从后往前）
+MAX_RECOVERY_ATTEMPTS = 50
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def parse_json(text: str) -> dict:
+    """解析模型输出中的第一个 JSON 对象
+
+    Raises:
+        json.JSONDecodeError: 没有可解析的对象
+    """
+    start = text.find("{")
+    if start == -1:
+        raise json.JSONDecodeError("No JSON object found", text, 0)
+    result, _ = _decoder.raw_decode(text, start)
+    if not isinstance(result, dict):
+        raise json.JSONDecodeError("Top-level JSON value is not an object", text, start)
+    return result
+
+
+def recover_truncated_json(text: str) -> dict | None:
+    """从被截断的 JSON 中恢复已完整生成的部分
+
+    单次扫描记录可截断的位置（容器内逗号之前、每个容器闭合之后）及当时未闭合的括号，
+    从最后一个位置往前尝试 "截断 + 补齐括号"，返回第一个能解析的对象。
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    stack: list[str] = []
+    cuts: list[tuple[int, str]] = []  # (截断位置, 需要补齐的括号)
+    in_string = False
+    escape = False
+
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+
+        if c == '"':
+            in_string = True
+        elif c in _CLOSERS:
+            stack.append(_CLOSERS[c])
+        elif c in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                # 顶层对象已完整，无需恢复
+                return None
+            cuts.append((i + 1, "".join(reversed(stack))))
+        elif c == "," and stack:
+            cuts.append((i, "".join(reversed(stack))))
+
+    for cut, closing in reversed(cuts[-MAX_RECOVERY_ATTEMPTS:]):
+        try:
+            result = json.loads(text[start:cut] + closing)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return result
+    return None
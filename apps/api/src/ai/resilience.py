@@ -0,0 +1,114 @@
+"""Retry, backoff and hedging for model calls.
+
+- 429 / 5xx / 超时 / 连接错误：指数退避 + 随机抖动后重试，优先遵循 Retry-After
+- 每次请求单独设置超时（settings.llm_timeout）
+- 对冲请求（可选）：交互级调用超过 settings.llm_hedge_after 秒未返回时，
+  再发一个相同请求，取先返回的结果，另一个取消
+- 所有结果计入 call_stats，通过 /api/llm/metrics 查看
+
+每次尝试单独占用调度器名额，退避等待期间不占名额。
+"""
+
+import asyncio
+import random
+from collections import Counter
+from typing import Awaitable, Callable, TypeVar
+
+import openai
+
+from ..config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# 调用结果计数：succeeded/failed/retries/rate_limited/server_errors/timeouts/
+# connection_errors/hedged/hedge_wins/json_*（JSON 解析相关，由 client 记录）
+call_stats: Counter[str] = Counter()
+
+
+class LLMResponseError(Exception):
+    """模型返回内容无法使用（如 JSON 解析和修复都失败）"""
+
+
+def _error_kind(error: Exception) -> str | None:
+    """可重试错误的类型，不可重试时返回 None"""
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, openai.APITimeoutError):
+        return "timeouts"
+    if isinstance(error, openai.APIConnectionError):
+        return "connection_errors"
+    if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+        return "server_errors"
+    return None
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """退避时间：Retry-After 优先，否则指数退避 + 抖动"""
+    if isinstance(error, openai.APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), settings.llm_retry_max_delay)
+            except ValueError:
+                pass
+    delay = min(settings.llm_retry_max_delay, settings.llm_retry_base_delay * 2 ** attempt)
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def with_retries(call: Callable[[], Awaitable[T]]) -> T:
+    """执行调用，可重试错误按指数退避重试"""
+    for attempt in range(settings.llm_max_retries + 1):
+        try:
+            result = await call()
+            call_stats["succeeded"] += 1
+            return result
+        except Exception as e:
+            kind = _error_kind(e)
+            if kind:
+                call_stats[kind] += 1
+            if kind is None or attempt >= settings.llm_max_retries:
+                call_stats["failed"] += 1
+                raise
+            delay = _retry_delay(e, attempt)
+            call_stats["retries"] += 1
+            logger.warning(
+                f"LLM call failed ({kind}), retry {attempt + 1}/{settings.llm_max_retries} "
+                f"in {delay:.1f}s: {e}"
+            )
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def with_hedging(call: Callable[[], Awaitable[T]], hedge_after: float) -> T:
+    """超过 hedge_after 秒未返回时发出对冲请求，取先成功的结果"""
+    if hedge_after <= 0:
+        return await call()
+
+    first = asyncio.create_task(call())
+    pending = {first}
+    error: Exception | None = None
+    # 调用方被取消（客户端断开、取消任务）时，未完成的请求一并取消，不占用调度名额
+    try:
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        call_stats["hedged"] += 1
+        second = asyncio.create_task(call())
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        call_stats["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            if not task.done():
+                task.cancel()
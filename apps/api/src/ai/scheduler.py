@@ -0,0 +1,218 @@
+"""Central priority scheduler for LLM calls.
+
+所有 chat / chat_json 调用都经过同一个调度器，按优先级分配模型配额：
+
+- interactive: 用户正在等待的请求（RAG 问答、单章分析），默认级别
+- streaming:   人物分析等长任务（前端在看进度）
+- batch:       批量章节分析、全书人物发现等后台任务
+
+调度规则：
+1. 全局并发上限 + 每个级别的并发上限
+2. 有空闲名额时按优先级依次放行，同级别先到先得；
+   高优先级只因本级别名额用满而等待时，低优先级仍可使用空闲名额
+3. 可选的每分钟 token 预算（滑动窗口）：发出前按估算值占用，返回后用实际用量校正
+
+调用方通过 llm_priority() 上下文设置优先级，asyncio 任务会继承当前上下文。
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator
+
+from ..config import settings
+from ..utils.context import context_value
+
+PRIORITIES = ("interactive", "streaming", "batch")
+
+_current_priority: ContextVar[str] = ContextVar("llm_priority", default="interactive")
+
+# token 预算的滑动窗口长度（秒）
+WINDOW_SECONDS = 60.0
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """在上下文中设置 LLM 调用优先级"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {priority}")
+    with context_value(_current_priority, priority):
+        yield
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+@dataclass
+class _ClassStats:
+    limit: int
+    queue: deque = field(default_factory=deque)
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    tokens: int
+    enqueued_at: float
+
+
+class SlotTicket:
+    """已获得的调用名额，返回后用 record_usage 校正 token 用量"""
+
+    def __init__(self, entry: list):
+        self._entry = entry
+
+    def record_usage(self, total_tokens: int | None) -> None:
+        if total_tokens:
+            self._entry[1] = total_tokens
+
+
+class LLMScheduler:
+    """LLM 调用优先级调度器"""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        class_limits: dict[str, int],
+        tokens_per_minute: int = 0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = tokens_per_minute
+        self._classes = {
+            p: _ClassStats(limit=max(1, class_limits.get(p, self.max_concurrency)))
+            for p in PRIORITIES
+        }
+        self._running = 0
+        self._window: deque[list] = deque()  # [发出时间, token 数]
+        self._timer: asyncio.TimerHandle | None = None
+
+    @classmethod
+    def from_settings(cls) -> "LLMScheduler":
+        return cls(
+            settings.llm_max_concurrency,
+            {
+                "interactive": settings.llm_interactive_concurrency,
+                "streaming": settings.llm_streaming_concurrency,
+                "batch": settings.llm_batch_concurrency,
+            },
+            settings.llm_tokens_per_minute,
+        )
+
+    def _window_tokens(self, now: float) -> int:
+        while self._window and now - self._window[0][0] > WINDOW_SECONDS:
+            self._window.popleft()
+        return sum(tokens for _, tokens in self._window)
+
+    def _budget_allows(self, tokens: int, now: float) -> bool:
+        if self.tokens_per_minute <= 0:
+            return True
+        used = self._window_tokens(now)
+        # 窗口为空时总是放行，避免单个超大请求永远等待
+        return not self._window or used + tokens <= self.tokens_per_minute
+
+    def _dispatch(self) -> None:
+        """按优先级放行等待中的调用"""
+        now = time.monotonic()
+        for priority in PRIORITIES:
+            stats = self._classes[priority]
+            while stats.queue and self._running < self.max_concurrency and stats.running < stats.limit:
+                waiter = stats.queue[0]
+                if waiter.future.done():  # 等待期间被取消
+                    stats.queue.popleft()
+                    continue
+                if not self._budget_allows(waiter.tokens, now):
+                    self._schedule_retry(now)
+                    return
+                stats.queue.popleft()
+                entry = [now, waiter.tokens]
+                self._window.append(entry)
+                self._running += 1
+                stats.running += 1
+                wait = now - waiter.enqueued_at
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+                waiter.future.set_result(entry)
+
+    def _schedule_retry(self, now: float) -> None:
+        """token 预算用尽时，在最早的记录滑出窗口后重新调度"""
+        if self._timer is not None or not self._window:
+            return
+        delay = max(0.05, WINDOW_SECONDS - (now - self._window[0][0]))
+
+        def retry() -> None:
+            self._timer = None
+            self._dispatch()
+
+        self._timer = asyncio.get_running_loop().call_later(delay, retry)
+
+    @asynccontextmanager
+    async def slot(
+        self, priority: str | None = None, estimated_tokens: int = 0
+    ) -> AsyncIterator[SlotTicket]:
+        """等待并占用一个调用名额"""
+        priority = priority or current_priority()
+        stats = self._classes[priority]
+        waiter = _Waiter(
+            asyncio.get_running_loop().create_future(), estimated_tokens, time.monotonic()
+        )
+        stats.queue.append(waiter)
+        self._dispatch()
+
+        try:
+            entry = await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 放行与取消同时发生：归还名额
+                self._release(stats, success=False)
+            raise
+
+        success = False
+        try:
+            yield SlotTicket(entry)
+            success = True
+        finally:
+            self._release(stats, success)
+
+    def _release(self, stats: _ClassStats, success: bool) -> None:
+        self._running -= 1
+        stats.running -= 1
+        if success:
+            stats.completed += 1
+        else:
+            stats.failed += 1
+        self._dispatch()
+
+    def snapshot(self) -> dict:
+        """队列深度与调度统计"""
+        now = time.monotonic()
+        classes = {}
+        for priority, stats in self._classes.items():
+            granted = stats.completed + stats.failed + stats.running
+            classes[priority] = {
+                "limit": stats.limit,
+                "queued": sum(1 for w in stats.queue if not w.future.done()),
+                "running": stats.running,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "avg_wait_ms": round(stats.total_wait / granted * 1000, 1) if granted else 0.0,
+                "max_wait_ms": round(stats.max_wait * 1000, 1),
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self._running,
+            "tokens_per_minute": self.tokens_per_minute,
+            "tokens_last_minute": self._window_tokens(now),
+            "classes": classes,
+        }
+
+
+scheduler = LLMScheduler.from_settings()
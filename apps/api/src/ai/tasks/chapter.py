@@ -4,22 +4,25 @@ from ..client import chat_json
 from ...knowledge.models import ChapterAnalysis
 
 
-CHAPTER_ANALYSIS_PROMPT = """分析以下小说章节，提取关键信息。
+# 固定前缀（system）：角色设定 + 任务说明 + JSON 格式，每次调用逐字相同，可命中服务端前缀缓存
+CHAPTER_ANALYSIS_SYSTEM = """你是一个专业的小说分析助手。请仔细分析章节内容，提取准确的信息。
 
-章节标题：{title}
-
-章节内容：
-{content}
+分析用户给出的小说章节，提取关键信息。
 
 请以 JSON 格式返回以下信息：
-{{
+{
     "summary": "章节摘要（100-200字）",
     "characters": ["出场人物列表"],
     "events": ["关键事件列表，每个事件一句话描述"],
     "sentiment": "情感基调（如：紧张、轻松、悲伤、热血等）",
     "keywords": ["关键词列表，5-10个"]
-}}
-"""
+}"""
+
+# 可变后缀（user）：章节标题和内容
+CHAPTER_ANALYSIS_PROMPT = """章节标题：{title}
+
+章节内容：
+{content}"""
 
 
 class ChapterAnalyzer:
@@ -43,7 +46,9 @@ class ChapterAnalyzer:
 
         result = await chat_json(
             prompt,
-            system="你是一个专业的小说分析助手。请仔细分析章节内容，提取准确的信息。",
+            system=CHAPTER_ANALYSIS_SYSTEM,
+            strict=True,
+            feature="chapter",
         )
 
         return ChapterAnalysis(
@@ -1,10 +1,10 @@
 """Character on-demand analyzer."""
 
 import asyncio
-import re
 from typing import AsyncGenerator
 
 from ..client import chat_json
+from ..telemetry import UsageCollector, collect_usage, merge_usage
 from ...config import settings
 from ...knowledge.models import (
     CharacterSearchResult,
@@ -14,7 +14,14 @@ from ...knowledge.models import (
     CharacterRelation,
     CharacterTrait,
 )
-from ...core.book import Book
+from ...core.aliases import AliasRegistry
+from ...core.analysis_profile import compile_narrator_context, load_analysis_profile
+from ...core.book import Book, BookManager
+from ...core.checkpoint import AnalysisCheckpoint
+from ...core.context import extract_character_context
+from ...core.cooccurrence import compute_cooccurrence, neighbor_weights
+from ...core.mentions import MentionIndex, is_mentioned_only
+from ...core.sampling import score_chapters, sample_by_relevance
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,30 +30,200 @@ logger = get_logger(__name__)
 class CharacterOnDemandAnalyzer:
     """按需分析单个人物
 
-    重要说明：本小说《那些热血飞扬的日子》采用第一人称视角，
-    叙述者为主角"张成"。分析其他人物时需注意：
-    - 所有描写都是从张成视角观察的
-    - 其他人物的内心活动是张成的推测，非客观事实
-    - 需要区分"张成的主观印象"和"客观行为/对话"
+    prompt 中的叙述视角说明（第一人称叙述者、题材等）来自书籍分析配置，
+    见 core/analysis_profile.py；各任务说明中的"叙述者"均指该配置中的叙述者。
     """
 
-    # 第一人称视角提示词（用于所有 prompt）
-    FIRST_PERSON_CONTEXT = """
-【重要背景】
-这是一部第一人称小说，叙述者是主角"张成"。你正在分析的内容都是从张成的视角描写的。
-
-分析时请注意区分：
-1. **客观事实**：人物的对话、具体行为、外貌描写
-2. **主观推测**：张成对该人物心理、动机的猜测（如"她可能在想..."、"看起来她..."）
-3. **关系偏差**：张成与该人物的关系会影响描写的倾向性
-
-分析原则：
-- 优先采信对话和行为等客观内容
-- 对张成的主观评价持保留态度
-- 明确标注哪些是推测、哪些是事实
-- 如果张成对某人有好感/敌意，注意描写可能带有偏见
+    # ---- 各任务的固定说明（放在 system 消息中）----
+    # prompt 按 "固定前缀 + 可变后缀" 组织：角色设定、书籍背景、任务说明和 JSON 格式全部放在 system，
+    # 不含人物名等变量，同一本书同一任务的每次调用前缀逐字相同，可命中服务端的前缀缓存；
+    # 人物名、章节内容等可变部分统一放在 user 消息末尾。
+
+    APPEARANCE_TASK = """
+【任务】
+分析目标人物在给定章节中的**完整表现**，同时记录所有与其相关的人物信息。
+目标人物的姓名、其他称呼、章节标题和内容在用户消息中给出，下文的"该人物"均指目标人物。
+
+请以 JSON 格式返回：
+{
+    "events": [
+        "该人物参与的具体事件（一句话描述）",
+        "只记录客观发生的事件，不含叙述者的主观推测",
+        "最多5个，按重要性排序"
+    ],
+    "interactions": [
+        {
+            "character": "互动对象姓名（准确全名）",
+            "type": "dialogue/conflict/cooperation/support/observation",
+            "description": "具体互动内容（一句话）",
+            "sentiment": "positive/neutral/negative（这次互动的情感基调）",
+            "initiated_by": "target/other/mutual（该人物发起/对方发起/双向）"
+        }
+    ],
+    "quote": "该人物最能体现性格的一句原话（必须是该人物说的，不是叙述者的描述）",
+    "narrator_bias": "叙述者对该人物的态度倾向：positive/neutral/negative/unclear",
+    "emotional_state": "该人物在本章的主要情感状态（如：愤怒、紧张、喜悦、平静、担忧等）",
+    "chapter_significance": "本章对该人物发展的重要性：low/medium/high",
+    "mentioned_characters": ["本章中与该人物有关联的所有人物姓名（含间接提及）"],
+    "key_moment": "本章最能体现该人物的关键时刻（一句话，如无则空）"
+}
+
+**分析要点**：
+1. interactions 按重要性排序，最多记录5个核心互动
+2. type 类型说明：
+   - dialogue: 对话交流
+   - conflict: 冲突对抗
+   - cooperation: 合作配合
+   - support: 支持帮助
+   - observation: 单方面观察/关注（无直接互动）
+3. mentioned_characters 要全面，包括：被提及但未出场的、间接相关的人物
+4. 如果该人物本章只是被提及而未实际出场，events可为空，但要在key_moment说明
+5. quote 必须是原话，如果该人物本章没有台词则返回空字符串
+"""
+
+    RELATIONS_TASK = """
+【任务】
+基于用户消息中的结构化互动记录，深度分析目标人物的人物关系网络。
+
+请以 JSON 格式返回：
+{
+    "relations": [
+        {
+            "target_name": "关系对象姓名（准确全名）",
+            "relation_type": "friend/enemy/lover/family/mentor/rival/partner/complex",
+            "description": "关系本质描述（一句话），基于实际互动模式",
+            "objective_basis": "客观判断依据：具体的行为模式或对话特征",
+            "first_interaction_chapter": 首次互动的章节号,
+            "relation_evolution": "关系演变简述（如有变化，否则'稳定'）",
+            "confidence": "high/medium/low（判断可信度）"
+        }
+    ]
+}
+
+**关系类型说明**：
+- friend: 朋友，互相支持帮助
+- enemy: 敌人，明确对抗
+- lover: 恋人/暧昧对象
+- family: 家人/亲属
+- mentor: 师徒/指导关系
+- rival: 竞争对手（非敌对）
+- partner: 合作伙伴/战友
+- complex: 复杂关系，难以简单分类
+
+**分析要点**：
+1. 优先分析互动次数多的人物
+2. relation_type 基于行为模式判断，不受叙述者主观影响
+3. 关注关系是否有演变（从敌对到合作等）
+4. 如果信息不足以判断，confidence 设为 low
+5. 最多返回 8 个最重要的关系，按重要性排序
+"""
+
+    PERSONALITY_TASK = """
+【任务】
+基于用户消息中的事件、台词、情感状态等信息，深度分析目标人物的性格特点。
+
+请以 JSON 格式返回：
+{
+    "description": "人物客观简介（80-150字）。像第三人称旁白一样描述，不带叙述者的主观色彩。要包含：身份背景、主要特点、在故事中的作用",
+    "personality": [
+        "性格特点1（必须有多次行为支撑）",
+        "性格特点2",
+        "性格特点3",
+        "最多5个，按显著程度排序"
+    ],
+    "role": "protagonist/antagonist/supporting/minor",
+    "role_basis": "角色定位的判断依据（一句话）"
+}
+
+**性格分析原则**：
+1. 只采纳有**多次行为模式**支撑的性格特点
+2. 情感状态的变化规律能反映深层性格
+3. 关键时刻的选择最能体现真实性格
+4. 对话风格和用词习惯是客观证据
+5. 忽略叙述者的单次主观评价
+6. role 判断基于叙事功能，不是道德评价
+"""
+
+    DEEP_PROFILE_TASK = """
+【任务】
+基于用户消息中的基本信息、人物关系、事件轨迹等材料，对目标人物进行**终极深度分析**。
+
+请以 JSON 格式返回**完整深度分析**：
+{
+    "summary": "一句话客观概括（20-40字），像百科词条开头，不带任何情感色彩",
+    "growth_arc": "人物成长轨迹（150-300字）。分阶段描述：早期→中期→后期的变化。只描述客观行为模式的演变，不是叙述者印象的变化",
+    "core_traits": [
+        {
+            "trait": "核心性格特征",
+            "description": "该特征的具体表现（一句话）",
+            "evidence": "最有力的证据（具体章节的行为或对话原文）"
+        }
+    ],
+    "strengths": ["客观优点1（能力/品质）", "优点2", "优点3"],
+    "weaknesses": ["客观缺点1（性格缺陷/能力短板）", "缺点2"],
+    "notable_quotes": [
+        "最能代表该人物的经典语录1",
+        "语录2",
+        "语录3（必须是该人物原话，从给出的台词中选择或提炼）"
+    ],
+    "analysis_confidence": "high/medium/low",
+    "analysis_limitations": "分析局限性说明（如：样本时间跨度、叙述者与该人物的关系偏差、缺失的信息等）"
+}
+
+**终极分析原则**：
+1. summary 是最重要的输出，要像维基百科一样客观精准
+2. growth_arc 要有时间线感，描述从A到B的变化过程
+3. core_traits 最多5个，必须有明确的行为证据
+4. strengths/weaknesses 基于实际表现，不是叙述者的评价
+5. notable_quotes 必须是该人物说的话，选择最能体现性格的
+6. analysis_confidence 基于：样本量、信息客观性、覆盖全面性
+7. analysis_limitations 诚实说明分析的局限和可能偏差
 """
 
+    INCREMENTAL_PROFILE_TASK = """
+【任务】
+用户消息中给出目标人物已有的分析画像，以及新增章节的分析材料。请在已有画像的基础上**增量更新**，
+只根据新章节修正或补充，不要无依据地推翻已有结论。
+
+请以 JSON 格式返回**更新后的完整画像**：
+{
+    "description": "更新后的人物客观简介（80-150字）",
+    "personality": ["性格特点，最多5个"],
+    "role": "protagonist/antagonist/supporting/minor",
+    "summary": "一句话客观概括（20-40字）",
+    "growth_arc": "更新后的成长轨迹（150-300字），把新章节的变化接到时间线末尾",
+    "core_traits": [
+        {"trait": "核心性格特征", "description": "具体表现", "evidence": "最有力的证据"}
+    ],
+    "strengths": ["优点"],
+    "weaknesses": ["缺点"],
+    "notable_quotes": ["经典语录（必须是该人物原话）"],
+    "relations": [
+        {
+            "target_name": "关系对象姓名",
+            "relation_type": "friend/enemy/lover/family/mentor/rival/partner/complex",
+            "description": "关系本质描述",
+            "objective_basis": "客观判断依据",
+            "first_interaction_chapter": 首次互动的章节号,
+            "relation_evolution": "关系演变简述",
+            "confidence": "high/medium/low"
+        }
+    ],
+    "analysis_confidence": "high/medium/low",
+    "analysis_limitations": "分析局限性说明"
+}
+
+**增量更新原则**：
+1. relations 只返回**新出现或因新章节发生变化**的关系，未变化的关系不要返回
+2. core_traits 最多5个，其余列表字段返回完整的更新结果
+3. 新章节与已有结论冲突时，在 growth_arc 中体现变化而不是简单覆盖
+"""
+
+    def _system_prompt(self, role: str, task: str, book: Book | None = None) -> str:
+        """组装固定前缀：角色设定 + 书籍背景（叙述视角等） + 任务说明（不含人物名等变量）"""
+        profile = load_analysis_profile(book) if book else None
+        return f"{role}\n{compile_narrator_context(profile)}{task}"
+
     def _smart_sample_chapters(
         self, found_chapters: list[int], max_chapters: int
     ) -> list[int]:
@@ -83,89 +260,103 @@ class CharacterOnDemandAnalyzer:
         )
         return sampled
 
-    def search(self, book: Book, character_name: str) -> CharacterSearchResult:
-        """搜索人物出现的所有章节（纯文本搜索，快速）"""
-        pattern = re.compile(re.escape(character_name))
-
-        found_chapters = []
-        chapter_titles = []
-        total_mentions = 0
-
-        for chapter in book.chapters:
-            content = book.content[chapter.start:chapter.end + 1]
-            matches = pattern.findall(content)
-            if matches:
-                found_chapters.append(chapter.index)
-                chapter_titles.append(chapter.title)
-                total_mentions += len(matches)
-
-        return CharacterSearchResult(
-            name=character_name,
-            found_in_chapters=found_chapters,
-            chapter_titles=chapter_titles,
-            total_mentions=total_mentions,
+    def _sample_chapters(
+        self, book: Book, index: MentionIndex, max_chapters: int
+    ) -> list[int]:
+        """按配置的采样策略选择要分析的章节"""
+        found_chapters = index.chapter_indices
+        if settings.sampling_strategy != "relevance" or len(found_chapters) <= max_chapters:
+            return self._smart_sample_chapters(found_chapters, max_chapters)
+
+        # 其他主要人物（用于共现打分）
+        other_names = BookManager.get_character_names(book.id)
+        scores = score_chapters(book, index, other_names)
+        return sample_by_relevance(
+            scores, max_chapters, settings.sampling_coverage_ratio
         )
 
+    @staticmethod
+    def _find_spans(content: str, names: list[str]) -> list[tuple[int, int]]:
+        """在单个章节内查找人物名位置"""
+        spans = []
+        for name in names:
+            start = content.find(name)
+            while start != -1:
+                spans.append((start, start + len(name)))
+                start = content.find(name, start + len(name))
+        return sorted(spans)
+
+    def resolve_names(self, book: Book, character_name: str) -> tuple[str, list[str]]:
+        """解析人物规范名及其别名"""
+        registry = AliasRegistry.load(book.id)
+        canonical = registry.canonical(character_name)
+        return canonical, registry.aliases(canonical)
+
+    def build_index(
+        self, book: Book, character_name: str, aliases: list[str] | None = None
+    ) -> MentionIndex:
+        """构建人物提及索引（单次扫描全书，覆盖所有别名）"""
+        return MentionIndex.build(book, [character_name, *(aliases or [])])
+
+    def search(self, book: Book, character_name: str) -> CharacterSearchResult:
+        """搜索人物出现的所有章节（纯文本搜索，快速，含别名）"""
+        canonical, aliases = self.resolve_names(book, character_name)
+        return self.build_index(book, canonical, aliases).to_search_result(book, canonical)
+
     async def analyze_chapter_appearance(
         self,
         character_name: str,
         chapter_index: int,
         chapter_title: str,
         content: str,
+        spans: list[tuple[int, int]] | None = None,
+        aliases: list[str] | None = None,
+        book: Book | None = None,
     ) -> CharacterAppearance:
-        """分析人物在单个章节的表现（最大化信息提取）"""
-        # FIXED: 使用配置常数截断过长内容
+        """分析人物在单个章节的表现（最大化信息提取）
+
+        Args:
+            spans: 人物名在 content 中的位置（相对章节开头）；为 None 时在本章内现查
+            aliases: 人物的其他称呼，提示模型把这些称呼视为同一人
+            book: 所属书籍，用于读取分析配置（叙述视角等）
+        """
         max_len = settings.max_chapter_content_length
-        if len(content) > max_len:
+        content_label = "内容"
+        if settings.context_extraction:
+            # 只截取人物提及附近的段落，避免整章截断丢失出场内容
+            if spans is None:
+                spans = self._find_spans(content, [character_name, *(aliases or [])])
+            excerpt = extract_character_context(
+                content,
+                spans,
+                max_len,
+                window=settings.context_window_paragraphs,
+                merge_gap=settings.context_merge_gap,
+            )
+            content = excerpt.text
+            if excerpt.is_excerpt:
+                content_label = f"内容（节选：仅包含{character_name}出现的段落及其上下文，片段间以……分隔）"
+        elif len(content) > max_len:
+            # FIXED: 使用配置常数截断过长内容
             content = content[:max_len]
 
-        prompt = f"""{self.FIRST_PERSON_CONTEXT}
-
-分析人物"{character_name}"在以下章节中的**完整表现**，同时记录所有与其相关的人物信息。
+        alias_hint = ""
+        if aliases:
+            alias_hint = f"（文中也称作：{'、'.join(aliases)}，均指{character_name}）"
 
+        prompt = f"""目标人物：{character_name}{alias_hint}
 章节：{chapter_title}
-内容：
-{content}
-
-请以 JSON 格式返回：
-{{
-    "events": [
-        "该人物参与的具体事件（一句话描述）",
-        "只记录客观发生的事件，不含张成的主观推测",
-        "最多5个，按重要性排序"
-    ],
-    "interactions": [
-        {{
-            "character": "互动对象姓名（准确全名）",
-            "type": "dialogue/conflict/cooperation/support/observation",
-            "description": "具体互动内容（一句话）",
-            "sentiment": "positive/neutral/negative（这次互动的情感基调）",
-            "initiated_by": "target/other/mutual（{character_name}发起/对方发起/双向）"
-        }}
-    ],
-    "quote": "该人物最能体现性格的一句原话（必须是{character_name}说的，不是张成的描述）",
-    "narrator_bias": "张成对{character_name}的态度倾向：positive/neutral/negative/unclear",
-    "emotional_state": "{character_name}在本章的主要情感状态（如：愤怒、紧张、喜悦、平静、担忧等）",
-    "chapter_significance": "本章对{character_name}发展的重要性：low/medium/high",
-    "mentioned_characters": ["本章中与{character_name}有关联的所有人物姓名（含间接提及）"],
-    "key_moment": "本章最能体现{character_name}的关键时刻（一句话，如无则空）"
-}}
-
-**分析要点**：
-1. interactions 按重要性排序，最多记录5个核心互动
-2. type 类型说明：
-   - dialogue: 对话交流
-   - conflict: 冲突对抗
-   - cooperation: 合作配合
-   - support: 支持帮助
-   - observation: 单方面观察/关注（无直接互动）
-3. mentioned_characters 要全面，包括：被提及但未出场的、间接相关的人物
-4. 如果{character_name}本章只是被提及而未实际出场，events可为空，但要在key_moment说明
-5. quote 必须是原话，如果该人物本章没有台词则返回空字符串
-"""
+{content_label}：
+{content}"""
         result = await chat_json(
             prompt,
-            system="你是专业的小说分析师，擅长从第一人称叙述中提取客观信息。要全面、准确、结构化。"
+            system=self._system_prompt(
+                "你是专业的小说分析师，擅长从小说叙述中提取客观信息。要全面、准确、结构化。",
+                self.APPEARANCE_TASK,
+                book,
+            ),
+            strict=True,  # 解析失败时报错，不把空结果当作本章分析
+            feature="appearance",
         )
 
         # 解析 interactions
@@ -187,10 +378,11 @@ class CharacterOnDemandAnalyzer:
                     description=i,
                 ))
 
+        events = result.get("events", [])[:8]
         return CharacterAppearance(
             chapter_index=chapter_index,
             chapter_title=chapter_title,
-            events=result.get("events", [])[:8],
+            events=events,
             interactions=interactions,
             quote=result.get("quote", ""),
             narrator_bias=result.get("narrator_bias", ""),
@@ -198,14 +390,82 @@ class CharacterOnDemandAnalyzer:
             chapter_significance=result.get("chapter_significance", ""),
             mentioned_characters=result.get("mentioned_characters", []),
             key_moment=result.get("key_moment", ""),
+            is_mentioned_only=not events and not interactions,
         )
 
+    async def _analyze_appearance(
+        self,
+        book: Book,
+        index: MentionIndex,
+        character_name: str,
+        chapter_index: int,
+        skip_mentioned_only: bool,
+    ) -> tuple[CharacterAppearance, bool]:
+        """分析单章出场，返回 (appearance, 是否调用了模型)
+
+        本地判定为"仅被提及"的章节直接记录，不调用模型。
+        """
+        chapter = book.chapters[chapter_index]
+        content = book.content[chapter.start:chapter.end + 1]
+        spans = index.chapter_spans(book, chapter_index)
+
+        if skip_mentioned_only and is_mentioned_only(
+            content, spans, settings.mentioned_only_max_mentions
+        ):
+            return CharacterAppearance(
+                chapter_index=chapter_index,
+                chapter_title=chapter.title,
+                is_mentioned_only=True,
+            ), False
+
+        app = await self.analyze_chapter_appearance(
+            character_name, chapter_index, chapter.title, content, spans,
+            aliases=index.names[1:], book=book,
+        )
+        return app, True
+
+    @staticmethod
+    def _build_stats(llm_calls: int, skipped: int, previous: dict | None = None) -> dict:
+        """汇总章节分析统计（增量分析时与已有统计累加）"""
+        stats = dict(previous or {})
+        stats["chapter_llm_calls"] = stats.get("chapter_llm_calls", 0) + llm_calls
+        stats["llm_calls_avoided"] = stats.get("llm_calls_avoided", 0) + skipped
+        return stats
+
+    @staticmethod
+    def _attach_usage(stats: dict, usage: UsageCollector) -> None:
+        """把本次任务的模型用量（按功能分类的 token 数和耗时）累加进分析统计"""
+        stats["usage"] = merge_usage(stats.get("usage"), usage.to_dict())
+
+    @staticmethod
+    def _cooccurrence_weights(
+        book: Book | None, character_name: str, partners: list[str]
+    ) -> dict[str, float]:
+        """人物与各互动对象在全书中的共现权重（本地计算，按互动记录中的名字返回）"""
+        if book is None or not partners:
+            return {}
+        registry = AliasRegistry.load(book.id)
+        name = registry.canonical(character_name)
+        characters = {name: registry.surface_forms(name)}
+        for partner in partners:
+            canonical = registry.canonical(partner)
+            if canonical != name:
+                characters.setdefault(canonical, registry.surface_forms(canonical))
+
+        weights = neighbor_weights(compute_cooccurrence(book, characters), name)
+        return {p: weights.get(registry.canonical(p), 0.0) for p in partners}
+
     async def analyze_relations(
         self,
         character_name: str,
         appearances: list[CharacterAppearance],
+        book: Book | None = None,
     ) -> list[CharacterRelation]:
-        """基于所有章节分析人物关系（利用结构化互动数据）"""
+        """基于所有章节分析人物关系（利用结构化互动数据）
+
+        传入 book 时按全书共现权重排序互动对象，prompt 只展示前 15 人，
+        保证全书中与该人物关系最紧密的人物优先进入模型。
+        """
         # 汇总结构化互动信息
         interactions_by_character: dict[str, list[dict]] = {}
         for app in appearances:
@@ -225,9 +485,17 @@ class CharacterOnDemandAnalyzer:
         if not interactions_by_character:
             return []
 
+        # 排序：全书共现权重优先，其次是采样章节中的互动次数
+        weights = self._cooccurrence_weights(book, character_name, list(interactions_by_character))
+        ranked = sorted(
+            interactions_by_character.items(),
+            key=lambda item: (weights.get(item[0], 0.0), len(item[1])),
+            reverse=True,
+        )
+
         # 格式化互动汇总
         interactions_summary = []
-        for char, interactions in interactions_by_character.items():
+        for char, interactions in ranked:
             summary = f"\n【与 {char} 的互动】共 {len(interactions)} 次\n"
             for i in interactions[:15]:  # 每人最多展示15次
                 summary += f"  - 第{i['chapter']}章 [{i['type']}] {i['description']} ({i['sentiment']})\n"
@@ -235,47 +503,18 @@ class CharacterOnDemandAnalyzer:
                 summary += f"  - ... 还有 {len(interactions) - 15} 次互动\n"
             interactions_summary.append(summary)
 
-        prompt = f"""{self.FIRST_PERSON_CONTEXT}
-
-基于以下结构化互动记录，深度分析人物"{character_name}"的人物关系网络：
-
-{''.join(interactions_summary[:15])}
-
-请以 JSON 格式返回：
-{{
-    "relations": [
-        {{
-            "target_name": "关系对象姓名（准确全名）",
-            "relation_type": "friend/enemy/lover/family/mentor/rival/partner/complex",
-            "description": "关系本质描述（一句话），基于实际互动模式",
-            "objective_basis": "客观判断依据：具体的行为模式或对话特征",
-            "first_interaction_chapter": 首次互动的章节号,
-            "relation_evolution": "关系演变简述（如有变化，否则'稳定'）",
-            "confidence": "high/medium/low（判断可信度）"
-        }}
-    ]
-}}
-
-**关系类型说明**：
-- friend: 朋友，互相支持帮助
-- enemy: 敌人，明确对抗
-- lover: 恋人/暧昧对象
-- family: 家人/亲属
-- mentor: 师徒/指导关系
-- rival: 竞争对手（非敌对）
-- partner: 合作伙伴/战友
-- complex: 复杂关系，难以简单分类
+        prompt = f"""目标人物：{character_name}
 
-**分析要点**：
-1. 优先分析互动次数多的人物
-2. relation_type 基于行为模式判断，不受张成主观影响
-3. 关注关系是否有演变（从敌对到合作等）
-4. 如果信息不足以判断，confidence 设为 low
-5. 最多返回 8 个最重要的关系，按重要性排序
-"""
+## 结构化互动记录
+{''.join(interactions_summary[:15])}"""
         result = await chat_json(
             prompt,
-            system="你是专业的文学分析师，擅长从第一人称叙述中还原客观人物关系网络。"
+            system=self._system_prompt(
+                "你是专业的文学分析师，擅长从小说叙述中还原客观人物关系网络。",
+                self.RELATIONS_TASK,
+                book,
+            ),
+            feature="relations",
         )
 
         relations = []
@@ -303,6 +542,7 @@ class CharacterOnDemandAnalyzer:
         self,
         character_name: str,
         appearances: list[CharacterAppearance],
+        book: Book | None = None,
     ) -> tuple[str, list[str], str]:
         """分析人物性格，返回 (description, personality, role)"""
         # 收集丰富的分析素材
@@ -335,13 +575,11 @@ class CharacterOnDemandAnalyzer:
             from collections import Counter
             bias_counts = Counter(narrator_biases)
             total = len(narrator_biases)
-            bias_summary = f"张成态度统计: " + ", ".join(
+            bias_summary = f"叙述者态度统计: " + ", ".join(
                 f"{k}({v}/{total})" for k, v in bias_counts.most_common()
             )
 
-        prompt = f"""{self.FIRST_PERSON_CONTEXT}
-
-基于以下丰富信息，深度分析人物"{character_name}"的性格特点：
+        prompt = f"""目标人物：{character_name}
 
 ## 主要事件（客观行为）
 {chr(10).join(events_summary[:50])}
@@ -353,35 +591,18 @@ class CharacterOnDemandAnalyzer:
 {chr(10).join(emotional_states[:25]) if emotional_states else "（暂无记录）"}
 
 ## 关键时刻
-{chr(10).join(key_moments[:15]) if key_moments else "（暂无记录）"}
-
-## 叙述者偏见分析
-{bias_summary if bias_summary else "（暂无数据）"}
-
-请以 JSON 格式返回：
-{{
-    "description": "人物客观简介（80-150字）。像第三人称旁白一样描述，不带张成的主观色彩。要包含：身份背景、主要特点、在故事中的作用",
-    "personality": [
-        "性格特点1（必须有多次行为支撑）",
-        "性格特点2",
-        "性格特点3",
-        "最多5个，按显著程度排序"
-    ],
-    "role": "protagonist/antagonist/supporting/minor",
-    "role_basis": "角色定位的判断依据（一句话）"
-}}
-
-**性格分析原则**：
-1. 只采纳有**多次行为模式**支撑的性格特点
-2. 情感状态的变化规律能反映深层性格
-3. 关键时刻的选择最能体现真实性格
-4. 对话风格和用词习惯是客观证据
-5. 忽略张成的单次主观评价
-6. role 判断基于叙事功能，不是道德评价
-"""
+{chr(10).join(key_moments[:15]) if key_moments else "（暂无记录）"}"""
+        if bias_summary:
+            # 只有第一人称等有叙述者态度数据时才附带
+            prompt += f"\n\n## 叙述者偏见分析\n{bias_summary}"
         result = await chat_json(
             prompt,
-            system="你是专业的文学分析师，擅长从第一人称叙述中客观还原人物性格画像。"
+            system=self._system_prompt(
+                "你是专业的文学分析师，擅长从小说叙述中客观还原人物性格画像。",
+                self.PERSONALITY_TASK,
+                book,
+            ),
+            feature="personality",
         )
 
         return (
@@ -397,6 +618,7 @@ class CharacterOnDemandAnalyzer:
         relations: list[CharacterRelation],
         description: str,
         personality: list[str],
+        book: Book | None = None,
     ) -> dict:
         """深度分析人物，生成完整画像和分析元数据"""
         # 收集丰富素材
@@ -431,18 +653,9 @@ class CharacterOnDemandAnalyzer:
         ])
 
         # 汇总所有发现的关联人物
-        discovered_characters: set[str] = set()
-        for app in appearances:
-            for char in app.mentioned_characters:
-                if char and char != character_name:
-                    discovered_characters.add(char)
-            for interaction in app.interactions:
-                if interaction.character and interaction.character != character_name:
-                    discovered_characters.add(interaction.character)
+        discovered_characters = self._collect_discovered_characters(character_name, appearances)
 
-        prompt = f"""{self.FIRST_PERSON_CONTEXT}
-
-基于以下丰富信息，对人物"{character_name}"进行**终极深度分析**：
+        prompt = f"""目标人物：{character_name}
 
 ## 基本信息
 简介：{description}
@@ -463,42 +676,15 @@ class CharacterOnDemandAnalyzer:
 {chr(10).join(key_moments[:25]) if key_moments else '（数据不足）'}
 
 ## 代表性台词
-{chr(10).join(all_quotes[:20]) if all_quotes else '（暂无台词）'}
-
-请以 JSON 格式返回**完整深度分析**：
-{{
-    "summary": "一句话客观概括（20-40字），像百科词条开头，不带任何情感色彩",
-    "growth_arc": "人物成长轨迹（150-300字）。分阶段描述：早期→中期→后期的变化。只描述客观行为模式的演变，不是张成印象的变化",
-    "core_traits": [
-        {{
-            "trait": "核心性格特征",
-            "description": "该特征的具体表现（一句话）",
-            "evidence": "最有力的证据（具体章节的行为或对话原文）"
-        }}
-    ],
-    "strengths": ["客观优点1（能力/品质）", "优点2", "优点3"],
-    "weaknesses": ["客观缺点1（性格缺陷/能力短板）", "缺点2"],
-    "notable_quotes": [
-        "最能代表该人物的经典语录1",
-        "语录2",
-        "语录3（必须是该人物原话，从上面的台词中选择或提炼）"
-    ],
-    "analysis_confidence": "high/medium/low",
-    "analysis_limitations": "分析局限性说明（如：样本时间跨度、张成与该人物的关系偏差、缺失的信息等）"
-}}
-
-**终极分析原则**：
-1. summary 是最重要的输出，要像维基百科一样客观精准
-2. growth_arc 要有时间线感，描述从A到B的变化过程
-3. core_traits 最多5个，必须有明确的行为证据
-4. strengths/weaknesses 基于实际表现，不是张成的评价
-5. notable_quotes 必须是该人物说的话，选择最能体现性格的
-6. analysis_confidence 基于：样本量、信息客观性、覆盖全面性
-7. analysis_limitations 诚实说明分析的局限和可能偏差
-"""
+{chr(10).join(all_quotes[:20]) if all_quotes else '（暂无台词）'}"""
         result = await chat_json(
             prompt,
-            system="你是顶级的文学分析师，擅长从第一人称叙述中还原人物的客观全貌。要求精准、深刻、客观。"
+            system=self._system_prompt(
+                "你是顶级的文学分析师，擅长从小说叙述中还原人物的客观全貌。要求精准、深刻、客观。",
+                self.DEEP_PROFILE_TASK,
+                book,
+            ),
+            feature="deep_profile",
         )
 
         # 解析 core_traits
@@ -521,7 +707,155 @@ class CharacterOnDemandAnalyzer:
             # 新增：分析元数据
             "analysis_confidence": result.get("analysis_confidence", ""),
             "analysis_limitations": result.get("analysis_limitations", ""),
-            "discovered_characters": list(discovered_characters),
+            "discovered_characters": discovered_characters,
+        }
+
+    def _collect_discovered_characters(
+        self,
+        character_name: str,
+        appearances: list[CharacterAppearance],
+        initial: list[str] | None = None,
+    ) -> list[str]:
+        """从出场记录中汇总关联人物（不调用模型）"""
+        discovered: set[str] = set(initial or [])
+        for app in appearances:
+            for char in app.mentioned_characters:
+                if char and char != character_name:
+                    discovered.add(char)
+            for interaction in app.interactions:
+                if interaction.character and interaction.character != character_name:
+                    discovered.add(interaction.character)
+        return list(discovered)
+
+    async def analyze_incremental_profile(
+        self,
+        existing: DetailedCharacter,
+        new_appearances: list[CharacterAppearance],
+        book: Book | None = None,
+    ) -> dict:
+        """增量刷新总结：只把已有画像 + 新增章节喂给模型
+
+        与 analyze_relations / analyze_personality / analyze_deep_profile 三次全量调用相比，
+        输入只包含上一版总结和本次新分析的章节，token 消耗与新增章节数成正比。
+
+        Returns:
+            与 analyze_deep_profile 相同的字段，外加 description/personality/role/relations
+        """
+        character_name = existing.name
+
+        # 上一版画像（压缩为要点）
+        traits_text = "\n".join(
+            f"- {t.trait}: {t.description}" for t in existing.core_traits
+        )
+        relations_text = "\n".join(
+            f"- {r.target_name}({r.relation_type}): {r.description}"
+            + (f" [演变: {r.relation_evolution}]" if r.relation_evolution and r.relation_evolution != "稳定" else "")
+            for r in existing.relations
+        )
+
+        # 新增章节素材
+        new_material = []
+        new_interactions: dict[str, list[int]] = {}
+        for app in sorted(new_appearances, key=lambda a: a.chapter_index):
+            if app.is_mentioned_only:
+                continue
+            lines = [f"### 第{app.chapter_index + 1}章 {app.chapter_title}"]
+            for event in app.events[:4]:
+                lines.append(f"- 事件: {event}")
+            for interaction in app.interactions[:5]:
+                if interaction.character:
+                    lines.append(
+                        f"- 互动: {interaction.character} [{interaction.type}] "
+                        f"{interaction.description} ({interaction.sentiment})"
+                    )
+                    new_interactions.setdefault(interaction.character, []).append(
+                        app.chapter_index + 1
+                    )
+            if app.quote:
+                lines.append(f"- 台词: 「{app.quote}」")
+            if app.emotional_state:
+                lines.append(f"- 情感: {app.emotional_state}")
+            if app.key_moment:
+                lines.append(f"- 关键时刻: {app.key_moment}")
+            new_material.append("\n".join(lines))
+
+        prompt = f"""目标人物：{character_name}
+
+## 已有画像（基于此前 {len(existing.analyzed_chapters)} 个章节）
+简介：{existing.description or '（无）'}
+性格：{', '.join(existing.personality) or '（无）'}
+角色：{existing.role}
+一句话总结：{existing.summary or '（无）'}
+成长轨迹：{existing.growth_arc or '（无）'}
+核心特征：
+{traits_text or '（无）'}
+优点：{', '.join(existing.strengths) or '（无）'}
+缺点：{', '.join(existing.weaknesses) or '（无）'}
+经典语录：{' / '.join(existing.notable_quotes) or '（无）'}
+
+## 已有人物关系
+{relations_text or '暂无关系数据'}
+
+## 新增章节（共 {len(new_appearances)} 章）
+{chr(10).join(new_material)}"""
+        result = await chat_json(
+            prompt,
+            system=self._system_prompt(
+                "你是顶级的文学分析师，擅长在已有人物画像上根据新材料做精准的增量修订。",
+                self.INCREMENTAL_PROFILE_TASK,
+                book,
+            ),
+            feature="incremental_profile",
+        )
+
+        # 合并关系：模型返回的覆盖同名旧关系，其余保留
+        relations_by_target = {r.target_name: r for r in existing.relations}
+        for r in result.get("relations", [])[:20]:
+            if not isinstance(r, dict) or not r.get("target_name"):
+                continue
+            target = r["target_name"]
+            previous = relations_by_target.get(target)
+            evidence = list(previous.evidence_chapters) if previous else []
+            evidence += [c for c in new_interactions.get(target, []) if c not in evidence]
+            update = {
+                "relation_type": r.get("relation_type", "unknown"),
+                "description": r.get("description", ""),
+                "evidence_chapters": evidence[:20],
+                "objective_basis": r.get("objective_basis", ""),
+                "first_interaction_chapter": r.get("first_interaction_chapter", -1),
+                "relation_evolution": r.get("relation_evolution", ""),
+                "confidence": r.get("confidence", "medium"),
+            }
+            if previous:
+                relations_by_target[target] = previous.model_copy(update=update)
+            else:
+                relations_by_target[target] = CharacterRelation(target_name=target, **update)
+
+        core_traits = []
+        for t in result.get("core_traits", [])[:15]:
+            if isinstance(t, dict):
+                core_traits.append(CharacterTrait(
+                    trait=t.get("trait", ""),
+                    description=t.get("description", ""),
+                    evidence=t.get("evidence", ""),
+                ))
+
+        return {
+            "description": result.get("description") or existing.description,
+            "personality": result.get("personality", [])[:5] or existing.personality,
+            "role": result.get("role") or existing.role,
+            "relations": list(relations_by_target.values()),
+            "summary": result.get("summary") or existing.summary,
+            "growth_arc": result.get("growth_arc") or existing.growth_arc,
+            "core_traits": core_traits or existing.core_traits,
+            "strengths": result.get("strengths", [])[:8] or existing.strengths,
+            "weaknesses": result.get("weaknesses", [])[:8] or existing.weaknesses,
+            "notable_quotes": result.get("notable_quotes", [])[:15] or existing.notable_quotes,
+            "analysis_confidence": result.get("analysis_confidence") or existing.analysis_confidence,
+            "analysis_limitations": result.get("analysis_limitations") or existing.analysis_limitations,
+            "discovered_characters": self._collect_discovered_characters(
+                character_name, new_appearances, existing.discovered_characters
+            ),
         }
 
     async def analyze_full(
@@ -529,32 +863,52 @@ class CharacterOnDemandAnalyzer:
         book: Book,
         character_name: str,
         max_chapters: int = 100,
+        skip_mentioned_only: bool | None = None,
+    ) -> DetailedCharacter:
+        """完整分析流程（统计本次模型调用用量，写入 analysis_stats["usage"]）"""
+        with collect_usage(f"character/{book.id}/{character_name}") as usage:
+            result = await self._analyze_full(book, character_name, max_chapters, skip_mentioned_only)
+        if result.analysis_stats:
+            self._attach_usage(result.analysis_stats, usage)
+        return result
+
+    async def _analyze_full(
+        self,
+        book: Book,
+        character_name: str,
+        max_chapters: int = 100,
+        skip_mentioned_only: bool | None = None,
     ) -> DetailedCharacter:
-        """完整分析流程"""
-        # 1. 搜索
-        search_result = self.search(book, character_name)
+        """完整分析流程
+
+        Args:
+            skip_mentioned_only: 仅被提及的章节是否跳过模型调用（None 使用配置默认值）
+        """
+        if skip_mentioned_only is None:
+            skip_mentioned_only = settings.skip_mentioned_only
+        # 1. 搜索（按规范名 + 全部别名一次扫描）
+        character_name, aliases = self.resolve_names(book, character_name)
+        index = self.build_index(book, character_name, aliases)
+        search_result = index.to_search_result(book, character_name)
 
         if not search_result.found_in_chapters:
             return DetailedCharacter(
                 name=character_name,
+                aliases=aliases,
                 analysis_status="completed",
                 error_message="未找到该人物",
             )
 
-        # 2. 智能采样分析章节（覆盖全书范围）
-        chapters_to_analyze = self._smart_sample_chapters(
-            search_result.found_in_chapters, max_chapters
-        )
+        # 2. 按相关度采样分析章节（覆盖全书范围）
+        chapters_to_analyze = self._sample_chapters(book, index, max_chapters)
 
         # 3. FIXED: 并行分析每个章节，使用信号量控制并发数
         semaphore = asyncio.Semaphore(settings.analysis_concurrency)
 
-        async def analyze_with_limit(idx: int) -> CharacterAppearance:
+        async def analyze_with_limit(idx: int) -> tuple[CharacterAppearance, bool]:
             async with semaphore:
-                chapter = book.chapters[idx]
-                content = book.content[chapter.start:chapter.end + 1]
-                return await self.analyze_chapter_appearance(
-                    character_name, idx, chapter.title, content
+                return await self._analyze_appearance(
+                    book, index, character_name, idx, skip_mentioned_only
                 )
 
         logger.info(f"Starting parallel analysis for {len(chapters_to_analyze)} chapters")
@@ -563,29 +917,37 @@ class CharacterOnDemandAnalyzer:
 
         # 过滤成功的结果
         appearances = []
+        llm_calls = 0
         for idx, result in zip(chapters_to_analyze, results):
             if isinstance(result, Exception):
                 logger.warning(f"Failed to analyze chapter {idx}: {result}")
             else:
-                appearances.append(result)
+                app, used_llm = result
+                appearances.append(app)
+                llm_calls += used_llm
+        skipped = len(appearances) - llm_calls
 
-        logger.info(f"Completed analysis: {len(appearances)}/{len(chapters_to_analyze)} chapters")
+        logger.info(
+            f"Completed analysis: {len(appearances)}/{len(chapters_to_analyze)} chapters "
+            f"({skipped} mentioned-only, LLM skipped)"
+        )
 
         # 4. 分析关系
-        relations = await self.analyze_relations(character_name, appearances)
+        relations = await self.analyze_relations(character_name, appearances, book)
 
         # 5. 分析性格
         description, personality, role = await self.analyze_personality(
-            character_name, appearances
+            character_name, appearances, book
         )
 
         # 6. 深度分析
         deep_profile = await self.analyze_deep_profile(
-            character_name, appearances, relations, description, personality
+            character_name, appearances, relations, description, personality, book
         )
 
         return DetailedCharacter(
             name=character_name,
+            aliases=aliases,
             description=description,
             role=role,
             personality=personality,
@@ -609,6 +971,7 @@ class CharacterOnDemandAnalyzer:
             analysis_confidence=deep_profile.get("analysis_confidence", ""),
             analysis_limitations=deep_profile.get("analysis_limitations", ""),
             discovered_characters=deep_profile.get("discovered_characters", []),
+            analysis_stats=self._build_stats(llm_calls, skipped),
         )
 
     async def analyze_stream(
@@ -616,10 +979,40 @@ class CharacterOnDemandAnalyzer:
         book: Book,
         character_name: str,
         max_chapters: int = 100,
+        skip_mentioned_only: bool | None = None,
+        checkpoint: dict | None = None,
+    ) -> AsyncGenerator[dict, None]:
+        """流式分析（统计本次模型调用用量，写入 completed 事件的 analysis_stats["usage"]）"""
+        with collect_usage(f"character/{book.id}/{character_name}") as usage:
+            async for event in self._analyze_stream(
+                book, character_name, max_chapters, skip_mentioned_only, checkpoint
+            ):
+                if event["event"] == "completed" and "analysis_stats" in event["data"]:
+                    self._attach_usage(event["data"]["analysis_stats"], usage)
+                yield event
+
+    async def _analyze_stream(
+        self,
+        book: Book,
+        character_name: str,
+        max_chapters: int = 100,
+        skip_mentioned_only: bool | None = None,
+        checkpoint: dict | None = None,
     ) -> AsyncGenerator[dict, None]:
-        """流式分析，逐步产出结果"""
-        # 1. 搜索
-        search_result = self.search(book, character_name)
+        """流式分析，逐步产出结果
+
+        Args:
+            skip_mentioned_only: 仅被提及的章节是否跳过模型调用（None 使用配置默认值）
+            checkpoint: 上次中断时的断点（见 core/checkpoint.py），沿用其章节计划，
+                跳过已完成的章节
+        """
+        if skip_mentioned_only is None:
+            skip_mentioned_only = settings.skip_mentioned_only
+
+        # 1. 搜索（按规范名 + 全部别名一次扫描）
+        character_name, aliases = self.resolve_names(book, character_name)
+        index = self.build_index(book, character_name, aliases)
+        search_result = index.to_search_result(book, character_name)
         yield {
             "event": "search_complete",
             "data": search_result.model_dump(),
@@ -632,22 +1025,34 @@ class CharacterOnDemandAnalyzer:
             }
             return
 
-        # 2. 智能采样章节
-        chapters = self._smart_sample_chapters(
-            search_result.found_in_chapters, max_chapters
-        )
-        appearances = []
+        # 2. 按相关度采样章节（从断点恢复时沿用原计划）
+        if checkpoint:
+            chapters = checkpoint["chapters"]
+            appearances, llm_calls = AnalysisCheckpoint.restore(checkpoint)
+        else:
+            chapters = self._sample_chapters(book, index, max_chapters)
+            appearances, llm_calls = [], 0
+        done = {a.chapter_index for a in appearances}
+
+        yield {"event": "sample_info", "data": {"sample_chapters": chapters}}
+        if done:
+            yield {
+                "event": "resume_info",
+                "data": {"completed": len(done), "remaining": len(chapters) - len(done)},
+            }
 
         # 3. 逐章分析
         for idx in chapters:
+            if idx in done:
+                continue
             chapter = book.chapters[idx]
-            content = book.content[chapter.start:chapter.end + 1]
 
             try:
-                app = await self.analyze_chapter_appearance(
-                    character_name, idx, chapter.title, content
+                app, used_llm = await self._analyze_appearance(
+                    book, index, character_name, idx, skip_mentioned_only
                 )
                 appearances.append(app)
+                llm_calls += used_llm
 
                 yield {
                     "event": "chapter_analyzed",
@@ -655,6 +1060,8 @@ class CharacterOnDemandAnalyzer:
                         "chapter_index": idx,
                         "chapter_title": chapter.title,
                         "appearance": app.model_dump(),
+                        "llm_skipped": not used_llm,
+                        "chapters_to_analyze": len(chapters),
                     },
                 }
             except Exception as e:
@@ -667,7 +1074,7 @@ class CharacterOnDemandAnalyzer:
                 }
 
         # 4. 分析关系
-        relations = await self.analyze_relations(character_name, appearances)
+        relations = await self.analyze_relations(character_name, appearances, book)
         yield {
             "event": "relations_analyzed",
             "data": {"relations": [r.model_dump() for r in relations]},
@@ -675,7 +1082,7 @@ class CharacterOnDemandAnalyzer:
 
         # 5. 分析性格
         description, personality, role = await self.analyze_personality(
-            character_name, appearances
+            character_name, appearances, book
         )
         yield {
             "event": "personality_analyzed",
@@ -684,7 +1091,7 @@ class CharacterOnDemandAnalyzer:
 
         # 6. 深度分析
         deep_profile = await self.analyze_deep_profile(
-            character_name, appearances, relations, description, personality
+            character_name, appearances, relations, description, personality, book
         )
         yield {
             "event": "deep_profile_analyzed",
@@ -703,6 +1110,7 @@ class CharacterOnDemandAnalyzer:
         # 7. 返回完整结果
         result = DetailedCharacter(
             name=character_name,
+            aliases=aliases,
             description=description,
             role=role,
             personality=personality,
@@ -726,6 +1134,7 @@ class CharacterOnDemandAnalyzer:
             analysis_confidence=deep_profile.get("analysis_confidence", ""),
             analysis_limitations=deep_profile.get("analysis_limitations", ""),
             discovered_characters=deep_profile.get("discovered_characters", []),
+            analysis_stats=self._build_stats(llm_calls, len(appearances) - llm_calls),
         )
 
         yield {"event": "completed", "data": result.model_dump()}
@@ -736,19 +1145,54 @@ class CharacterOnDemandAnalyzer:
         existing: DetailedCharacter,
         additional_chapters: int = 30,
         refresh_summary: bool = False,
+        full_rebuild: bool = False,
+        skip_mentioned_only: bool | None = None,
+        checkpoint: dict | None = None,
+    ) -> AsyncGenerator[dict, None]:
+        """继续分析（本次模型调用用量累加到已有的 analysis_stats["usage"]）"""
+        with collect_usage(f"character/{book.id}/{existing.name}") as usage:
+            async for event in self._analyze_continue(
+                book, existing, additional_chapters, refresh_summary, full_rebuild,
+                skip_mentioned_only, checkpoint,
+            ):
+                if event["event"] == "completed" and "analysis_stats" in event["data"]:
+                    self._attach_usage(event["data"]["analysis_stats"], usage)
+                yield event
+
+    async def _analyze_continue(
+        self,
+        book: Book,
+        existing: DetailedCharacter,
+        additional_chapters: int = 30,
+        refresh_summary: bool = False,
+        full_rebuild: bool = False,
+        skip_mentioned_only: bool | None = None,
+        checkpoint: dict | None = None,
     ) -> AsyncGenerator[dict, None]:
         """继续分析更多章节，基于已有分析结果
 
+        刷新总结默认走增量模式（只把已有画像 + 新章节交给模型），以下情况改为全量重建：
+        显式指定 full_rebuild、已有画像没有总结、没有新增章节（仅刷新总结），
+        或连续增量刷新次数达到 settings.summary_full_rebuild_interval。
+
         Args:
             book: 书籍对象
             existing: 已有的分析结果
             additional_chapters: 要继续分析的章节数
             refresh_summary: 是否刷新总结字段（relations, personality, deep_profile）
+            full_rebuild: 刷新总结时强制基于全部章节重建
+            skip_mentioned_only: 仅被提及的章节是否跳过模型调用（None 使用配置默认值）
+            checkpoint: 上次中断时的断点，沿用其章节计划，跳过已完成的章节
         """
+        if skip_mentioned_only is None:
+            skip_mentioned_only = settings.skip_mentioned_only
         character_name = existing.name
+        _, registered = self.resolve_names(book, character_name)
+        aliases = list(dict.fromkeys([*existing.aliases, *registered]))
 
-        # 1. 重新搜索获取完整章节列表
-        search_result = self.search(book, character_name)
+        # 1. 重新搜索获取完整章节列表（含别名）
+        index = self.build_index(book, character_name, aliases)
+        search_result = index.to_search_result(book, character_name)
         yield {
             "event": "search_complete",
             "data": search_result.model_dump(),
@@ -770,8 +1214,15 @@ class CharacterOnDemandAnalyzer:
             yield {"event": "completed", "data": existing.model_dump()}
             return
 
-        # 3. 取要分析的章节
-        chapters_to_analyze = remaining[:additional_chapters]
+        # 3. 取要分析的章节（从断点恢复时沿用原计划）
+        if checkpoint:
+            chapters_to_analyze = checkpoint["chapters"]
+            new_appearances, llm_calls = AnalysisCheckpoint.restore(checkpoint)
+        else:
+            chapters_to_analyze = remaining[:additional_chapters]
+            new_appearances, llm_calls = [], 0
+        done = {a.chapter_index for a in new_appearances}
+
         yield {
             "event": "continue_info",
             "data": {
@@ -779,22 +1230,31 @@ class CharacterOnDemandAnalyzer:
                 "remaining": len(remaining),
                 "will_analyze": len(chapters_to_analyze),
                 "refresh_summary": refresh_summary,
+                "chapters": chapters_to_analyze,
             },
         }
+        if done:
+            yield {
+                "event": "resume_info",
+                "data": {"completed": len(done), "remaining": len(chapters_to_analyze) - len(done)},
+            }
 
         # 4. 复制已有的出现信息
-        appearances = list(existing.appearances)
+        appearances = list(existing.appearances) + new_appearances
 
         # 5. 逐章分析新章节
         for idx in chapters_to_analyze:
+            if idx in done:
+                continue
             chapter = book.chapters[idx]
-            content = book.content[chapter.start:chapter.end + 1]
 
             try:
-                app = await self.analyze_chapter_appearance(
-                    character_name, idx, chapter.title, content
+                app, used_llm = await self._analyze_appearance(
+                    book, index, character_name, idx, skip_mentioned_only
                 )
                 appearances.append(app)
+                new_appearances.append(app)
+                llm_calls += used_llm
 
                 yield {
                     "event": "chapter_analyzed",
@@ -802,6 +1262,7 @@ class CharacterOnDemandAnalyzer:
                         "chapter_index": idx,
                         "chapter_title": chapter.title,
                         "appearance": app.model_dump(),
+                        "llm_skipped": not used_llm,
                         "chapters_to_analyze": len(chapters_to_analyze),
                     },
                 }
@@ -815,10 +1276,51 @@ class CharacterOnDemandAnalyzer:
         successfully_analyzed = [a.chapter_index for a in appearances]
         all_analyzed = sorted(set(existing.analyzed_chapters) | set(successfully_analyzed))
 
+        stats = self._build_stats(
+            llm_calls, len(new_appearances) - llm_calls, existing.analysis_stats
+        )
+
         # 7. 根据 refresh_summary 决定是否重新分析总结字段
+        incremental = (
+            refresh_summary
+            and not full_rebuild
+            and bool(existing.summary)
+            and any(not a.is_mentioned_only for a in new_appearances)
+            and existing.incremental_refreshes < settings.summary_full_rebuild_interval
+        )
+
         if refresh_summary:
-            # 重新分析关系
-            relations = await self.analyze_relations(character_name, appearances)
+            yield {
+                "event": "refresh_info",
+                "data": {
+                    "mode": "incremental" if incremental else "full",
+                    "new_appearances": len(new_appearances),
+                    "incremental_refreshes": existing.incremental_refreshes,
+                },
+            }
+
+        if incremental:
+            # 增量刷新：一次调用，输入为已有画像 + 新章节
+            profile = await self.analyze_incremental_profile(existing, new_appearances, book)
+            relations = profile["relations"]
+            description = profile["description"]
+            personality = profile["personality"]
+            role = profile["role"]
+            deep_profile = profile
+            incremental_refreshes = existing.incremental_refreshes + 1
+
+            # 保持与全量模式一致的事件序列
+            yield {
+                "event": "relations_analyzed",
+                "data": {"relations": [r.model_dump() for r in relations]},
+            }
+            yield {
+                "event": "personality_analyzed",
+                "data": {"description": description, "personality": personality, "role": role},
+            }
+        elif refresh_summary:
+            # 全量重建：重新分析关系
+            relations = await self.analyze_relations(character_name, appearances, book)
             yield {
                 "event": "relations_analyzed",
                 "data": {"relations": [r.model_dump() for r in relations]},
@@ -826,7 +1328,7 @@ class CharacterOnDemandAnalyzer:
 
             # 重新分析性格
             description, personality, role = await self.analyze_personality(
-                character_name, appearances
+                character_name, appearances, book
             )
             yield {
                 "event": "personality_analyzed",
@@ -835,8 +1337,11 @@ class CharacterOnDemandAnalyzer:
 
             # 深度分析
             deep_profile = await self.analyze_deep_profile(
-                character_name, appearances, relations, description, personality
+                character_name, appearances, relations, description, personality, book
             )
+            incremental_refreshes = 0
+
+        if refresh_summary:
             yield {
                 "event": "deep_profile_analyzed",
                 "data": {
@@ -854,7 +1359,7 @@ class CharacterOnDemandAnalyzer:
             # 返回完整更新的结果
             result = DetailedCharacter(
                 name=character_name,
-                aliases=existing.aliases,
+                aliases=aliases,
                 description=description,
                 role=role,
                 personality=personality,
@@ -872,10 +1377,12 @@ class CharacterOnDemandAnalyzer:
                 relations=relations,
                 analysis_status="completed",
                 analyzed_chapters=all_analyzed,
+                incremental_refreshes=incremental_refreshes,
                 # 新增：分析元数据
                 analysis_confidence=deep_profile.get("analysis_confidence", ""),
                 analysis_limitations=deep_profile.get("analysis_limitations", ""),
                 discovered_characters=deep_profile.get("discovered_characters", []),
+                analysis_stats=stats,
             )
         else:
             # 保留原有总结字段，只更新 appearances 和 analyzed_chapters
@@ -885,18 +1392,13 @@ class CharacterOnDemandAnalyzer:
             }
 
             # 即使不刷新总结，也要从新 appearances 中收集 discovered_characters
-            discovered_characters: set[str] = set(existing.discovered_characters)
-            for app in appearances:
-                for char in app.mentioned_characters:
-                    if char and char != character_name:
-                        discovered_characters.add(char)
-                for interaction in app.interactions:
-                    if interaction.character and interaction.character != character_name:
-                        discovered_characters.add(interaction.character)
+            discovered_characters = self._collect_discovered_characters(
+                character_name, new_appearances, existing.discovered_characters
+            )
 
             result = DetailedCharacter(
                 name=character_name,
-                aliases=existing.aliases,
+                aliases=aliases,
                 description=existing.description,
                 role=existing.role,
                 personality=existing.personality,
@@ -914,10 +1416,12 @@ class CharacterOnDemandAnalyzer:
                 relations=existing.relations,
                 analysis_status="completed",
                 analyzed_chapters=all_analyzed,
+                incremental_refreshes=existing.incremental_refreshes,
                 # 保留/更新元数据
                 analysis_confidence=existing.analysis_confidence,
                 analysis_limitations=existing.analysis_limitations,
-                discovered_characters=list(discovered_characters),
+                discovered_characters=discovered_characters,
+                analysis_stats=stats,
             )
 
         yield {"event": "completed", "data": result.model_dump()}
@@ -0,0 +1,184 @@
+"""Whole-book character discovery."""
+
+import asyncio
+
+from ..client import chat_json
+from ...config import settings
+from ...core.book import Book
+from ...core.discovery import CharacterCandidate, extract_candidates
+from ...knowledge.models import CastMember
+from ...utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 每个候选提供给模型的原文片段数和片段半径
+SNIPPETS_PER_CANDIDATE = 2
+SNIPPET_RADIUS = 20
+
+
+def _is_true(value) -> bool:
+    """模型返回的布尔字段（可能是字符串 "true"/"false"，"false" 不能当作真值）"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "yes", "是")
+    return value is True
+
+
+class CharacterDiscovery:
+    """全书人物发现
+
+    先在本地扫描全书得到候选（秒级，不调用模型），
+    再可选地把高分候选分批交给模型确认：剔除非人名、合并别名、粗判角色。
+    模型调用次数 = 候选数 / 批大小，与章节数无关。
+    """
+
+    def _snippets(self, book: Book, name: str) -> list[str]:
+        """候选名在原文中的前几处上下文"""
+        snippets = []
+        start = book.content.find(name)
+        while start != -1 and len(snippets) < SNIPPETS_PER_CANDIDATE:
+            lo = max(0, start - SNIPPET_RADIUS)
+            hi = start + len(name) + SNIPPET_RADIUS
+            snippets.append(book.content[lo:hi].replace("\n", " "))
+            # 跳过附近的重复出现，尽量取不同位置
+            start = book.content.find(name, hi + 1000)
+        return snippets
+
+    async def _confirm_batch(
+        self, book: Book, batch: list[CharacterCandidate]
+    ) -> dict[str, dict]:
+        """让模型确认一批候选，返回 {候选名: 判定结果}"""
+        lines = []
+        for c in batch:
+            context = " | ".join(self._snippets(book, c.name))
+            lines.append(f"- {c.name}（提及 {c.mentions} 次，{c.chapters} 章）：{context}")
+
+        prompt = f"""以下是从小说《{book.title}》全文中按词频自动抽取的人物候选，每个附有原文片段。
+
+{chr(10).join(lines)}
+
+请逐个判断候选是否为小说中的人物（人名、昵称、外号都算），并以 JSON 格式返回：
+{{
+    "candidates": [
+        {{
+            "name": "候选名（与上面完全一致）",
+            "is_character": true,
+            "canonical": "如果该候选是列表中另一个人物的别名，填那个人物的名字；否则填自身",
+            "role": "protagonist/antagonist/supporting/minor",
+            "description": "一句话身份简介（不是人物则为空）"
+        }}
+    ]
+}}
+
+**判断要点**：
+1. 普通词语、地名、组织名、被截断的名字片段都不是人物
+2. 只根据片段判断，无法确定时 is_character 为 false
+"""
+        result = await chat_json(
+            prompt,
+            system="你是专业的小说分析助手，擅长识别人物姓名及其别称。",
+            feature="discovery",
+        )
+
+        verdicts = {}
+        for item in result.get("candidates", []):
+            if isinstance(item, dict) and item.get("name"):
+                verdicts[item["name"]] = item
+        return verdicts
+
+    async def discover(
+        self,
+        book: Book,
+        top_n: int = 100,
+        confirm: bool = True,
+    ) -> list[CastMember]:
+        """发现全书人物，返回按分数排序的人物表"""
+        candidates = extract_candidates(
+            book, top_n=top_n, min_mentions=settings.discovery_min_mentions
+        )
+        total = len(book.chapters)
+        logger.info(f"Discovery: {len(candidates)} local candidates in {book.id}")
+
+        cast = {
+            c.name: CastMember(
+                name=c.name,
+                mentions=c.mentions,
+                chapter_count=c.chapters,
+                first_chapter=c.first_chapter,
+                dialogue_mentions=c.dialogue_mentions,
+                score=round(c.score(total), 4),
+            )
+            for c in candidates
+        }
+        if not confirm or not candidates:
+            return list(cast.values())
+
+        # 分批并发确认
+        size = max(1, settings.discovery_batch_size)
+        batches = [candidates[i:i + size] for i in range(0, len(candidates), size)]
+        semaphore = asyncio.Semaphore(settings.analysis_concurrency)
+
+        async def confirm_with_limit(batch: list[CharacterCandidate]) -> dict[str, dict]:
+            async with semaphore:
+                return await self._confirm_batch(book, batch)
+
+        results = await asyncio.gather(
+            *(confirm_with_limit(b) for b in batches), return_exceptions=True
+        )
+
+        verdicts: dict[str, dict] = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Discovery confirmation failed for {len(batch)} candidates: {result}")
+                continue
+            verdicts.update(result)
+
+        # 应用判定：标记确认结果，别名并入规范名
+        for name, verdict in verdicts.items():
+            member = cast.get(name)
+            if member is None:
+                continue
+            member.confirmed = _is_true(verdict.get("is_character"))
+            member.role = verdict.get("role") or member.role
+            member.description = verdict.get("description", "")
+
+        merged = set()
+        for name, verdict in verdicts.items():
+            canonical = verdict.get("canonical")
+            member = cast.get(name)
+            if (
+                member is None or not member.confirmed
+                or not canonical or canonical == name or canonical not in cast
+            ):
+                continue
+            target = cast[canonical]
+            target.aliases = list(dict.fromkeys([*target.aliases, name, *member.aliases]))
+            target.mentions += member.mentions
+            target.dialogue_mentions += member.dialogue_mentions
+            target.chapter_count = max(target.chapter_count, member.chapter_count)
+            target.first_chapter = min(target.first_chapter, member.first_chapter)
+            merged.add(canonical)
+            del cast[name]
+
+        # 分数按合并后的提及次数重新计算
+        for name in merged:
+            member = cast.get(name)
+            if member is None:
+                continue  # 规范名本身又被并入了其他人物
+            member.score = round(CharacterCandidate(
+                name=name,
+                mentions=member.mentions,
+                chapters=member.chapter_count,
+                first_chapter=member.first_chapter,
+                dialogue_mentions=member.dialogue_mentions,
+            ).score(total), 4)
+
+        ranked = sorted(
+            (m for m in cast.values() if m.confirmed is not False),
+            key=lambda m: m.score,
+            reverse=True,
+        )
+        logger.info(
+            f"Discovery: {len(ranked)} confirmed characters "
+            f"({len(batches)} LLM calls for {len(candidates)} candidates)"
+        )
+        return ranked
@@ -0,0 +1,121 @@
+"""Token and latency telemetry for model calls.
+
+每次模型调用记录 prompt/completion/cached token 数和耗时，按功能（feature）分类：
+chapter / appearance / relations / personality / deep_profile / incremental_profile /
+discovery / rag 等。
+
+统计同时累加到：
+1. 进程级总计（/api/llm/usage）
+2. 当前上下文中的所有 UsageCollector（collect_usage() 开启，可嵌套），
+   用于单次任务（如一次人物分析）的成本统计，结果写入 DetailedCharacter.analysis_stats
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from ..utils.context import context_value
+
+# 保留最近多少个任务的统计
+MAX_RECENT_JOBS = 100
+
+
+@dataclass
+class FeatureUsage:
+    """单个功能的累计用量"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+    def add(self, prompt: int, completion: int, cached: int, latency_ms: float) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.cached_tokens += cached
+        self.latency_ms += latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "latency_ms": round(self.latency_ms, 1),
+            "avg_latency_ms": round(self.latency_ms / self.calls, 1) if self.calls else 0.0,
+            "max_latency_ms": round(self.max_latency_ms, 1),
+        }
+
+
+@dataclass
+class UsageCollector:
+    """按功能汇总的用量"""
+    job_id: str | None = None
+    features: dict[str, FeatureUsage] = field(default_factory=dict)
+
+    def add(self, feature: str, prompt: int, completion: int, cached: int, latency_ms: float) -> None:
+        self.features.setdefault(feature, FeatureUsage()).add(prompt, completion, cached, latency_ms)
+
+    def to_dict(self) -> dict:
+        features = {name: usage.to_dict() for name, usage in sorted(self.features.items())}
+        total = FeatureUsage()
+        for usage in self.features.values():
+            total.calls += usage.calls
+            total.prompt_tokens += usage.prompt_tokens
+            total.completion_tokens += usage.completion_tokens
+            total.cached_tokens += usage.cached_tokens
+            total.latency_ms += usage.latency_ms
+            total.max_latency_ms = max(total.max_latency_ms, usage.max_latency_ms)
+        return {"total": total.to_dict(), "features": features}
+
+
+totals = UsageCollector()
+recent_jobs: OrderedDict[str, UsageCollector] = OrderedDict()
+
+_collectors: ContextVar[tuple[UsageCollector, ...]] = ContextVar("llm_usage_collectors", default=())
+
+
+@contextmanager
+def collect_usage(job_id: str | None = None) -> Iterator[UsageCollector]:
+    """在上下文中收集模型调用用量；指定 job_id 时可通过 API 查询"""
+    collector = UsageCollector(job_id)
+    if job_id:
+        recent_jobs.pop(job_id, None)
+        recent_jobs[job_id] = collector
+        while len(recent_jobs) > MAX_RECENT_JOBS:
+            recent_jobs.popitem(last=False)
+
+    with context_value(_collectors, (*_collectors.get(), collector)):
+        yield collector
+
+
+def record_usage(feature: str, usage, latency_ms: float) -> None:
+    """记录一次调用（usage 为 OpenAI 兼容响应中的 usage 对象，可能为空）"""
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    completion = getattr(usage, "completion_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) or 0
+
+    totals.add(feature, prompt, completion, cached, latency_ms)
+    for collector in _collectors.get():
+        collector.add(feature, prompt, completion, cached, latency_ms)
+
+
+def merge_usage(previous: dict | None, current: dict) -> dict:
+    """合并两次任务的 to_dict() 结果（继续分析时累加到已有统计）"""
+    merged = UsageCollector()
+    for source in (previous or {}, current):
+        for name, data in source.get("features", {}).items():
+            usage = merged.features.setdefault(name, FeatureUsage())
+            usage.calls += data.get("calls", 0)
+            usage.prompt_tokens += data.get("prompt_tokens", 0)
+            usage.completion_tokens += data.get("completion_tokens", 0)
+            usage.cached_tokens += data.get("cached_tokens", 0)
+            usage.latency_ms += data.get("latency_ms", 0.0)
+            usage.max_latency_ms = max(usage.max_latency_ms, data.get("max_latency_ms", 0.0))
+    return merged.to_dict()
@@ -12,19 +12,57 @@ class Settings(BaseSettings):
     llm_base_url: str = "https://dashscope.aliyuncs.com/compatible-mode/v1"
     chat_model: str = "qwen-plus"
     embedding_model: str = "text-embedding-v3"
+    llm_max_concurrency: int = 8         # 全局模型调用并发上限
+    llm_interactive_concurrency: int = 8 # 交互请求（问答、单章分析）并发上限
+    llm_streaming_concurrency: int = 6   # 人物分析等流式任务并发上限
+    llm_batch_concurrency: int = 3       # 批量后台任务并发上限
+    llm_tokens_per_minute: int = 0       # 每分钟 token 预算，0 表示不限制
+    llm_timeout: float = 180.0           # 单次请求超时（秒）
+    llm_max_retries: int = 3             # 429/5xx/超时最多重试次数
+    llm_retry_base_delay: float = 1.0    # 指数退避基础时间（秒）
+    llm_retry_max_delay: float = 30.0    # 单次退避上限（秒）
+    llm_hedge_after: float = 0.0         # 交互请求超过该秒数未返回时发对冲请求，0 表示关闭
+    llm_json_repair_attempts: int = 1    # JSON 解析失败时请模型修复的次数
+    llm_json_response_format: bool = True  # 使用服务端 JSON 模式（response_format=json_object）
 
     # Server
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     cors_origins: str = "http://localhost:5173,http://localhost:3000"
+    book_cache_max_age: int = 300        # 书籍正文/章节列表的浏览器缓存秒数（过期后用 ETag 重新验证）
+    compression_min_size: int = 1024     # 响应体超过该字节数才压缩
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5  # 需要安装 brotli
+    reader_prefetch_chapters: int = 3    # 连续阅读时一次预取的章节数（章节范围端点的默认 count）
 
     # Security
     max_upload_size: int = 50 * 1024 * 1024  # 50MB
 
     # Analysis
     max_chapter_content_length: int = 15000
+    context_extraction: bool = True      # 按人物提及位置截取段落，而非整章截断
+    context_window_paragraphs: int = 2   # 每次提及前后各取的段落数
+    context_merge_gap: int = 1           # 窗口间隔不超过该段落数时合并
     max_interaction_records: int = 30
+    skip_mentioned_only: bool = True     # 仅被提及的章节不调用模型，直接记录
+    mentioned_only_max_mentions: int = 2 # 提及次数不超过该值且无对话特征时视为仅被提及
     analysis_concurrency: int = 5
+    summary_full_rebuild_interval: int = 5  # 连续增量刷新总结多少次后强制全量重建
+    sampling_strategy: str = "relevance"  # relevance/uniform
+    sampling_coverage_ratio: float = 0.5  # 相关度采样中用于保证全书覆盖的名额比例
+    analysis_run_retention: int = 600    # 已结束的分析任务保留多少秒（供重连回放事件）
+
+    # Storage
+    storage_format: str = "json"         # 分析数据/章节文件写入格式：json/zstd/msgpack（读取自动识别）
+    storage_zstd_level: int = 3          # zstd 压缩级别
+
+    # Discovery
+    discovery_min_mentions: int = 5      # 候选人物最少提及次数
+    discovery_batch_size: int = 40       # 模型确认时每批候选数
+
+    # Co-occurrence
+    cooccurrence_slices: int = 10        # 共现图时间切片数
+    cooccurrence_chapter_weight: float = 0.5  # 同章共现相对同段共现的权重
 
     # Paths
     data_dir: Path = Path("../../data")
@@ -0,0 +1,110 @@
+"""Per-book canonical character name registry.
+
+把人物的各种称呼（昵称、外号、简称）映射到唯一的规范名，
+搜索和分析时一次扫描覆盖所有称呼，避免同一人物按不同称呼重复分析。
+
+来源（按优先级）：
+1. analysis/{book_id}/aliases.json：手动维护的 {规范名: [别名...]}
+2. analysis/{book_id}/characters.json：人物分析同步的 aliases 字段
+"""
+
+from .book import BookManager
+from ..knowledge.models import DetailedCharacter
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AliasRegistry:
+    """单本书的人物规范名注册表"""
+
+    def __init__(self, book_id: str, mapping: dict[str, list[str]] | None = None):
+        self.book_id = book_id
+        self._aliases: dict[str, list[str]] = {}
+        self._canonical: dict[str, str] = {}
+        for name, aliases in (mapping or {}).items():
+            self.add(name, aliases)
+
+    @classmethod
+    def load(cls, book_id: str) -> "AliasRegistry":
+        """加载注册表（手动别名优先于索引中的别名）"""
+        registry = cls(book_id, BookManager.get_alias_map(book_id))
+        for entry in BookManager.get_character_index(book_id):
+            registry.add(entry["name"], entry.get("aliases") or [])
+        return registry
+
+    def add(self, name: str, aliases: list[str]) -> list[str]:
+        """注册别名，返回实际生效的别名（已属于其他人物的别名会被忽略）"""
+        canonical = self.canonical(name)
+        known = self._aliases.setdefault(canonical, [])
+        self._canonical[canonical] = canonical
+
+        added = []
+        for alias in aliases:
+            alias = alias.strip()
+            if not alias or alias == canonical or alias in known:
+                continue
+            owner = self._canonical.get(alias)
+            if owner is not None and owner != canonical:
+                logger.warning(
+                    f"Alias '{alias}' of '{canonical}' already belongs to '{owner}', ignored"
+                )
+                continue
+            known.append(alias)
+            self._canonical[alias] = canonical
+            added.append(alias)
+        return added
+
+    def canonical(self, name: str) -> str:
+        """返回规范名（未注册的名字原样返回）"""
+        return self._canonical.get(name, name)
+
+    def aliases(self, name: str) -> list[str]:
+        """规范名对应的全部别名（不含规范名本身）"""
+        return list(self._aliases.get(self.canonical(name), []))
+
+    def surface_forms(self, name: str) -> list[str]:
+        """全部称呼：规范名 + 别名"""
+        canonical = self.canonical(name)
+        return [canonical, *self._aliases.get(canonical, [])]
+
+    def to_dict(self) -> dict[str, list[str]]:
+        return {name: list(aliases) for name, aliases in self._aliases.items() if aliases}
+
+
+def merge_character_profiles(
+    primary: DetailedCharacter, duplicate: DetailedCharacter
+) -> DetailedCharacter:
+    """把按别名单独分析出的人物合并进规范名人物
+
+    同一章节两边都有分析时以 primary 为准；总结字段保留 primary，
+    duplicate 中 primary 没有的关系对象补充进来。
+    """
+    appearances = {a.chapter_index: a for a in duplicate.appearances}
+    appearances.update({a.chapter_index: a for a in primary.appearances})
+
+    targets = {r.target_name for r in primary.relations}
+    relations = primary.relations + [
+        r for r in duplicate.relations if r.target_name not in targets
+    ]
+
+    aliases = [
+        a for a in dict.fromkeys([*primary.aliases, duplicate.name, *duplicate.aliases])
+        if a != primary.name
+    ]
+    analyzed = sorted(set(primary.analyzed_chapters) | set(duplicate.analyzed_chapters))
+    first = [c for c in (primary.first_appearance, duplicate.first_appearance) if c >= 0]
+
+    return primary.model_copy(update={
+        "aliases": aliases,
+        "appearances": [appearances[i] for i in sorted(appearances)],
+        "relations": relations,
+        "analyzed_chapters": analyzed,
+        "total_analyzed_chapters": len(analyzed),
+        "first_appearance": min(first) if first else -1,
+        "last_appearance": max(primary.last_appearance, duplicate.last_appearance),
+        "discovered_characters": [
+            c for c in dict.fromkeys([*primary.discovered_characters, *duplicate.discovered_characters])
+            if c != primary.name and c not in aliases
+        ],
+    })
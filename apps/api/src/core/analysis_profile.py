@@ -0,0 +1,106 @@
+"""Per-book analysis profile compiled into character analysis prompts.
+
+人物分析 prompt 中的背景说明（叙述视角、叙述者、题材）按书籍配置生成，不再写死某一本书：
+1. analysis/{book_id}/analysis_profile.json：手动配置（PUT /api/books/{book_id}/analysis-profile）
+2. 未配置时本地检测叙述视角（统计对话以外"我"的出现频率），不调用模型
+
+只有第一人称小说才需要区分叙述者的主观推测，第三人称和视角未知的书只生成一两句背景说明，
+不为无关的注意事项消耗 token。
+"""
+
+import re
+
+from .book import Book, BookManager
+from ..knowledge.models import AnalysisProfile
+
+POV_MODES = ("first_person", "third_person", "unknown")
+
+# 视角检测：在全书均匀取若干窗口，去掉对话后统计"我"的频率
+DETECT_WINDOWS = 10
+DETECT_WINDOW_CHARS = 20_000
+FIRST_PERSON_PER_1000 = 3.0   # 叙述文字中每千字"我"的次数达到该值视为第一人称
+MIN_NARRATION_CHARS = 2_000   # 叙述文字过少时不做判断
+
+_DIALOGUE_RE = re.compile(r"“[^”]*”|「[^」]*」|\"[^\"\n]*\"")
+
+# book_id -> 生效的分析配置（手动配置或检测结果）
+_profiles: dict[str, AnalysisProfile] = {}
+
+
+def evict(book_id: str) -> None:
+    """清除某本书缓存的分析配置（书籍被删除或重新上传时）"""
+    _profiles.pop(book_id, None)
+
+
+def detect_pov(content: str) -> str:
+    """本地检测叙述视角：first_person/third_person/unknown"""
+    if len(content) <= DETECT_WINDOWS * DETECT_WINDOW_CHARS:
+        sample = content
+    else:
+        step = len(content) // DETECT_WINDOWS
+        sample = "".join(
+            content[i * step:i * step + DETECT_WINDOW_CHARS] for i in range(DETECT_WINDOWS)
+        )
+
+    narration = _DIALOGUE_RE.sub("", sample)
+    if len(narration) < MIN_NARRATION_CHARS:
+        return "unknown"
+    per_1000 = narration.count("我") * 1000 / len(narration)
+    return "first_person" if per_1000 >= FIRST_PERSON_PER_1000 else "third_person"
+
+
+def load_analysis_profile(book: Book) -> AnalysisProfile:
+    """获取书籍生效的分析配置：手动配置优先，否则使用本地检测结果（结果缓存）"""
+    profile = _profiles.get(book.id)
+    if profile is None:
+        profile = BookManager.get_analysis_profile(book.id)
+        if profile is None:
+            profile = AnalysisProfile(pov=detect_pov(book.content), detected=True)
+        _profiles[book.id] = profile
+    return profile
+
+
+def save_analysis_profile(book_id: str, profile: AnalysisProfile) -> None:
+    """保存手动配置并立即生效"""
+    profile = profile.model_copy(update={"detected": False})
+    BookManager.save_analysis_profile(book_id, profile)
+    _profiles[book_id] = profile
+
+
+def compile_narrator_context(profile: AnalysisProfile | None) -> str:
+    """把分析配置编译为 prompt 背景说明（同一本书每次结果相同，可作为固定前缀）"""
+    profile = profile or AnalysisProfile()
+
+    if profile.pov == "first_person":
+        narrator = f'主角"{profile.narrator}"（文中的"我"）' if profile.narrator else '文中的"我"'
+        context = f"""
+【重要背景】
+这是一部第一人称小说，叙述者是{narrator}。你正在分析的内容都是从叙述者的视角描写的。
+
+分析时请注意区分：
+1. **客观事实**：人物的对话、具体行为、外貌描写
+2. **主观推测**：叙述者对该人物心理、动机的猜测（如"她可能在想..."、"看起来她..."）
+3. **关系偏差**：叙述者与该人物的关系会影响描写的倾向性
+
+分析原则：
+- 优先采信对话和行为等客观内容
+- 对叙述者的主观评价持保留态度
+- 明确标注哪些是推测、哪些是事实
+- 如果叙述者对某人有好感/敌意，注意描写可能带有偏见
+"""
+    elif profile.pov == "third_person":
+        context = """
+【背景】
+这是一部第三人称小说。以人物的对话和行为为主要依据，旁白中的心理描写可作参考。
+"""
+    else:
+        context = """
+【背景】
+以人物的对话和行为为主要依据，区分客观描写与叙述者的主观评价。
+"""
+
+    if profile.genre_hints:
+        context += f"题材：{'、'.join(profile.genre_hints)}\n"
+    if profile.notes:
+        context += f"注意：{profile.notes}\n"
+    return context
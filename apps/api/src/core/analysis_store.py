@@ -0,0 +1,392 @@
+"""Per-book embedded analysis database.
+
+章节分析和详细人物分析存放在 analysis/{book_id}/analysis.db（SQLite），
+列表和章节范围查询都是一次索引查询，不再逐个打开 chapters/*.json 和 characters/*/profile.json。
+
+data 列按 core/serialization.py 的存储格式编码（紧凑 JSON 文本，或 zstd/msgpack 二进制），
+读取时自动识别：
+
+- chapter_analyses: chapter_index 为主键，data 为 ChapterAnalysis
+- character_profiles: 人物画像头部（DetailedCharacter 去掉 appearances），
+  analysis_status 单独成列（查状态无需解析画像）
+- character_appearances: (name, chapter_index) 为主键，每章一行出场分析；
+  继续分析只追加新章节，读取头部不需要加载出场记录
+- revisions: chapters/characters 两类数据各自的修订号和最后修改时间，
+  写入时在同一事务中递增，供 HTTP 缓存（ETag/Last-Modified）判断数据是否变化
+
+旧布局（chapters/{index:04d}.json、characters/{name}/profile.json）在数据库首次创建时自动导入；
+scripts/migrate_to_db.py 可批量迁移所有书籍并清理旧文件。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ..config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DB_FILENAME = "analysis.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chapter_analyses (
+    chapter_index INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS character_profiles (
+    name TEXT PRIMARY KEY,
+    analysis_status TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS character_appearances (
+    name TEXT NOT NULL,
+    chapter_index INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (name, chapter_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS revisions (
+    scope TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+REVISION_SCOPES = ("chapters", "characters")
+
+# 1: 完整画像存放在 character_profiles.data
+# 2: 出场记录拆分到 character_appearances
+SCHEMA_VERSION = 2
+
+
+class AnalysisStore:
+    """单本书的分析数据库
+
+    每本书一个连接（check_same_thread=False），读写由实例锁串行化；
+    WAL 模式下单条写入只追加日志，不重写整个文件。
+    """
+
+    _stores: dict[Path, "AnalysisStore"] = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        created = not path.exists()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if not created and version < 2:
+            self._split_profiles()
+        if version < SCHEMA_VERSION:
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        # 新建数据库时自动导入旧布局文件，导入数量保留供迁移脚本报告
+        self.legacy_import: dict[str, int] | None = None
+        if created:
+            self.legacy_import = self.import_legacy()
+            if any(self.legacy_import.values()):
+                logger.info(f"Imported legacy analysis files into {path}: {self.legacy_import}")
+
+    @classmethod
+    def for_book(cls, book_id: str) -> "AnalysisStore":
+        """获取书籍的分析数据库（按路径缓存连接）"""
+        path = settings.analysis_dir / book_id / DB_FILENAME
+        with cls._stores_lock:
+            store = cls._stores.get(path)
+            if store is None:
+                store = cls(path)
+                cls._stores[path] = store
+            return store
+
+    @classmethod
+    def close(cls, book_id: str) -> None:
+        """关闭书籍的数据库连接（删除书籍前调用）"""
+        path = settings.analysis_dir / book_id / DB_FILENAME
+        with cls._stores_lock:
+            store = cls._stores.pop(path, None)
+        if store is not None:
+            with store._lock:
+                store._conn.close()
+
+    # ===== 章节分析 =====
+
+    def get_chapter_analysis(self, chapter_index: int) -> str | bytes | None:
+        """读取单章分析数据"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM chapter_analyses WHERE chapter_index = ?", (chapter_index,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def list_chapter_analyses(
+        self, start: int | None = None, end: int | None = None, limit: int | None = None
+    ) -> list[str | bytes]:
+        """按章节顺序读取分析数据，可限定章节范围 [start, end] 和条数"""
+        query = "SELECT data FROM chapter_analyses"
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("chapter_index >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("chapter_index <= ?")
+            params.append(end)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY chapter_index"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return [row[0] for row in self._conn.execute(query, params)]
+
+    def save_chapter_analysis(self, chapter_index: int, data: str | bytes) -> None:
+        """写入单章分析（覆盖同一章节的旧结果）"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chapter_analyses (chapter_index, data) VALUES (?, ?)",
+                (chapter_index, data),
+            )
+            self._bump("chapters")
+
+    # ===== 修订号 =====
+
+    def revision(self, scope: str) -> tuple[int, float]:
+        """数据修订号和最后修改时间（从未写入时为 (0, 0.0)）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT revision, updated_at FROM revisions WHERE scope = ?", (scope,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (0, 0.0)
+
+    def _bump(self, scope: str) -> None:
+        """递增修订号（调用方持有锁并开启事务）"""
+        self._conn.execute(
+            "INSERT INTO revisions (scope, revision, updated_at) VALUES (?, 1, ?) "
+            "ON CONFLICT(scope) DO UPDATE SET revision = revision + 1, updated_at = excluded.updated_at",
+            (scope, time.time()),
+        )
+
+    # ===== 详细人物分析 =====
+
+    def get_character(
+        self, name: str, with_appearances: bool = True
+    ) -> tuple[str | bytes, list[str | bytes]] | None:
+        """读取人物画像，返回 (头部, 按章节排序的出场记录)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM character_profiles WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return None
+            appearances = self._appearances([name]).get(name, []) if with_appearances else []
+        return row[0], appearances
+
+    def get_character_updated_at(self, name: str) -> float | None:
+        """人物画像最后写入时间"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT updated_at FROM character_profiles WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_character_status(self, name: str) -> str | None:
+        """只读取人物分析状态（不解析画像）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT analysis_status FROM character_profiles WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def list_characters(
+        self, after: str | None = None, limit: int | None = None, with_appearances: bool = True
+    ) -> list[tuple[str | bytes, list[str | bytes]]]:
+        """按人物名顺序读取画像，after 为上一页最后一个人物名"""
+        query = "SELECT name, data FROM character_profiles"
+        params: list = []
+        if after is not None:
+            query += " WHERE name > ?"
+            params.append(after)
+        query += " ORDER BY name"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            appearances = self._appearances([name for name, _ in rows]) if with_appearances else {}
+        return [(data, appearances.get(name, [])) for name, data in rows]
+
+    def _appearances(self, names: list[str]) -> dict[str, list[str | bytes]]:
+        """批量读取多个人物的出场记录（调用方持有锁）"""
+        result: dict[str, list[str | bytes]] = {}
+        # SQLite 单条语句的参数个数有上限，分批查询
+        for i in range(0, len(names), 500):
+            batch = names[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            for name, data in self._conn.execute(
+                f"SELECT name, data FROM character_appearances WHERE name IN ({placeholders}) "
+                "ORDER BY name, chapter_index",
+                batch,
+            ):
+                result.setdefault(name, []).append(data)
+        return result
+
+    def appearance_indices(self, name: str) -> set[int]:
+        """人物已保存出场记录的章节（只读主键索引）"""
+        with self._lock:
+            return {
+                row[0] for row in self._conn.execute(
+                    "SELECT chapter_index FROM character_appearances WHERE name = ?", (name,)
+                )
+            }
+
+    def save_character(
+        self,
+        name: str,
+        analysis_status: str,
+        header: str | bytes,
+        appearances: list[tuple[int, str | bytes]],
+        remove: list[int] | None = None,
+        replace: bool = False,
+    ) -> None:
+        """写入人物画像头部和出场记录（同一事务）
+
+        Args:
+            appearances: 要写入的 (chapter_index, 编码后的数据)，同一章节覆盖
+            remove: 要删除的章节
+            replace: True 时先清空该人物的全部出场记录
+        """
+        with self._lock, self._conn:
+            self._write_character(name, analysis_status, header, time.time())
+            if replace:
+                self._conn.execute("DELETE FROM character_appearances WHERE name = ?", (name,))
+            elif remove:
+                self._conn.executemany(
+                    "DELETE FROM character_appearances WHERE name = ? AND chapter_index = ?",
+                    [(name, i) for i in remove],
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO character_appearances (name, chapter_index, data) "
+                "VALUES (?, ?, ?)",
+                [(name, i, data) for i, data in appearances],
+            )
+            self._bump("characters")
+
+    def _write_character(
+        self,
+        name: str,
+        analysis_status: str,
+        header: str | bytes,
+        updated_at: float,
+        verb: str = "INSERT OR REPLACE",
+    ) -> bool:
+        """写入画像头部（调用方持有锁并开启事务），返回是否写入"""
+        cursor = self._conn.execute(
+            f"{verb} INTO character_profiles (name, analysis_status, data, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            (name, analysis_status, header, updated_at),
+        )
+        return cursor.rowcount > 0
+
+    def delete_character(self, name: str) -> bool:
+        """删除人物画像及出场记录，返回是否存在"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM character_profiles WHERE name = ?", (name,))
+            self._conn.execute("DELETE FROM character_appearances WHERE name = ?", (name,))
+            if cursor.rowcount:
+                self._bump("characters")
+        return cursor.rowcount > 0
+
+    def _split_profiles(self) -> None:
+        """旧版数据库迁移：把画像中的 appearances 拆到 character_appearances"""
+        rows = self._conn.execute("SELECT name, data FROM character_profiles").fetchall()
+        with self._conn:
+            for name, raw in rows:
+                data = json.loads(raw)
+                appearances = data.pop("appearances", None) or []
+                self._conn.execute(
+                    "UPDATE character_profiles SET data = ? WHERE name = ?",
+                    (json.dumps(data, ensure_ascii=False), name),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO character_appearances (name, chapter_index, data) "
+                    "VALUES (?, ?, ?)",
+                    _appearance_rows(name, appearances),
+                )
+        logger.info(f"Split appearances of {len(rows)} profiles in {self.path}")
+
+    # ===== 旧布局迁移 =====
+
+    def import_legacy(self, replace: bool = False) -> dict[str, int]:
+        """导入旧布局的 JSON 文件，返回导入数量
+
+        Args:
+            replace: True 时覆盖数据库中已有的同一章节/人物，否则保留数据库中的版本
+        """
+        book_dir = self.path.parent
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+
+        chapters = []
+        for file_path in sorted((book_dir / "chapters").glob("*.json")):
+            data = _read_json(file_path)
+            if isinstance(data, dict) and isinstance(data.get("chapter_index"), int):
+                chapters.append((data["chapter_index"], json.dumps(data, ensure_ascii=False)))
+
+        profiles = []
+        for profile_path in sorted((book_dir / "characters").glob("*/profile.json")):
+            data = _read_json(profile_path)
+            if isinstance(data, dict) and data.get("name"):
+                profiles.append(data)
+
+        imported = 0
+        now = time.time()
+        with self._lock, self._conn:
+            # INSERT OR IGNORE 跳过的章节不计入 rowcount
+            written = self._conn.executemany(
+                f"{verb} INTO chapter_analyses (chapter_index, data) VALUES (?, ?)", chapters
+            ).rowcount
+            for data in profiles:
+                name = data["name"]
+                appearances = data.pop("appearances", None) or []
+                status = data.setdefault("analysis_status", "completed")
+                header = json.dumps(data, ensure_ascii=False)
+                if not self._write_character(name, status, header, now, verb):
+                    continue  # 数据库中已有该人物
+                imported += 1
+                self._conn.execute("DELETE FROM character_appearances WHERE name = ?", (name,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO character_appearances (name, chapter_index, data) "
+                    "VALUES (?, ?, ?)",
+                    _appearance_rows(name, appearances),
+                )
+            for scope in REVISION_SCOPES:
+                self._bump(scope)
+        return {"chapters": max(written, 0), "characters": imported}
+
+
+def _appearance_rows(name: str, appearances: list) -> list[tuple[str, int, str]]:
+    """旧格式画像中的 appearances 转为 character_appearances 行"""
+    return [
+        (name, a["chapter_index"], json.dumps(a, ensure_ascii=False))
+        for a in appearances
+        if isinstance(a, dict) and isinstance(a.get("chapter_index"), int)
+    ]
+
+
+def _read_json(file_path: Path) -> dict | None:
+    """读取旧布局 JSON 文件，损坏的文件跳过"""
+    try:
+        return json.loads(file_path.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"Skipping unreadable legacy file {file_path}: {e}")
+        return None
@@ -2,15 +2,30 @@
 
 import hashlib
 import json
+import os
 import re
+import tempfile
+import threading
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
 
 import chardet
+from pydantic import BaseModel, TypeAdapter
 
+from .analysis_store import AnalysisStore
+from .chapters import detect_chapters
+from . import serialization
 from ..config import settings
-from ..knowledge.models import Chapter, ChapterAnalysis, Character, DetailedCharacter
+from ..knowledge.models import (
+    AnalysisProfile,
+    CastMember,
+    Chapter,
+    CharacterAppearance,
+    ChapterAnalysis,
+    Character,
+    DetailedCharacter,
+)
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -28,6 +43,83 @@ def _safe_load_json(file_path: Path, encoding: str = "utf-8") -> Optional[dict]:
         return None
 
 
+def _atomic_write_text(file_path: Path, text: str, encoding: str = "utf-8") -> None:
+    """原子写入：先写同目录临时文件再 rename，读者不会看到写了一半的文件"""
+    fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+# 断点中已完成章节的分析结果，每章追加一行（checkpoint.json 只保存头部）
+CHECKPOINT_APPEARANCES = "checkpoint_appearances.jsonl"
+
+
+def _write_checkpoint_header(char_dir: Path, checkpoint: dict) -> None:
+    """写入断点头部（章节计划、模型调用次数等，不含 appearances）"""
+    header = {k: v for k, v in checkpoint.items() if k != "appearances"}
+    _atomic_write_text(char_dir / "checkpoint.json", json.dumps(header, ensure_ascii=False))
+
+
+# book_id -> characters.json 读改写锁（不同书籍互不阻塞）
+_index_locks: dict[str, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+
+def _index_lock(book_id: str) -> threading.Lock:
+    with _index_locks_guard:
+        return _index_locks.setdefault(book_id, threading.Lock())
+
+
+def _index_entry(character: DetailedCharacter) -> dict:
+    """characters.json 中的人物索引条目"""
+    return {
+        "name": character.name,
+        "aliases": character.aliases,
+        "description": character.description,
+        "first_appearance": character.first_appearance,
+        "role": character.role,
+    }
+
+
+# 章节分析批量解析：整页记录拼成一个 JSON 数组，一次 validate_json 完成解码和校验
+# （人物画像单条已经很大，逐条 model_validate_json 更快，见 scripts/bench_model_loading.py）
+_chapter_analyses_adapter = TypeAdapter(list[ChapterAnalysis])
+
+
+def _json_array(documents: list[bytes]) -> bytes:
+    return b"[" + b",".join(documents) + b"]"
+
+
+def _character_json(raw: tuple[str | bytes, list[str | bytes]]) -> bytes | None:
+    """把画像头部和出场记录拼成完整的 DetailedCharacter JSON（非 JSON 存储格式返回 None）"""
+    header, appearances = raw
+    header = serialization.json_bytes(header)
+    shards = [serialization.json_bytes(a) for a in appearances]
+    if header is None or any(a is None for a in shards):
+        return None
+    header = header.rstrip()
+    if not header.endswith(b"}") or header[:-1].rstrip().endswith(b"{"):
+        return None
+    return header[:-1] + b',"appearances":' + _json_array(shards) + b"}"
+
+
+def _project(data: dict, model: type[BaseModel], fields: set[str] | None) -> dict:
+    """只保留需要的字段（和模型必填字段），减少校验开销"""
+    if fields is None or not isinstance(data, dict):
+        return data
+    return {
+        key: value for key, value in data.items()
+        if key in fields or (key in model.model_fields and model.model_fields[key].is_required())
+    }
+
+
 @dataclass
 class Book:
     """Book data structure."""
@@ -78,6 +170,14 @@ class BookManager:
 
         return None
 
+    @classmethod
+    def get_book_path(cls, book_id: str) -> Optional[Path]:
+        """书籍文本文件路径（用于判断文件是否变化）"""
+        book = cls.get_book(book_id)
+        if not book:
+            return None
+        return settings.books_dir / book.metadata["filename"]
+
     @classmethod
     async def import_book(cls, content: bytes, filename: str) -> Book:
         """Import a book from bytes content."""
@@ -98,6 +198,7 @@ class BookManager:
         # Parse
         book = cls._parse_book(book_id, filename, text)
         cls._cache[book_id] = book
+        cls._evict_derived_caches(book_id)
 
         return book
 
@@ -109,8 +210,10 @@ class BookManager:
             if cls._file_to_id(file_path.name) == book_id:
                 file_path.unlink()
                 cls._cache.pop(book_id, None)
+                cls._evict_derived_caches(book_id)
 
                 # Also delete analysis
+                AnalysisStore.close(book_id)
                 analysis_dir = settings.analysis_dir / book_id
                 if analysis_dir.exists():
                     import shutil
@@ -119,6 +222,14 @@ class BookManager:
                 return True
         return False
 
+    @classmethod
+    def _evict_derived_caches(cls, book_id: str) -> None:
+        """清除按 book_id 缓存的派生结果（书籍 ID 由文件名生成，同名重新上传时不能复用）"""
+        from . import analysis_profile, cooccurrence  # 这两个模块依赖 book.py，延迟导入
+
+        analysis_profile.evict(book_id)
+        cooccurrence.evict(book_id)
+
     @classmethod
     def _load_book(cls, file_path: Path) -> Book:
         """Load a book from file."""
@@ -192,89 +303,70 @@ class BookManager:
 
     @classmethod
     def _detect_chapters(cls, content: str) -> list[Chapter]:
-        """Detect chapters in content."""
-        chapters = []
-
-        # Chapter patterns
-        # 支持：第X章、第X掌（错别字）、第X （缺少"章"字）
-        # 注意：
-        #   - 中文数字包含"两"（如"第两千章"）、"份"（"千"的错别字）
-        #   - "地"是"第"的常见错别字（如"地五千五百零七章"）
-        patterns = [
-            r"^[第地][0-9]+[章掌][：:\s]?.*",
-            r"^[第地][零一二三四五六七八九十百千万两份]+[章掌][：:\s]?.*",
-            r"^[第地][0-9]+\s+\S+",  # 第123 标题（缺少章字）
-            r"^[第地][零一二三四五六七八九十百千万两份]+\s+\S+",  # 第一百二十三 标题
-            r"^Chapter\s+\d+[：:\s]?.*",
-        ]
-
-        combined = "|".join(f"({p})" for p in patterns)
-        pattern = re.compile(combined, re.MULTILINE | re.IGNORECASE)
-
-        for match in pattern.finditer(content):
-            title = match.group(0).strip()
-            if title:
-                if chapters:
-                    chapters[-1] = Chapter(
-                        index=chapters[-1].index,
-                        title=chapters[-1].title,
-                        start=chapters[-1].start,
-                        end=match.start() - 1,
-                    )
-
-                chapters.append(Chapter(
-                    index=len(chapters),
-                    title=title,
-                    start=match.start(),
-                    end=len(content) - 1,
-                ))
-
-        return chapters
+        """Detect chapters in content (see core/chapters.py)."""
+        return detect_chapters(content)
 
     # Analysis storage methods
 
     @classmethod
-    def get_analyses(cls, book_id: str) -> list[ChapterAnalysis]:
-        """Get all chapter analyses."""
-        analysis_dir = settings.analysis_dir / book_id / "chapters"
-        if not analysis_dir.exists():
-            return []
+    def get_analyses(
+        cls,
+        book_id: str,
+        start: int | None = None,
+        end: int | None = None,
+        limit: int | None = None,
+        fields: set[str] | None = None,
+    ) -> list[ChapterAnalysis]:
+        """Get chapter analyses ordered by chapter index.
+
+        Args:
+            start/end: 章节范围（含两端）
+            limit: 最多返回条数
+            fields: 只解析这些字段（其余字段为默认值），用于字段投影
+        """
+        rows = AnalysisStore.for_book(book_id).list_chapter_analyses(start, end, limit)
+        if fields is None:
+            try:
+                documents = [serialization.json_bytes(raw) for raw in rows]
+                if all(d is not None for d in documents):
+                    return _chapter_analyses_adapter.validate_json(_json_array(documents))
+            except Exception as e:
+                # 有无法解码（损坏的 zstd 数据、未安装 zstandard）或无效的记录时逐条解析，跳过这些记录
+                logger.debug(f"Batch parse of chapter analyses failed, falling back to per-row: {e}")
 
         analyses = []
-        for file_path in sorted(analysis_dir.glob("*.json")):
-            data = _safe_load_json(file_path)
-            if data:
-                try:
-                    analyses.append(ChapterAnalysis(**data))
-                except Exception as e:
-                    logger.warning(f"Invalid chapter analysis in {file_path}: {e}")
-
+        for raw in rows:
+            analysis = cls._parse_chapter_analysis(raw, fields)
+            if analysis:
+                analyses.append(analysis)
         return analyses
 
     @classmethod
     def get_chapter_analysis(cls, book_id: str, chapter_index: int) -> Optional[ChapterAnalysis]:
         """Get analysis for a specific chapter."""
-        file_path = settings.analysis_dir / book_id / "chapters" / f"{chapter_index:04d}.json"
-        if not file_path.exists():
-            return None
+        raw = AnalysisStore.for_book(book_id).get_chapter_analysis(chapter_index)
+        return cls._parse_chapter_analysis(raw) if raw else None
 
-        data = _safe_load_json(file_path)
-        if not data:
-            return None
+    @classmethod
+    def _parse_chapter_analysis(
+        cls, raw: str | bytes, fields: set[str] | None = None
+    ) -> Optional[ChapterAnalysis]:
+        """解析数据库中的章节分析（任意存储格式）"""
         try:
-            return ChapterAnalysis(**data)
+            document = serialization.json_bytes(raw) if fields is None else None
+            if document is not None:
+                return ChapterAnalysis.model_validate_json(document)
+            return ChapterAnalysis(**_project(serialization.decode(raw), ChapterAnalysis, fields))
         except Exception as e:
-            logger.warning(f"Invalid chapter analysis in {file_path}: {e}")
+            logger.warning(f"Invalid chapter analysis: {e}")
             return None
 
     @classmethod
     def save_chapter_analysis(cls, book_id: str, analysis: ChapterAnalysis) -> None:
         """Save chapter analysis."""
-        analysis_dir = settings.analysis_dir / book_id / "chapters"
-        analysis_dir.mkdir(parents=True, exist_ok=True)
-
-        file_path = analysis_dir / f"{analysis.chapter_index:04d}.json"
-        file_path.write_text(analysis.model_dump_json(indent=2))
+        AnalysisStore.for_book(book_id).save_chapter_analysis(
+            analysis.chapter_index, serialization.encode(analysis)
+        )
 
     @classmethod
     def get_characters(cls, book_id: str) -> list[Character]:
@@ -295,119 +387,370 @@ class BookManager:
                 logger.warning(f"Invalid character data: {e}")
         return characters
 
+    @classmethod
+    def get_character_index(cls, book_id: str) -> list[dict]:
+        """读取 characters.json 索引原始条目（不做模型校验）"""
+        file_path = settings.analysis_dir / book_id / "characters.json"
+        if not file_path.exists():
+            return []
+
+        data = _safe_load_json(file_path)
+        if not data:
+            return []
+        return [c for c in data if isinstance(c, dict) and c.get("name")]
+
+    @classmethod
+    def get_character_names(cls, book_id: str) -> list[str]:
+        """从 characters.json 索引读取已知人物名"""
+        return [c["name"] for c in cls.get_character_index(book_id)]
+
+    @classmethod
+    def get_alias_map(cls, book_id: str) -> dict[str, list[str]]:
+        """读取手动维护的别名表 aliases.json（规范名 -> 别名列表）"""
+        file_path = settings.analysis_dir / book_id / "aliases.json"
+        if not file_path.exists():
+            return {}
+
+        data = _safe_load_json(file_path)
+        if not isinstance(data, dict):
+            return {}
+        return {
+            name: [a for a in aliases if isinstance(a, str)]
+            for name, aliases in data.items()
+            if isinstance(aliases, list)
+        }
+
+    @classmethod
+    def save_alias_map(cls, book_id: str, alias_map: dict[str, list[str]]) -> None:
+        """保存别名表"""
+        analysis_dir = settings.analysis_dir / book_id
+        analysis_dir.mkdir(parents=True, exist_ok=True)
+
+        _atomic_write_text(
+            analysis_dir / "aliases.json",
+            json.dumps(alias_map, ensure_ascii=False, indent=2),
+        )
+
     @classmethod
     def save_characters(cls, book_id: str, characters: list[Character]) -> None:
         """Save extracted characters."""
         analysis_dir = settings.analysis_dir / book_id
         analysis_dir.mkdir(parents=True, exist_ok=True)
 
-        file_path = analysis_dir / "characters.json"
-        file_path.write_text(
-            json.dumps([c.model_dump() for c in characters], ensure_ascii=False, indent=2)
+        with _index_lock(book_id):
+            _atomic_write_text(
+                analysis_dir / "characters.json",
+                json.dumps([c.model_dump() for c in characters], ensure_ascii=False, indent=2),
+            )
+
+    @classmethod
+    def get_cast(cls, book_id: str) -> list[CastMember]:
+        """获取全书人物发现结果"""
+        file_path = settings.analysis_dir / book_id / "cast.json"
+        if not file_path.exists():
+            return []
+
+        data = _safe_load_json(file_path)
+        if not data:
+            return []
+
+        cast = []
+        for c in data:
+            try:
+                cast.append(CastMember(**c))
+            except Exception as e:
+                logger.warning(f"Invalid cast member: {e}")
+        return cast
+
+    @classmethod
+    def save_cast(cls, book_id: str, cast: list[CastMember]) -> None:
+        """保存全书人物发现结果"""
+        analysis_dir = settings.analysis_dir / book_id
+        analysis_dir.mkdir(parents=True, exist_ok=True)
+
+        _atomic_write_text(
+            analysis_dir / "cast.json",
+            json.dumps([c.model_dump() for c in cast], ensure_ascii=False, indent=2),
         )
 
-    # ===== 详细人物分析存储方法 =====
-    # 统一使用新格式: characters/{name}/profile.json
+    @classmethod
+    def get_analysis_profile(cls, book_id: str) -> Optional[AnalysisProfile]:
+        """获取书籍分析配置（analysis_profile.json，未配置时返回 None）"""
+        file_path = settings.analysis_dir / book_id / "analysis_profile.json"
+        if not file_path.exists():
+            return None
+
+        data = _safe_load_json(file_path)
+        if not isinstance(data, dict):
+            return None
+        try:
+            return AnalysisProfile(**data)
+        except Exception as e:
+            logger.warning(f"Invalid analysis profile in {file_path}: {e}")
+            return None
 
     @classmethod
-    def save_detailed_character(cls, book_id: str, character: DetailedCharacter) -> None:
-        """保存详细人物分析到 characters/{name}/profile.json"""
-        char_dir = settings.analysis_dir / book_id / "characters" / character.name
-        char_dir.mkdir(parents=True, exist_ok=True)
+    def save_analysis_profile(cls, book_id: str, profile: AnalysisProfile) -> None:
+        """保存书籍分析配置"""
+        analysis_dir = settings.analysis_dir / book_id
+        analysis_dir.mkdir(parents=True, exist_ok=True)
 
-        profile_path = char_dir / "profile.json"
-        profile_path.write_text(
-            character.model_dump_json(indent=2, ensure_ascii=False),
-            encoding="utf-8",
+        _atomic_write_text(
+            analysis_dir / "analysis_profile.json",
+            profile.model_dump_json(indent=2, ensure_ascii=False),
         )
 
+    # ===== 详细人物分析存储方法 =====
+    # 画像存放在分析数据库 analysis.db（见 analysis_store.py）：头部一行，出场记录每章一行；
+    # characters/{name}/ 目录只保存分析断点（checkpoint.json + checkpoint_appearances.jsonl）
+
+    @classmethod
+    def save_detailed_character(
+        cls, book_id: str, character: DetailedCharacter, replace_appearances: bool = False
+    ) -> None:
+        """保存详细人物分析到分析数据库
+
+        默认只写入新增章节的出场记录（已保存的章节视为不变，删除不再存在的章节），
+        继续分析时写入量只与新增章节有关；重新分析得到的出场记录需 replace_appearances=True。
+        """
+        cls._save_detailed_profile(book_id, character, replace_appearances)
+
         # 同步更新 characters.json 索引
-        cls._sync_character_index(book_id, character)
+        cls._update_character_index(book_id, upserts=[character])
 
     @classmethod
-    def _sync_character_index(cls, book_id: str, character: DetailedCharacter) -> None:
-        """同步更新 characters.json 索引"""
-        index_path = settings.analysis_dir / book_id / "characters.json"
+    def save_character_progress(
+        cls,
+        book_id: str,
+        character: DetailedCharacter,
+        appearance: CharacterAppearance,
+        replace_appearances: bool = False,
+    ) -> None:
+        """分析进行中逐章保存：写入画像头部和这一章的出场记录（不写 character.appearances）
+
+        写入量与已完成的章节数无关；replace_appearances=True 时先清空上次未完成分析留下的出场记录。
+        """
+        AnalysisStore.for_book(book_id).save_character(
+            character.name,
+            character.analysis_status,
+            serialization.encode(character, exclude={"appearances"}),
+            [(appearance.chapter_index, serialization.encode(appearance))],
+            replace=replace_appearances,
+        )
+        cls._update_character_index(book_id, upserts=[character])
 
-        # 读取现有索引
-        characters = []
-        if index_path.exists():
-            characters = json.loads(index_path.read_text(encoding="utf-8"))
-
-        # 查找并更新或添加
-        found = False
-        for i, c in enumerate(characters):
-            if c.get("name") == character.name:
-                characters[i] = {
-                    "name": character.name,
-                    "aliases": character.aliases,
-                    "description": character.description,
-                    "first_appearance": character.first_appearance,
-                    "role": character.role,
-                }
-                found = True
-                break
-
-        if not found:
-            characters.append({
-                "name": character.name,
-                "aliases": character.aliases,
-                "description": character.description,
-                "first_appearance": character.first_appearance,
-                "role": character.role,
-            })
-
-        # 保存索引
-        index_path.write_text(
-            json.dumps(characters, ensure_ascii=False, indent=2),
-            encoding="utf-8"
+    @classmethod
+    def save_detailed_characters(
+        cls,
+        book_id: str,
+        characters: list[DetailedCharacter],
+        replace_appearances: bool = False,
+        removals: set[str] = frozenset(),
+    ) -> None:
+        """批量保存详细人物分析并删除 removals 中的人物（如合并人物），characters.json 索引只读写一次"""
+        for name in removals:
+            cls._delete_detailed_profile(book_id, name)
+        for character in characters:
+            cls._save_detailed_profile(book_id, character, replace_appearances)
+        cls._update_character_index(book_id, upserts=characters, removals=set(removals))
+
+    @classmethod
+    def _save_detailed_profile(
+        cls, book_id: str, character: DetailedCharacter, replace_appearances: bool
+    ) -> None:
+        """写入画像头部和出场记录（不更新索引）"""
+        store = AnalysisStore.for_book(book_id)
+        header = serialization.encode(character, exclude={"appearances"})
+
+        if replace_appearances:
+            appearances, removed = character.appearances, []
+        else:
+            stored = store.appearance_indices(character.name)
+            current = {a.chapter_index for a in character.appearances}
+            appearances = [a for a in character.appearances if a.chapter_index not in stored]
+            removed = sorted(stored - current)
+
+        store.save_character(
+            character.name,
+            character.analysis_status,
+            header,
+            [(a.chapter_index, serialization.encode(a)) for a in appearances],
+            remove=removed,
+            replace=replace_appearances,
         )
 
+    @classmethod
+    def _update_character_index(
+        cls,
+        book_id: str,
+        upserts: list[DetailedCharacter] = (),
+        removals: set[str] = frozenset(),
+    ) -> None:
+        """更新 characters.json 索引（按书加锁读改写，原子替换；条目无变化时不写文件）"""
+        index_path = settings.analysis_dir / book_id / "characters.json"
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with _index_lock(book_id):
+            characters = []
+            if index_path.exists():
+                characters = _safe_load_json(index_path) or []
+
+            updated = [c for c in characters if c.get("name") not in removals]
+            changed = len(updated) != len(characters)
+            positions = {c.get("name"): i for i, c in enumerate(updated)}
+            for character in upserts:
+                entry = _index_entry(character)
+                i = positions.get(character.name)
+                if i is None:
+                    positions[character.name] = len(updated)
+                    updated.append(entry)
+                    changed = True
+                elif updated[i] != entry:
+                    updated[i] = entry
+                    changed = True
+
+            if changed:
+                _atomic_write_text(index_path, json.dumps(updated, ensure_ascii=False, indent=2))
+
     @classmethod
     def get_detailed_character(cls, book_id: str, character_name: str) -> Optional[DetailedCharacter]:
         """获取详细人物分析"""
-        profile_path = settings.analysis_dir / book_id / "characters" / character_name / "profile.json"
+        raw = AnalysisStore.for_book(book_id).get_character(character_name)
+        return cls._parse_detailed_character(raw) if raw else None
 
-        if not profile_path.exists():
-            return None
+    @classmethod
+    def get_analysis_revision(cls, book_id: str, scope: str) -> tuple[int, float]:
+        """分析数据修订号和最后修改时间，scope: chapters/characters"""
+        return AnalysisStore.for_book(book_id).revision(scope)
 
-        data = _safe_load_json(profile_path)
-        if not data:
-            return None
+    @classmethod
+    def get_character_updated_at(cls, book_id: str, character_name: str) -> Optional[float]:
+        """人物画像最后写入时间"""
+        return AnalysisStore.for_book(book_id).get_character_updated_at(character_name)
 
-        # 确保 analysis_status 字段存在
-        if "analysis_status" not in data:
-            data["analysis_status"] = "completed"
+    @classmethod
+    def get_character_status(cls, book_id: str, character_name: str) -> Optional[str]:
+        """获取人物分析状态（不加载画像和出场记录）"""
+        return AnalysisStore.for_book(book_id).get_character_status(character_name)
 
+    @classmethod
+    def _parse_detailed_character(
+        cls, raw: tuple[str | bytes, list[str | bytes]], fields: set[str] | None = None
+    ) -> Optional[DetailedCharacter]:
+        """解析数据库中的人物画像（头部 + 出场记录，任意存储格式）"""
+        header, appearances = raw
         try:
+            document = _character_json(raw) if fields is None else None
+            if document is not None:
+                return DetailedCharacter.model_validate_json(document)
+
+            data = serialization.decode(header)
+            if fields is None or "appearances" in fields:
+                data["appearances"] = [serialization.decode(a) for a in appearances]
+            data = _project(data, DetailedCharacter, fields)
+            # 确保 analysis_status 字段存在
+            if "analysis_status" not in data:
+                data["analysis_status"] = "completed"
             return DetailedCharacter(**data)
         except Exception as e:
-            logger.warning(f"Invalid detailed character in {profile_path}: {e}")
+            logger.warning(f"Invalid detailed character: {e}")
             return None
 
     @classmethod
-    def get_detailed_characters(cls, book_id: str) -> list[DetailedCharacter]:
-        """获取所有详细人物分析"""
-        characters = []
-        chars_dir = settings.analysis_dir / book_id / "characters"
-
-        if not chars_dir.exists():
-            return characters
-
-        for char_dir in chars_dir.iterdir():
-            if char_dir.is_dir():
-                profile_path = char_dir / "profile.json"
-                if profile_path.exists():
-                    data = _safe_load_json(profile_path)
-                    if not data:
-                        continue
-                    if "analysis_status" not in data:
-                        data["analysis_status"] = "completed"
-                    try:
-                        characters.append(DetailedCharacter(**data))
-                    except Exception as e:
-                        logger.warning(f"Invalid detailed character in {profile_path}: {e}")
+    def delete_detailed_character(cls, book_id: str, character_name: str) -> bool:
+        """删除人物分析（含断点目录）及其 characters.json 索引条目"""
+        if not cls._delete_detailed_profile(book_id, character_name):
+            return False
+
+        cls._update_character_index(book_id, removals={character_name})
+        return True
+
+    @classmethod
+    def _delete_detailed_profile(cls, book_id: str, character_name: str) -> bool:
+        """删除画像、出场记录和断点目录（不更新索引），返回是否存在"""
+        deleted = AnalysisStore.for_book(book_id).delete_character(character_name)
+
+        char_dir = settings.analysis_dir / book_id / "characters" / character_name
+        if char_dir.exists():
+            import shutil
+            shutil.rmtree(char_dir)
+            deleted = True
+        return deleted
+
+    @classmethod
+    def get_checkpoint(cls, book_id: str, character_name: str) -> Optional[dict]:
+        """获取人物分析断点（checkpoint.json 头部 + checkpoint_appearances.jsonl 中已完成章节）"""
+        char_dir = settings.analysis_dir / book_id / "characters" / character_name
+        path = char_dir / "checkpoint.json"
+        if not path.exists():
+            return None
+        checkpoint = _safe_load_json(path)
+        if not isinstance(checkpoint, dict):
+            return None
+
+        # 旧版断点把 appearances 内嵌在 checkpoint.json 中
+        appearances = checkpoint.setdefault("appearances", [])
+        lines_path = char_dir / CHECKPOINT_APPEARANCES
+        if lines_path.exists():
+            for line in lines_path.read_text(encoding="utf-8").splitlines():
+                try:
+                    appearances.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 追加到一半时中断留下的残行，该章会重新分析
+                    logger.warning(f"Skipping truncated checkpoint line in {lines_path}")
+        return checkpoint
+
+    @classmethod
+    def save_checkpoint(cls, book_id: str, character_name: str, checkpoint: dict) -> None:
+        """保存人物分析断点（确定章节计划时写一次，按 checkpoint["appearances"] 重写已完成章节）"""
+        char_dir = settings.analysis_dir / book_id / "characters" / character_name
+        char_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write_text(char_dir / CHECKPOINT_APPEARANCES, "".join(
+            json.dumps(a, ensure_ascii=False) + "\n" for a in checkpoint.get("appearances", [])
+        ))
+        _write_checkpoint_header(char_dir, checkpoint)
+
+    @classmethod
+    def append_checkpoint_appearance(
+        cls, book_id: str, character_name: str, checkpoint: dict, appearance: dict
+    ) -> None:
+        """断点追加一章的分析结果并更新头部（每分析完一章写一次，写入量与已完成章节数无关）"""
+        char_dir = settings.analysis_dir / book_id / "characters" / character_name
+        char_dir.mkdir(parents=True, exist_ok=True)
+        with open(char_dir / CHECKPOINT_APPEARANCES, "a", encoding="utf-8") as f:
+            f.write(json.dumps(appearance, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        _write_checkpoint_header(char_dir, checkpoint)
+
+    @classmethod
+    def delete_checkpoint(cls, book_id: str, character_name: str) -> None:
+        """分析完成后删除断点"""
+        char_dir = settings.analysis_dir / book_id / "characters" / character_name
+        (char_dir / "checkpoint.json").unlink(missing_ok=True)
+        (char_dir / CHECKPOINT_APPEARANCES).unlink(missing_ok=True)
 
+    @classmethod
+    def get_detailed_characters(
+        cls,
+        book_id: str,
+        after: str | None = None,
+        limit: int | None = None,
+        fields: set[str] | None = None,
+    ) -> list[DetailedCharacter]:
+        """获取详细人物分析（按人物名排序）
+
+        Args:
+            after: 从该人物名之后开始（分页游标）
+            limit: 最多返回条数
+            fields: 只解析这些字段（其余字段为默认值），不需要 appearances 时不读取出场记录
+        """
+        with_appearances = fields is None or "appearances" in fields
+        characters = []
+        for raw in AnalysisStore.for_book(book_id).list_characters(after, limit, with_appearances):
+            character = cls._parse_detailed_character(raw, fields)
+            if character:
+                characters.append(character)
         return characters
 
     # ===== 章节独立存储方法 =====
@@ -433,7 +776,7 @@ class BookManager:
             "total_characters": len(book.content),
         }, ensure_ascii=False, indent=2), encoding="utf-8")
 
-        # 拆分章节
+        # 拆分章节（格式见 settings.storage_format）
         for chapter in book.chapters:
             content = book.content[chapter.start:chapter.end + 1]
             chapter_data = {
@@ -441,24 +784,28 @@ class BookManager:
                 "title": chapter.title,
                 "content": content,
             }
-            file_path = chapters_dir / f"{chapter.index + 1:04d}.json"
-            file_path.write_text(
-                json.dumps(chapter_data, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
+            serialization.write_file(chapters_dir / f"{chapter.index + 1:04d}", chapter_data)
 
         return len(book.chapters)
 
     @classmethod
     def get_chapter_file(cls, book_id: str, chapter_index: int) -> Optional[dict]:
-        """从独立文件读取章节"""
-        file_path = settings.books_dir / book_id / "chapters" / f"{chapter_index + 1:04d}.json"
-        if not file_path.exists():
+        """从独立文件读取章节（任意存储格式）"""
+        file_path = serialization.find_file(
+            settings.books_dir / book_id / "chapters" / f"{chapter_index + 1:04d}"
+        )
+        if file_path is None:
+            return None
+        try:
+            return serialization.read_file(file_path)
+        except Exception as e:
+            logger.error(f"Failed to read {file_path}: {e}")
             return None
-        return _safe_load_json(file_path)
 
     @classmethod
     def has_chapter_files(cls, book_id: str) -> bool:
         """检查是否已拆分章节文件"""
         chapters_dir = settings.books_dir / book_id / "chapters"
-        return chapters_dir.exists() and any(chapters_dir.glob("*.json"))
+        return chapters_dir.exists() and any(
+            any(chapters_dir.glob(f"*{suffix}")) for suffix in serialization.FILE_SUFFIXES.values()
+        )
@@ -0,0 +1,73 @@
+"""Chapter segmentation.
+
+章节标题只可能出现在行首，且首字只可能是 第/地/C/c。先用行首字符扫描找出候选行，
+只在候选行上运行完整的章节标题正则（MULTILINE 正则会在全文每个位置尝试 ^，长篇小说上很慢）。
+扫描过程只记录 (偏移, 标题)，最后一次性构造 Chapter。
+
+结果与 CHAPTER_PATTERN.finditer 逐个匹配完全一致（包括标题跨行等边界情况），
+对比脚本：scripts/bench_chapter_detection.py。
+"""
+
+import re
+from itertools import chain
+
+from ..knowledge.models import Chapter
+
+# 章节标题模式
+# 支持：第X章、第X掌（错别字）、第X （缺少"章"字）
+# 注意：
+#   - 中文数字包含"两"（如"第两千章"）、"份"（"千"的错别字）
+#   - "地"是"第"的常见错别字（如"地五千五百零七章"）
+CHAPTER_PATTERNS = [
+    r"^[第地][0-9]+[章掌][：:\s]?.*",
+    r"^[第地][零一二三四五六七八九十百千万两份]+[章掌][：:\s]?.*",
+    r"^[第地][0-9]+\s+\S+",  # 第123 标题（缺少章字）
+    r"^[第地][零一二三四五六七八九十百千万两份]+\s+\S+",  # 第一百二十三 标题
+    r"^Chapter\s+\d+[：:\s]?.*",
+]
+
+CHAPTER_PATTERN = re.compile(
+    "|".join(f"({p})" for p in CHAPTER_PATTERNS), re.MULTILINE | re.IGNORECASE
+)
+
+# 上面所有模式可能的首字符（修改模式时需要同步维护）
+LEAD_CHARS = "第地Cc"
+
+# 候选行：换行符后紧跟首字符（无锚点的字符类扫描，由正则引擎快速跳过其他位置）
+_CANDIDATE = re.compile(f"\n[{LEAD_CHARS}]")
+
+
+def scan_chapter_titles(content: str) -> list[tuple[int, str]]:
+    """扫描章节标题，返回 [(标题起始偏移, 标题)]"""
+    titles = []
+    match_at = CHAPTER_PATTERN.match
+    last_end = 0
+
+    # 候选行首：全文开头 + 每个以首字符开头的行
+    positions = chain(
+        [0] if content and content[0] in LEAD_CHARS else [],
+        (candidate.start() + 1 for candidate in _CANDIDATE.finditer(content)),
+    )
+    for pos in positions:
+        # 与 finditer 一致：匹配不重叠（标题可能跨行吞掉下一行）
+        if pos < last_end:
+            continue
+        match = match_at(content, pos)
+        if match is None:
+            continue
+        title = match.group(0).strip()
+        if title:
+            titles.append((pos, title))
+        last_end = match.end()
+
+    return titles
+
+
+def detect_chapters(content: str) -> list[Chapter]:
+    """把全文切分为章节，每章从标题开始到下一章标题之前（含两端偏移）"""
+    titles = scan_chapter_titles(content)
+    ends = [start - 1 for start, _ in titles[1:]] + [len(content) - 1]
+    return [
+        Chapter(index=i, title=title, start=start, end=end)
+        for i, ((start, title), end) in enumerate(zip(titles, ends))
+    ]
@@ -0,0 +1,110 @@
+"""Per-chapter checkpointing for streaming character analysis.
+
+流式分析每完成一章就把结果追加到 characters/{name}/checkpoint_appearances.jsonl，
+并更新 checkpoint.json 头部；SSE 连接断开或服务重启后，按断点中的章节计划继续，
+已完成的章节不再调用模型。
+
+断点内容：
+- operation: analyze（首次分析）/ continue（继续分析）
+- chapters: 本次计划分析的章节（采样结果）
+- appearances: 已完成章节的分析结果（每章一行，读取时拼回）
+- llm_calls: 已完成章节中实际调用模型的次数
+
+首次分析时同时写入 analysis_status="analyzing" 的画像头部和逐章的出场记录，
+前端可以看到进度；已有完整分析的人物重新分析时不覆盖原画像。
+每章只写入该章的数据，写入量与已完成的章节数无关。
+"""
+
+from bisect import insort
+from datetime import datetime
+
+from .book import BookManager
+from ..knowledge.models import CharacterAppearance, DetailedCharacter
+
+
+class AnalysisCheckpoint:
+    """观察分析事件流，逐章持久化进度"""
+
+    def __init__(
+        self,
+        book_id: str,
+        character_name: str,
+        operation: str,
+        resumed: dict | None = None,
+    ):
+        self.book_id = book_id
+        self.character_name = character_name
+        self.operation = operation
+        self.data = resumed or {
+            "operation": operation,
+            "chapters": [],
+            "appearances": [],
+            "llm_calls": 0,
+        }
+        self._found: list[int] = []
+
+        status = BookManager.get_character_status(book_id, character_name)
+        self._write_profile = operation == "analyze" and status in (None, "analyzing")
+        # 新开始的分析第一次写画像时清掉上次未完成分析留下的出场记录，之后每章只追加
+        self._replace_appearances = resumed is None
+        self._analyzed = sorted(a["chapter_index"] for a in self.data["appearances"])
+
+    @classmethod
+    def load(cls, book_id: str, character_name: str, operation: str) -> dict | None:
+        """读取指定操作类型的断点（类型不符或章节计划为空时视为无断点）"""
+        checkpoint = BookManager.get_checkpoint(book_id, character_name)
+        if not checkpoint or checkpoint.get("operation") != operation:
+            return None
+        if not checkpoint.get("chapters"):
+            return None
+        return checkpoint
+
+    @staticmethod
+    def restore(checkpoint: dict) -> tuple[list[CharacterAppearance], int]:
+        """从断点恢复已完成的章节分析和模型调用次数"""
+        appearances = [CharacterAppearance(**a) for a in checkpoint.get("appearances", [])]
+        return appearances, checkpoint.get("llm_calls", 0)
+
+    def observe(self, event: dict) -> None:
+        """处理一个分析事件"""
+        kind, data = event["event"], event["data"]
+
+        if kind == "search_complete":
+            self._found = data.get("found_in_chapters", [])
+        elif kind == "sample_info":
+            self.data["chapters"] = data.get("sample_chapters", [])
+            self._save()
+        elif kind == "continue_info":
+            self.data["chapters"] = data.get("chapters", [])
+            self._save()
+        elif kind == "chapter_analyzed":
+            appearance = data["appearance"]
+            self.data["appearances"].append(appearance)
+            self.data["llm_calls"] += not data.get("llm_skipped", False)
+            self.data["updated_at"] = datetime.now().isoformat()
+            BookManager.append_checkpoint_appearance(
+                self.book_id, self.character_name, self.data, appearance
+            )
+            if self._write_profile:
+                self._save_progress(CharacterAppearance(**appearance))
+        elif kind == "completed":
+            BookManager.delete_checkpoint(self.book_id, self.character_name)
+
+    def _save(self) -> None:
+        """确定章节计划时保存完整断点"""
+        self.data["updated_at"] = datetime.now().isoformat()
+        BookManager.save_checkpoint(self.book_id, self.character_name, self.data)
+
+    def _save_progress(self, appearance: CharacterAppearance) -> None:
+        """写入"分析中"画像的头部和这一章的出场记录"""
+        insort(self._analyzed, appearance.chapter_index)
+        BookManager.save_character_progress(self.book_id, DetailedCharacter(
+            name=self.character_name,
+            first_appearance=self._found[0] if self._found else -1,
+            last_appearance=self._found[-1] if self._found else -1,
+            total_chapters=len(self._found),
+            total_analyzed_chapters=len(self._analyzed),
+            analysis_status="analyzing",
+            analyzed_chapters=list(self._analyzed),
+        ), appearance, replace_appearances=self._replace_appearances)
+        self._replace_appearances = False
@@ -0,0 +1,126 @@
+"""Character-centric context extraction.
+
+按人物提及位置截取章节片段：以段落为单位，取每次提及前后若干段，
+相邻窗口合并，代替"从章节开头截断到固定长度"的做法。
+人物只在章末出现一段时，prompt 只包含那一段附近的内容，且不会被截断丢失。
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+
+# 片段之间的省略标记
+GAP_MARKER = "\n……\n"
+
+# 节选长度超过全文该比例时直接使用全文（节选收益太小）
+FULL_CHAPTER_RATIO = 0.7
+
+
+@dataclass
+class ContextExcerpt:
+    """章节节选结果"""
+    text: str
+    is_excerpt: bool          # False 表示使用的是完整章节
+    paragraphs: int           # 选中的段落数
+    source_length: int        # 原章节长度
+
+
+def _split_paragraphs(content: str) -> list[tuple[int, int]]:
+    """按行切分非空段落，返回 (start, end) 偏移"""
+    paragraphs = []
+    pos = 0
+    for line in content.split("\n"):
+        end = pos + len(line)
+        if line.strip():
+            paragraphs.append((pos, end))
+        pos = end + 1
+    return paragraphs
+
+
+def _merge_windows(
+    centers: list[int], window: int, merge_gap: int, last: int
+) -> list[tuple[int, int]]:
+    """把提及段落扩展为 [i-window, i+window] 并合并相邻/重叠窗口"""
+    blocks: list[tuple[int, int]] = []
+    for c in centers:
+        lo, hi = max(0, c - window), min(last, c + window)
+        if blocks and lo - blocks[-1][1] <= merge_gap + 1:
+            blocks[-1] = (blocks[-1][0], max(blocks[-1][1], hi))
+        else:
+            blocks.append((lo, hi))
+    return blocks
+
+
+def _render(content: str, paragraphs: list[tuple[int, int]], blocks: list[tuple[int, int]]) -> str:
+    parts = []
+    for lo, hi in blocks:
+        parts.append("\n".join(content[s:e] for s, e in paragraphs[lo:hi + 1]))
+    return GAP_MARKER.join(parts)
+
+
+def extract_character_context(
+    content: str,
+    spans: list[tuple[int, int]],
+    max_length: int,
+    window: int = 2,
+    merge_gap: int = 1,
+) -> ContextExcerpt:
+    """截取人物提及附近的段落
+
+    Args:
+        content: 章节全文
+        spans: 人物名在 content 中的 (start, end) 偏移
+        max_length: 节选最大长度
+        window: 每次提及向前/向后扩展的段落数
+        merge_gap: 两个窗口之间间隔不超过该段落数时合并为一段
+
+    超过 max_length 时依次缩小窗口；窗口为 0 仍超长时，
+    在所有提及段落中均匀抽取，保证每个保留的片段都包含人物本身。
+    """
+    source_length = len(content)
+    paragraphs = _split_paragraphs(content)
+    starts = [s for s, _ in paragraphs]
+
+    centers = sorted({
+        bisect_right(starts, start) - 1 for start, _ in spans
+    } - {-1})
+
+    if not centers:
+        # 没有提及位置（不应发生），退回旧的截断方式
+        text = content[:max_length]
+        return ContextExcerpt(text, len(text) < source_length, 0, source_length)
+
+    last = len(paragraphs) - 1
+    for w in range(max(window, 0), -1, -1):
+        blocks = _merge_windows(centers, w, merge_gap, last)
+        text = _render(content, paragraphs, blocks)
+        if len(text) <= max_length:
+            break
+    else:
+        # 提及段落本身就超出预算：均匀抽取提及段落
+        sizes = {c: paragraphs[c][1] - paragraphs[c][0] + len(GAP_MARKER) for c in centers}
+        step = max(1, -(-sum(sizes.values()) // max_length))
+        kept: list[int] = []
+        used = 0
+        for c in centers[::step]:
+            size = sizes[c]
+            if kept and used + size > max_length:
+                break
+            kept.append(c)
+            used += size
+        blocks = [(c, c) for c in kept]
+        text = _render(content, paragraphs, blocks)
+        if len(text) > max_length:
+            # 只剩一个提及段落且它本身超长：以段内第一次提及为中心截取，而不是截取段首
+            p_start, p_end = paragraphs[kept[0]]
+            m_start, m_end = min(
+                ((s, e) for s, e in spans if p_start <= s < p_end), default=(p_start, p_start)
+            )
+            lo = m_start - (max_length - (m_end - m_start)) // 2
+            lo = min(max(p_start, lo), p_end - max_length)
+            text = content[lo:lo + max_length]
+
+    selected = sum(hi - lo + 1 for lo, hi in blocks)
+    if source_length <= max_length and len(text) >= source_length * FULL_CHAPTER_RATIO:
+        return ContextExcerpt(content, False, len(paragraphs), source_length)
+
+    return ContextExcerpt(text, True, selected, source_length)
@@ -0,0 +1,145 @@
+"""Character co-occurrence graph.
+
+基于人物提及索引在本地计算全书人物共现（不调用模型）：
+- 段落级：两人在同一段落出现的段落数（强关联）
+- 章节级：两人在同一章节出现的章节数（弱关联）
+- 时间切片：按章节顺序把全书切成若干段，统计每段的段落级共现，用于观察关系演变
+
+只记录实际共现过的人物对（稀疏存储），计算量与提及次数成正比，与人物数的平方无关。
+"""
+
+import re
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from .aliases import AliasRegistry
+from .book import Book, BookManager
+from .mentions import build_mention_indexes
+from ..config import settings
+from ..knowledge.models import CooccurrenceEdge, CooccurrenceGraph, CooccurrenceNode
+
+# 最近计算结果缓存：(book_id, 切片数, 人物称呼) -> 共现图
+_cache: dict[tuple, CooccurrenceGraph] = {}
+_CACHE_SIZE = 16
+
+
+def evict(book_id: str) -> None:
+    """清除某本书的缓存结果（书籍被删除或重新上传时）"""
+    for key in [k for k in _cache if k[0] == book_id]:
+        del _cache[key]
+
+
+def character_forms(book_id: str, names: list[str] | None = None) -> dict[str, list[str]]:
+    """收集参与共现计算的人物及其全部称呼
+
+    未指定 names 时使用人物发现结果（排除模型否定的候选）和已分析人物。
+    """
+    registry = AliasRegistry.load(book_id)
+    if names is None:
+        names = [m.name for m in BookManager.get_cast(book_id) if m.confirmed is not False]
+        names += BookManager.get_character_names(book_id)
+
+    characters: dict[str, list[str]] = {}
+    for name in names:
+        canonical = registry.canonical(name)
+        if canonical and canonical not in characters:
+            characters[canonical] = registry.surface_forms(canonical)
+    return characters
+
+
+def _slice_ranges(total_chapters: int, slices: int) -> list[list[int]]:
+    slices = max(1, min(slices, total_chapters))
+    bounds = [total_chapters * i // slices for i in range(slices + 1)]
+    return [[bounds[i], bounds[i + 1] - 1] for i in range(slices)]
+
+
+def compute_cooccurrence(
+    book: Book,
+    characters: dict[str, list[str]],
+    slices: int | None = None,
+) -> CooccurrenceGraph:
+    """计算人物共现图
+
+    Args:
+        characters: {规范名: [规范名, 别名...]}
+        slices: 时间切片数，默认 settings.cooccurrence_slices
+    """
+    slices = slices or settings.cooccurrence_slices
+    key = (book.id, slices, tuple(sorted((k, tuple(v)) for k, v in characters.items())))
+    if key in _cache:
+        return _cache[key]
+
+    total = len(book.chapters)
+    ranges = _slice_ranges(total, slices) if total else []
+    slice_starts = [lo for lo, _ in ranges]
+
+    indexes = build_mention_indexes(book, characters)
+
+    # 段落边界：换行符位置，段落编号 = 该位置之前的换行符个数
+    newlines = [m.start() for m in re.finditer("\n", book.content)]
+
+    # 倒排：段落/章节 -> 出现的人物
+    by_paragraph: dict[int, set[str]] = defaultdict(set)
+    paragraph_chapter: dict[int, int] = {}
+    by_chapter: dict[int, set[str]] = defaultdict(set)
+    nodes = []
+    for name, index in indexes.items():
+        if not index.spans:
+            continue
+        nodes.append(CooccurrenceNode(
+            name=name, mentions=index.total_mentions, chapter_count=len(index.spans)
+        ))
+        for chapter_index, spans in index.spans.items():
+            by_chapter[chapter_index].add(name)
+            for start, _ in spans:
+                p = bisect_right(newlines, start)
+                by_paragraph[p].add(name)
+                paragraph_chapter[p] = chapter_index
+
+    paragraph_counts: Counter[tuple[str, str]] = Counter()
+    slice_counts: dict[tuple[str, str], Counter[int]] = defaultdict(Counter)
+    for p, names in by_paragraph.items():
+        if len(names) < 2:
+            continue
+        s = bisect_right(slice_starts, paragraph_chapter[p]) - 1
+        for pair in combinations(sorted(names), 2):
+            paragraph_counts[pair] += 1
+            slice_counts[pair][s] += 1
+
+    chapter_counts: Counter[tuple[str, str]] = Counter()
+    for names in by_chapter.values():
+        if len(names) >= 2:
+            chapter_counts.update(combinations(sorted(names), 2))
+
+    chapter_weight = settings.cooccurrence_chapter_weight
+    edges = [
+        CooccurrenceEdge(
+            source=a,
+            target=b,
+            paragraph_count=paragraph_counts[(a, b)],
+            chapter_count=count,
+            weight=round(paragraph_counts[(a, b)] + chapter_weight * count, 2),
+            slices=[slice_counts[(a, b)][i] for i in range(len(ranges))],
+        )
+        for (a, b), count in chapter_counts.items()
+    ]
+    edges.sort(key=lambda e: e.weight, reverse=True)
+    nodes.sort(key=lambda n: n.mentions, reverse=True)
+
+    graph = CooccurrenceGraph(nodes=nodes, edges=edges, slice_ranges=ranges)
+    if len(_cache) >= _CACHE_SIZE:
+        _cache.pop(next(iter(_cache)))
+    _cache[key] = graph
+    return graph
+
+
+def neighbor_weights(graph: CooccurrenceGraph, name: str) -> dict[str, float]:
+    """某人物与其他人物的共现权重"""
+    weights = {}
+    for edge in graph.edges:
+        if edge.source == name:
+            weights[edge.target] = edge.weight
+        elif edge.target == name:
+            weights[edge.source] = edge.weight
+    return weights
@@ -0,0 +1,180 @@
+"""Local character candidate extraction.
+
+全书人物发现的本地阶段（不调用模型）：
+1. 姓氏 n-gram：常见姓氏 + 1~2 个汉字
+2. 对话归属：「XX说/道/问」「XX笑道」等句式中的说话人
+3. 按出现次数与章节分布打分排序
+
+结果只是候选，可再交给模型批量确认（见 ai/tasks/character_discovery.py）。
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from .book import Book
+
+# 常见单姓（去掉了"和、于、向、时、都、那、来"等作虚词时远多于作姓氏的字）
+SINGLE_SURNAMES = (
+    "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘蒋蔡余杜叶程苏魏吕丁任沈"
+    "姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵钱严覃武戴莫孔汤温康"
+    "施牛樊葛邢齐易乔伍庞颜倪庄聂章鲁岳翟殷詹申欧耿兰焦俞左柳甘祝包宁尚符舒阮柯纪梅童凌毕单季裴霍涂苗谷盛"
+    "曲翁冉骆蓝游辛靳管柴蒙鲍华喻祁蒲房滕屈饶牟艾尤穆农司卓古吉缪简项麦褚娄窦戚岑景党宫费卜冷晏席卫米柏宗"
+    "瞿桂佟臧闵苟邬边卞姬仇栾隋商刁沙荣巫寇桑郎甄丛仲虞敖巩佘池查麻苑迟邝封匡鞠惠荆冀郁胥楚鄢奚皮粟冼蔺"
+)
+
+# 复姓
+COMPOUND_SURNAMES = (
+    "欧阳", "司马", "上官", "诸葛", "东方", "皇甫", "尉迟", "公孙", "慕容", "长孙",
+    "宇文", "司徒", "夏侯", "轩辕", "令狐", "独孤", "南宫", "西门", "端木", "百里",
+)
+
+# 姓氏开头但通常不是人名的常用词
+NON_NAME_WORDS = frozenset((
+    "高兴", "高手", "高中", "高级", "高速", "王国", "王者", "张开", "张望", "白色", "白天", "白痴",
+    "金钱", "金色", "周围", "周末", "方面", "方向", "方法", "方便", "黄色", "林子", "马上", "马路",
+    "常常", "许多", "许久", "于是", "文化", "文字", "文件", "明白", "明天", "明显", "明明", "安全",
+    "安静", "安排", "平时", "平静", "平常", "时候", "时间", "路上", "路边", "江湖", "水平", "石头",
+    "万一", "成功", "成为", "成绩", "全部", "全身", "全都", "乐意", "和平", "和尚", "关系", "关心",
+    "关于", "管理", "向着", "车上", "车子", "门口", "门外", "国家", "云层", "海边", "花园", "强大",
+    "冷笑", "冷静", "温柔", "温度", "宁愿", "原来", "原因", "信息", "信任", "来说", "来到", "都是",
+    "那个", "那些", "那么", "那边", "云南", "华丽", "包括", "应该", "应当", "连忙", "连续", "曾经",
+    "任何", "任务", "于此", "余下", "程度", "苏醒", "齐声", "易容", "童年", "师父", "师傅", "师兄",
+    "师姐", "师妹", "公司", "公子", "公主", "公安", "元素", "富有", "展开", "解决", "解释", "代表",
+    "龙头", "严重", "严肃", "毕业", "毕竟", "施展", "计划", "计算", "宣布", "普通", "初中", "初次",
+    "雷声", "孔雀", "鲁莽", "兰花", "利用", "利益", "居然", "利害",
+))
+
+# 非人名的说话人（代词、泛称）
+NON_NAME_SPEAKERS = frozenset((
+    "我们", "你们", "他们", "她们", "大家", "有人", "那人", "这人", "对方", "众人", "男人", "女人",
+    "老头", "老人", "少年", "少女", "青年", "姑娘", "小伙", "司机", "医生", "老师", "警察", "同学",
+    "服务员", "旁边", "这时", "然后", "接着", "于是", "突然", "忽然", "终于", "笑着", "小声", "低声",
+    "淡淡", "冷冷", "连忙", "赶紧", "立刻", "继续", "也是", "还是", "就是", "只是", "却是",
+))
+
+# 名字后面不可能出现在人名里的字（用于剔除"赵秦的""赵秦说"之类的 3 字串）
+NON_NAME_TAIL = frozenset("的了说道是在和也就都把被对向给让跟与着过吗呢吧啊呀么这那一不有没还又很才")
+
+_SURNAME_PATTERN = re.compile(
+    "(?=(" + "|".join(COMPOUND_SURNAMES) + "|[" + SINGLE_SURNAMES + "])([一-鿿]{1,2}))"
+)
+_SPEAKER_PATTERN = re.compile(
+    r"(?<![一-鿿])([一-鿿]{2,3}?)"
+    r"(?:笑道|笑着说|说道|问道|喊道|叫道|骂道|答道|冷笑道|冷声道|低声道|说|道|问)"
+    r"[：:，,]?\s*[“\"「]"
+)
+
+# 3 字串占其 2 字前缀的比例超过该值时，认为名字是 3 个字
+THREE_CHAR_RATIO = 0.7
+
+
+@dataclass
+class CharacterCandidate:
+    """人物候选"""
+    name: str
+    mentions: int
+    chapters: int
+    first_chapter: int
+    dialogue_mentions: int = 0
+
+    def score(self, total_chapters: int) -> float:
+        """出现次数（对数）× 章节分布，对话归属额外加分"""
+        spread = math.sqrt(self.chapters / max(total_chapters, 1))
+        return (math.log1p(self.mentions) + 0.5 * math.log1p(self.dialogue_mentions)) * spread
+
+
+def _is_valid_name(name: str) -> bool:
+    if name in NON_NAME_WORDS or name[:2] in NON_NAME_WORDS:
+        return False
+    return name[-1] not in NON_NAME_TAIL
+
+
+def extract_candidates(
+    book: Book,
+    top_n: int = 100,
+    min_mentions: int = 5,
+) -> list[CharacterCandidate]:
+    """扫描全书提取人物候选，按分数降序返回前 top_n 个"""
+    mentions: Counter[str] = Counter()
+    chapters: Counter[str] = Counter()
+    dialogue: Counter[str] = Counter()
+    first_chapter: dict[str, int] = {}
+
+    for chapter in book.chapters:
+        content = book.content[chapter.start:chapter.end + 1]
+        local: Counter[str] = Counter()
+        for m in _SURNAME_PATTERN.finditer(content):
+            surname, given = m.group(1), m.group(2)
+            # 同一位置同时计数"姓+1字"和"姓+2字"，后面再决定名字长度
+            local[surname + given[0]] += 1
+            if len(given) == 2:
+                local[surname + given] += 1
+        speakers = Counter(
+            m.group(1) for m in _SPEAKER_PATTERN.finditer(content)
+            if m.group(1) not in NON_NAME_SPEAKERS
+        )
+        dialogue.update(speakers)
+        for name in speakers:
+            # 无姓氏的称呼（昵称、外号）只能通过对话归属发现，单独计数
+            if name not in local:
+                local[name] = content.count(name)
+        mentions.update(local)
+        chapters.update(local.keys())
+        for name in local:
+            first_chapter.setdefault(name, chapter.index)
+
+    # 每个短名最常见的一字扩展（如 "张小" -> "张小明"）
+    best_extension: dict[str, int] = {}
+    for name, count in mentions.items():
+        if len(name) >= 3 and _is_valid_name(name):
+            prefix = name[:-1]
+            best_extension[prefix] = max(best_extension.get(prefix, 0), count)
+
+    # 名字长度取舍：扩展占前缀大多数时保留长名，否则保留短名
+    names = set()
+    for name, count in mentions.items():
+        if count < min_mentions or not _is_valid_name(name):
+            continue
+        prefix_count = mentions.get(name[:-1], 0)
+        if len(name) >= 3 and prefix_count and count < prefix_count * THREE_CHAR_RATIO:
+            continue
+        if best_extension.get(name, 0) >= count * THREE_CHAR_RATIO:
+            continue
+        names.add(name)
+
+    candidates = [
+        CharacterCandidate(
+            name=name,
+            mentions=mentions[name],
+            chapters=chapters[name],
+            first_chapter=first_chapter[name],
+            dialogue_mentions=dialogue.get(name, 0),
+        )
+        for name in names
+    ]
+    total = len(book.chapters)
+    candidates.sort(key=lambda c: c.score(total), reverse=True)
+    return _drop_overlaps(book, candidates, top_n)
+
+
+def _drop_overlaps(
+    book: Book, candidates: list[CharacterCandidate], top_n: int
+) -> list[CharacterCandidate]:
+    """剔除由更强人物名的尾字拼出来的伪候选（如 "赵秦走" 中的 "秦走"）"""
+    kept: list[CharacterCandidate] = []
+    for candidate in candidates:
+        if len(kept) >= top_n:
+            break
+        overlapping = [
+            k for k in kept
+            if k.mentions >= candidate.mentions and k.name[-1] == candidate.name[0]
+        ]
+        if any(
+            book.content.count(k.name[:-1] + candidate.name) >= candidate.mentions / 2
+            for k in overlapping
+        ):
+            continue
+        kept.append(candidate)
+    return kept
@@ -0,0 +1,134 @@
+"""Character mention index.
+
+一次正则扫描全书，记录人物名在每个章节中的出现位置，
+供搜索、采样打分、上下文截取等本地计算复用（不调用模型）。
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from ..knowledge.models import CharacterSearchResult
+from .book import Book
+
+# 对话标记：引号
+QUOTE_MARKERS = ("“", "”", "「", "」", "\"")
+
+# 说话动词（人物名后紧跟这些字，通常表示该人物在说话）
+SPEECH_VERBS = ("说", "道", "问", "喊", "叫", "笑", "骂", "答", "吼", "嚷", "低声", "冷声")
+
+
+@dataclass
+class MentionIndex:
+    """人物名在全书中的出现位置
+
+    spans 中的 (start, end) 是 book.content 上的绝对偏移，按章节分组。
+    """
+    names: list[str]
+    spans: dict[int, list[tuple[int, int]]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, book: Book, names: list[str]) -> "MentionIndex":
+        """单次扫描全书构建索引"""
+        index = cls(names=list(names))
+        surface_forms = sorted({n for n in names if n}, key=len, reverse=True)
+        if not surface_forms or not book.chapters:
+            return index
+
+        # 长名优先，避免短名抢先匹配长名的前缀
+        pattern = re.compile("|".join(re.escape(n) for n in surface_forms))
+        starts = [ch.start for ch in book.chapters]
+
+        for match in pattern.finditer(book.content):
+            pos = match.start()
+            i = bisect_right(starts, pos) - 1
+            if i < 0 or pos > book.chapters[i].end:
+                continue  # 章节之前的书名/作者信息
+            index.spans.setdefault(book.chapters[i].index, []).append(
+                (pos, match.end())
+            )
+
+        return index
+
+    @property
+    def chapter_indices(self) -> list[int]:
+        """出现过的章节（升序）"""
+        return sorted(self.spans)
+
+    @property
+    def total_mentions(self) -> int:
+        return sum(len(s) for s in self.spans.values())
+
+    def count(self, chapter_index: int) -> int:
+        return len(self.spans.get(chapter_index, []))
+
+    def chapter_spans(self, book: Book, chapter_index: int) -> list[tuple[int, int]]:
+        """某章节内的提及位置（相对章节开头的偏移）"""
+        offset = book.chapters[chapter_index].start
+        return [(s - offset, e - offset) for s, e in self.spans.get(chapter_index, [])]
+
+    def to_search_result(self, book: Book, name: str) -> CharacterSearchResult:
+        found = self.chapter_indices
+        return CharacterSearchResult(
+            name=name,
+            found_in_chapters=found,
+            chapter_titles=[book.chapters[i].title for i in found],
+            total_mentions=self.total_mentions,
+        )
+
+
+def is_dialogue_mention(text: str, start: int, end: int, window: int = 30) -> bool:
+    """判断一次提及附近是否有对话（引号或紧随的说话动词）"""
+    after = text[end:end + 6]
+    if any(after.startswith(v) or after[1:].startswith(v) for v in SPEECH_VERBS):
+        return True
+    nearby = text[max(0, start - window):end + window]
+    return any(m in nearby for m in QUOTE_MARKERS)
+
+
+def is_mentioned_only(
+    text: str,
+    spans: list[tuple[int, int]],
+    max_mentions: int = 2,
+) -> bool:
+    """判断人物在本章是否只是被提及（无实际出场）
+
+    启发式规则：提及次数不超过 max_mentions，且没有任何一次提及带有对话特征
+    （附近有引号，或名字后紧跟说话动词）。
+    """
+    if not spans or len(spans) > max_mentions:
+        return False
+    return not any(is_dialogue_mention(text, start, end) for start, end in spans)
+
+
+def build_mention_indexes(
+    book: Book, characters: dict[str, list[str]]
+) -> dict[str, MentionIndex]:
+    """单次扫描全书，同时为多个人物构建索引
+
+    Args:
+        characters: {规范名: [规范名, 别名...]}；同一称呼只归属第一个出现的人物
+    """
+    owner: dict[str, str] = {}
+    for name, forms in characters.items():
+        for form in forms or [name]:
+            if form:
+                owner.setdefault(form, name)
+
+    indexes = {name: MentionIndex(names=list(forms or [name])) for name, forms in characters.items()}
+    if not owner or not book.chapters:
+        return indexes
+
+    pattern = re.compile("|".join(re.escape(f) for f in sorted(owner, key=len, reverse=True)))
+    starts = [ch.start for ch in book.chapters]
+
+    for match in pattern.finditer(book.content):
+        pos = match.start()
+        i = bisect_right(starts, pos) - 1
+        if i < 0 or pos > book.chapters[i].end:
+            continue
+        indexes[owner[match.group()]].spans.setdefault(book.chapters[i].index, []).append(
+            (pos, match.end())
+        )
+
+    return indexes
@@ -0,0 +1,109 @@
+"""Relevance-ranked chapter sampling.
+
+按本地可计算的信号给人物出现的章节打分，再在保证全书覆盖的前提下
+优先选择高分章节，让同样的 LLM 预算花在信息量更大的章节上。
+
+打分信号（均为纯文本统计）：
+- 提及次数：人物名在本章出现的次数
+- 对话密度：提及附近有引号或说话动词的次数
+- 共现人物：本章同时出现的其他主要人物数
+"""
+
+import math
+from dataclasses import dataclass
+
+from .book import Book
+from .mentions import MentionIndex, is_dialogue_mention
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 各信号权重（对数缩放后相加）
+MENTION_WEIGHT = 1.0
+DIALOGUE_WEIGHT = 1.5
+COOCCURRENCE_WEIGHT = 0.8
+
+
+@dataclass
+class ChapterScore:
+    """单章相关度"""
+    chapter_index: int
+    mentions: int
+    dialogue_mentions: int
+    cooccurring: int
+
+    @property
+    def score(self) -> float:
+        return (
+            MENTION_WEIGHT * math.log1p(self.mentions)
+            + DIALOGUE_WEIGHT * math.log1p(self.dialogue_mentions)
+            + COOCCURRENCE_WEIGHT * math.log1p(self.cooccurring)
+        )
+
+
+def score_chapters(
+    book: Book,
+    index: MentionIndex,
+    other_names: list[str] | None = None,
+) -> dict[int, ChapterScore]:
+    """计算人物出现的每个章节的相关度"""
+    others = [n for n in (other_names or []) if n and n not in index.names]
+    scores: dict[int, ChapterScore] = {}
+
+    for chapter_index, spans in index.spans.items():
+        chapter = book.chapters[chapter_index]
+        content = book.content[chapter.start:chapter.end + 1]
+        dialogue = sum(
+            1 for start, end in spans
+            if is_dialogue_mention(content, start - chapter.start, end - chapter.start)
+        )
+        cooccurring = sum(1 for name in others if name in content)
+        scores[chapter_index] = ChapterScore(
+            chapter_index=chapter_index,
+            mentions=len(spans),
+            dialogue_mentions=dialogue,
+            cooccurring=cooccurring,
+        )
+
+    return scores
+
+
+def sample_by_relevance(
+    scores: dict[int, ChapterScore],
+    max_chapters: int,
+    coverage_ratio: float = 0.5,
+) -> list[int]:
+    """按相关度采样章节
+
+    采样策略：
+    - 如果章节数 <= max_chapters，返回全部
+    - 首次出场章节必选
+    - coverage_ratio 比例的名额用于覆盖：按位置均分为若干段，每段取最高分章节
+    - 剩余名额按全局分数从高到低补齐
+    """
+    found = sorted(scores)
+    total = len(found)
+    if total <= max_chapters:
+        return found
+
+    selected = {found[0]}
+
+    # 覆盖：分段取每段最优（预留首次出场章节的名额，总数不超过 max_chapters）
+    buckets = min(max_chapters - 1, max(1, int(max_chapters * coverage_ratio)))
+    for b in range(buckets):
+        segment = found[b * total // buckets:(b + 1) * total // buckets]
+        if segment:
+            selected.add(max(segment, key=lambda i: scores[i].score))
+
+    # 补齐：全局高分优先
+    for idx in sorted(found, key=lambda i: scores[i].score, reverse=True):
+        if len(selected) >= max_chapters:
+            break
+        selected.add(idx)
+
+    sampled = sorted(selected)
+    logger.info(
+        f"Relevance sampling: {total} chapters -> {len(sampled)} samples "
+        f"(range: {found[0]}-{found[-1]}, coverage buckets: {buckets})"
+    )
+    return sampled
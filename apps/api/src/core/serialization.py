@@ -0,0 +1,128 @@
+"""Compact serialization for stored analysis artifacts.
+
+章节分析、人物画像（analysis.db 中的数据）和拆分后的章节文件按 settings.storage_format 编码：
+
+- json:    紧凑 JSON（无缩进，默认）
+- zstd:    zstd 压缩的紧凑 JSON（需要 zstandard）
+- msgpack: MessagePack（需要 msgpack）
+
+读取时按内容首字节自动识别格式，新旧格式（包括 indent=2 的旧 JSON）可以混存，
+切换格式不需要迁移已有数据。可选依赖未安装时写入回退为 json。
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from ..config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STORAGE_FORMATS = ("json", "zstd", "msgpack")
+
+# 章节文件扩展名（读取时按顺序查找）
+FILE_SUFFIXES = {"json": ".json", "zstd": ".json.zst", "msgpack": ".msgpack"}
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+_warned: set[str] = set()
+
+
+def _zstd():
+    import zstandard
+    return zstandard
+
+
+def _msgpack():
+    import msgpack
+    return msgpack
+
+
+def resolve_format(fmt: str | None = None) -> str:
+    """实际使用的写入格式（可选依赖缺失时回退为 json）"""
+    fmt = fmt or settings.storage_format
+    if fmt not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown storage format: {fmt}")
+    if fmt == "json":
+        return fmt
+    try:
+        _zstd() if fmt == "zstd" else _msgpack()
+    except ImportError:
+        if fmt not in _warned:
+            _warned.add(fmt)
+            logger.warning(f"Storage format '{fmt}' unavailable (package not installed), using json")
+        return "json"
+    return fmt
+
+
+def encode(data: BaseModel | dict | list, fmt: str | None = None, **dump_kwargs) -> str | bytes:
+    """编码为存储格式：json 返回 str，其他格式返回 bytes
+
+    dump_kwargs 传给 model_dump/model_dump_json（如 exclude）。
+    """
+    fmt = resolve_format(fmt)
+
+    if fmt == "msgpack":
+        if isinstance(data, BaseModel):
+            data = data.model_dump(mode="json", **dump_kwargs)
+        return _msgpack().packb(data, use_bin_type=True)
+
+    if isinstance(data, BaseModel):
+        text = data.model_dump_json(**dump_kwargs)
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    if fmt == "zstd":
+        return _zstd().ZstdCompressor(level=settings.storage_zstd_level).compress(text.encode("utf-8"))
+    return text
+
+
+def json_bytes(raw: str | bytes) -> bytes | None:
+    """JSON 类格式（json/zstd）返回 JSON 字节，可直接交给 model_validate_json；msgpack 返回 None"""
+    if isinstance(raw, str):
+        return raw.encode("utf-8")
+    if raw.startswith(ZSTD_MAGIC):
+        return _zstd().ZstdDecompressor().decompress(raw)
+    if raw.lstrip()[:1] in (b"{", b"["):
+        return raw
+    return None
+
+
+def decode(raw: str | bytes) -> Any:
+    """解码任意存储格式（按首字节识别）"""
+    data = json_bytes(raw)
+    if data is not None:
+        return json.loads(data)
+    return _msgpack().unpackb(raw, raw=False)
+
+
+def write_file(base_path: Path, data: BaseModel | dict | list, fmt: str | None = None) -> Path:
+    """写入文件，base_path 不含扩展名，返回实际路径（同名的其他格式文件会被删除）"""
+    fmt = resolve_format(fmt)
+    encoded = encode(data, fmt)
+    path = base_path.with_name(base_path.name + FILE_SUFFIXES[fmt])
+    if isinstance(encoded, str):
+        path.write_text(encoded, encoding="utf-8")
+    else:
+        path.write_bytes(encoded)
+
+    for other, suffix in FILE_SUFFIXES.items():
+        if other != fmt:
+            base_path.with_name(base_path.name + suffix).unlink(missing_ok=True)
+    return path
+
+
+def find_file(base_path: Path) -> Path | None:
+    """查找任意格式的文件"""
+    for suffix in FILE_SUFFIXES.values():
+        path = base_path.with_name(base_path.name + suffix)
+        if path.exists():
+            return path
+    return None
+
+
+def read_file(path: Path) -> Any:
+    """读取任意格式的文件"""
+    return decode(path.read_bytes())
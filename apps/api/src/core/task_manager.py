@@ -0,0 +1,156 @@
+"""Server-side character analysis runs.
+
+人物分析作为服务端任务运行，不再绑定在 SSE 响应生成器里：
+- 按 (book_id, 人物名) 去重：同一人物同时只有一个分析在跑，重复请求直接附着到已有任务
+- 事件按序保存在内存中，SSE 连接附着时先回放历史事件，再跟随实时事件
+- 浏览器刷新、关闭标签页只断开连接，不会取消分析
+
+任务只存在于当前进程内（单进程部署）；进程重启后通过断点恢复（见 core/checkpoint.py）。
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Callable
+
+from ..config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class AnalysisRun:
+    """一次人物分析任务"""
+    book_id: str
+    character_name: str
+    operation: str
+    events: list[dict] = field(default_factory=list)
+    done: bool = False
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: datetime | None = None
+    task: asyncio.Task | None = None
+    _changed: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+    async def _publish(self, event: dict | None) -> None:
+        async with self._changed:
+            if event is None:
+                self.done = True
+                self.finished_at = datetime.now()
+            else:
+                self.events.append(event)
+            self._changed.notify_all()
+
+    async def _pump(self, events: AsyncIterator[dict]) -> None:
+        try:
+            async for event in events:
+                await self._publish(event)
+        except asyncio.CancelledError:
+            await self._publish({"event": "error", "data": {"message": "分析已取消"}})
+            raise
+        except Exception as e:
+            logger.error(
+                f"Analysis run failed: {self.book_id}/{self.character_name}: {e}", exc_info=True
+            )
+            await self._publish({"event": "error", "data": {"message": str(e)}})
+        finally:
+            await self._publish(None)
+
+    async def follow(self, start: int = 0) -> AsyncGenerator[tuple[int, dict], None]:
+        """回放 start 之后的历史事件，然后跟随实时事件直到任务结束
+
+        产出 (事件序号, 事件)，序号可作为 SSE 的 id 用于断线重连。
+        """
+        i = max(0, start)
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: i < len(self.events) or self.done)
+                pending = self.events[i:]
+                finished = self.done
+            for event in pending:
+                yield i, event
+                i += 1
+            if finished and i >= len(self.events):
+                return
+
+    def info(self) -> dict:
+        return {
+            "book_id": self.book_id,
+            "name": self.character_name,
+            "operation": self.operation,
+            "done": self.done,
+            "events": len(self.events),
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class AnalysisTaskManager:
+    """进程内的人物分析任务表"""
+
+    _runs: dict[tuple[str, str], AnalysisRun] = {}
+
+    @classmethod
+    def _prune(cls) -> None:
+        """清理超过保留时间的已结束任务"""
+        now = datetime.now()
+        expired = [
+            key for key, run in cls._runs.items()
+            if run.done and run.finished_at
+            and (now - run.finished_at).total_seconds() > settings.analysis_run_retention
+        ]
+        for key in expired:
+            del cls._runs[key]
+
+    @classmethod
+    def get(cls, book_id: str, character_name: str) -> AnalysisRun | None:
+        """获取任务（含保留期内已结束的任务）"""
+        cls._prune()
+        return cls._runs.get((book_id, character_name))
+
+    @classmethod
+    def get_active(cls, book_id: str, character_name: str) -> AnalysisRun | None:
+        """获取正在运行的任务"""
+        run = cls.get(book_id, character_name)
+        return run if run and not run.done else None
+
+    @classmethod
+    def start(
+        cls,
+        book_id: str,
+        character_name: str,
+        operation: str,
+        events: Callable[[], AsyncIterator[dict]],
+    ) -> tuple[AnalysisRun, bool]:
+        """启动分析任务；同一人物已有任务在运行时直接返回该任务
+
+        Args:
+            events: 产生分析事件的工厂函数，只在真正新建任务时调用
+
+        Returns:
+            (任务, 是否新建)
+        """
+        active = cls.get_active(book_id, character_name)
+        if active:
+            logger.info(f"Attaching to running analysis: {book_id}/{character_name}")
+            return active, False
+
+        run = AnalysisRun(book_id, character_name, operation)
+        run.task = asyncio.create_task(run._pump(events()))
+        cls._runs[(book_id, character_name)] = run
+        logger.info(f"Started {operation} analysis: {book_id}/{character_name}")
+        return run, True
+
+    @classmethod
+    def cancel(cls, book_id: str, character_name: str) -> bool:
+        """取消正在运行的任务（已完成的章节保留在断点中）"""
+        run = cls.get_active(book_id, character_name)
+        if not run or not run.task:
+            return False
+        run.task.cancel()
+        return True
+
+    @classmethod
+    def list_runs(cls, book_id: str) -> list[AnalysisRun]:
+        cls._prune()
+        return [run for (b, _), run in cls._runs.items() if b == book_id]
@@ -53,7 +53,7 @@ class CharacterAppearance(BaseModel):
     interactions: list[CharacterInteraction] = []  # 结构化互动记录
     quote: str = ""                   # 该人物的代表性台词（原话）
     # 第一人称视角分析
-    narrator_bias: str = ""           # 张成对该人物态度：positive/neutral/negative/unclear
+    narrator_bias: str = ""           # 叙述者对该人物态度：positive/neutral/negative/unclear
     # 章节分析
     emotional_state: str = ""         # 该人物在本章的情感/心理状态
     chapter_significance: str = ""    # 本章对人物发展的重要性：low/medium/high
@@ -177,11 +177,60 @@ class DetailedCharacter(BaseModel):
     analysis_status: str = "pending"  # pending/searching/analyzing/completed/error
     analyzed_chapters: list[int] = [] # 已分析的章节
     error_message: str = ""
+    incremental_refreshes: int = 0    # 自上次全量重建总结以来的增量刷新次数
 
     # 分析元数据（新增）
     analysis_confidence: str = ""     # 整体分析可信度：high/medium/low
     analysis_limitations: str = ""    # 分析局限性说明
     discovered_characters: list[str] = []  # 分析过程中发现的关联人物（供后续分析）
+    analysis_stats: dict = {}         # 分析统计（模型调用次数、跳过的调用等）
+
+
+class CastMember(BaseModel):
+    """全书人物发现结果（人物表中的一项）"""
+    name: str
+    aliases: list[str] = []
+    mentions: int = 0                 # 全书提及次数（含别名）
+    chapter_count: int = 0            # 出现章节数
+    first_chapter: int = -1           # 首次出现章节
+    dialogue_mentions: int = 0        # 作为说话人出现的次数
+    score: float = 0.0                # 本地排序分数
+    confirmed: bool | None = None     # 模型确认结果，None = 未确认
+    role: str = "unknown"             # protagonist/antagonist/supporting/minor
+    description: str = ""             # 一句话简介（模型确认时生成）
+
+
+class AnalysisProfile(BaseModel):
+    """书籍分析配置：叙述视角等，编译为人物分析 prompt 中的背景说明"""
+    pov: str = "unknown"              # 叙述视角：first_person/third_person/unknown
+    narrator: str = ""                # 第一人称叙述者姓名（未知则留空）
+    genre_hints: list[str] = []       # 题材提示，如 ["校园", "青春"]
+    notes: str = ""                   # 其他分析注意事项
+    detected: bool = False            # True = 本地自动检测结果，未手动配置
+
+
+class CooccurrenceNode(BaseModel):
+    """共现图节点"""
+    name: str
+    mentions: int = 0                 # 全书提及次数（含别名）
+    chapter_count: int = 0            # 出现章节数
+
+
+class CooccurrenceEdge(BaseModel):
+    """共现图的边（无向，source < target）"""
+    source: str
+    target: str
+    paragraph_count: int = 0          # 同段出现的段落数
+    chapter_count: int = 0            # 同章出现的章节数
+    weight: float = 0.0               # 综合权重
+    slices: list[int] = []            # 按时间切片的同段共现次数
+
+
+class CooccurrenceGraph(BaseModel):
+    """全书人物共现图（本地计算，不调用模型）"""
+    nodes: list[CooccurrenceNode] = []
+    edges: list[CooccurrenceEdge] = []
+    slice_ranges: list[list[int]] = []  # 每个切片覆盖的 [起始章节, 结束章节]
 
 
 class Event(BaseModel):
@@ -4,7 +4,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .routers import books, analysis, rag
+from .routers import books, analysis, llm, rag
+from .utils.compression import CompressionMiddleware
 
 app = FastAPI(
     title="Book Insight API",
@@ -19,12 +20,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+    expose_headers=["X-Next-Cursor", "X-Next-Chapter", "X-Total-Chapters", "Link"],  # 分页游标、预取提示
+)
+
+# 响应压缩（gzip，安装 brotli 后优先 br），NDJSON/纯文本流逐块压缩，SSE 不压缩
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
 )
 
 # Routers
 app.include_router(books.router, prefix="/api/books", tags=["books"])
 app.include_router(analysis.router, prefix="/api/analysis", tags=["analysis"])
 app.include_router(rag.router, prefix="/api/rag", tags=["rag"])
+app.include_router(llm.router, prefix="/api/llm", tags=["llm"])
 
 
 @app.get("/api/health")
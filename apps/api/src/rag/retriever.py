@@ -57,6 +57,7 @@ class RAGRetriever:
             system="你是一个专业的小说分析助手。基于提供的原文片段，准确回答问题。",
             max_tokens=2048,
             temperature=0.5,
+            feature="rag",
         )
 
         return results, answer
@@ -1,20 +1,44 @@
 """Analysis routes."""
 
+import base64
+import binascii
 import json
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import AsyncGenerator, AsyncIterator
+
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from ..config import settings
+from ..core.aliases import AliasRegistry, merge_character_profiles
 from ..core.book import BookManager
+from ..core.checkpoint import AnalysisCheckpoint
+from ..core.task_manager import AnalysisRun, AnalysisTaskManager
+from ..core.cooccurrence import character_forms, compute_cooccurrence
+from ..ai.resilience import LLMResponseError
+from ..ai.scheduler import llm_priority
+from ..ai.telemetry import collect_usage
 from ..ai.tasks.chapter import ChapterAnalyzer
 from ..ai.tasks.character_analyzer import CharacterOnDemandAnalyzer
-from ..knowledge.models import ChapterAnalysis, CharacterSearchResult, DetailedCharacter
+from ..ai.tasks.character_discovery import CharacterDiscovery
+from ..knowledge.models import (
+    CastMember,
+    ChapterAnalysis,
+    CharacterSearchResult,
+    CooccurrenceGraph,
+    DetailedCharacter,
+)
+from ..utils.http_cache import conditional_response, file_version, make_etag
+from ..utils.responses import dump_models, json_response
 from ..utils.validators import validate_character_name
 from ..utils.logger import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+# 列表端点分页的每页最大条数
+MAX_PAGE_SIZE = 500
+
 
 class AnalyzeChapterRequest(BaseModel):
     """Request to analyze a chapter."""
@@ -33,31 +57,141 @@ class CharacterSearchRequest(BaseModel):
     name: str
 
 
+class CharacterDiscoverRequest(BaseModel):
+    """Request to discover characters across the whole book."""
+    top_n: int = 100
+    confirm: bool = True
+    register_aliases: bool = False
+
+
+class CharacterAliasRequest(BaseModel):
+    """Request to register aliases of a character."""
+    name: str
+    aliases: list[str]
+
+
+class CharacterMergeRequest(BaseModel):
+    """Request to merge a duplicate character into its canonical name."""
+    name: str
+    duplicate: str
+
+
 class CharacterAnalyzeRequest(BaseModel):
     """Request to analyze character."""
     name: str
     max_chapters: int = 100
+    skip_mentioned_only: bool | None = None  # None 使用配置 SKIP_MENTIONED_ONLY
+
+
+def _parse_fields(fields: str | None, model: type[BaseModel]) -> set[str] | None:
+    """解析字段投影参数（逗号分隔），未知字段返回 400"""
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+
+def _encode_cursor(value: str) -> str:
+    """分页游标：上一页最后位置的 URL 安全 base64（人物名含中文，不能直接放进响应头）"""
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _analysis_files_version(book_id: str, *names: str) -> tuple:
+    """analysis/{book_id}/ 下 JSON 文件的版本"""
+    return tuple(file_version(settings.analysis_dir / book_id / name) for name in names)
+
+
+# 别名解析依赖的文件（aliases.json 手动别名 + characters.json 索引中的别名）
+ALIAS_FILES = ("aliases.json", "characters.json")
+
+
+def _fields_key(field_set: set[str] | None) -> tuple | None:
+    """字段投影的规范形式（用于 ETag，与字段顺序无关）"""
+    return tuple(sorted(field_set)) if field_set is not None else None
+
+
+def _revision_cache(
+    request: Request, response: Response, book_id: str, scope: str, *parts
+) -> Response | None:
+    """分析数据库中的数据按修订号生成 ETag"""
+    revision, updated_at = BookManager.get_analysis_revision(book_id, scope)
+    return conditional_response(
+        request, response, make_etag(book_id, scope, revision, updated_at, *parts),
+        last_modified=updated_at or None,
+    )
 
 
 # ===== 章节分析端点 =====
 
 @router.get("/{book_id}/chapters")
-async def get_chapter_analyses(book_id: str) -> list[ChapterAnalysis]:
-    """Get all chapter analyses for a book."""
+async def get_chapter_analyses(
+    book_id: str,
+    request: Request,
+    response: Response,
+    start: int | None = Query(None, ge=0),
+    end: int | None = Query(None, ge=0),
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+) -> list[dict]:
+    """Get chapter analyses for a book.
+
+    不带参数时返回全部章节分析。
+    - start/end: 章节范围（含两端）
+    - fields: 逗号分隔的返回字段，如 chapter_index,title,summary
+    - limit: 每页条数；还有下一页时响应头 X-Next-Cursor 给出游标，作为 cursor 参数获取下一页
+    """
     book = BookManager.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    analyses = BookManager.get_analyses(book_id)
-    return analyses
+    field_set = _parse_fields(fields, ChapterAnalysis)
+
+    # 304 响应不带 X-Next-Cursor，翻页请求不做条件缓存；ETag 区分范围和字段投影
+    if limit is None:
+        cached = _revision_cache(
+            request, response, book_id, "chapters", start, end, cursor, _fields_key(field_set)
+        )
+        if cached is not None:
+            return cached
+
+    if cursor is not None:
+        last = _decode_cursor(cursor)
+        if not last.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        start = max(start or 0, int(last) + 1)
+
+    analyses = BookManager.get_analyses(
+        book_id, start, end, limit + 1 if limit else None, field_set
+    )
+    if limit and len(analyses) > limit:
+        analyses = analyses[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(str(analyses[-1].chapter_index))
+    return json_response(dump_models(analyses, ChapterAnalysis, field_set), response)
 
 
 @router.get("/{book_id}/chapters/{chapter_index}")
-async def get_chapter_analysis(book_id: str, chapter_index: int) -> ChapterAnalysis | None:
+async def get_chapter_analysis(
+    book_id: str, chapter_index: int, request: Request, response: Response
+) -> ChapterAnalysis | None:
     """Get analysis for a specific chapter."""
     book = BookManager.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
+    if (cached := _revision_cache(request, response, book_id, "chapters", chapter_index)) is not None:
+        return cached
 
     analysis = BookManager.get_chapter_analysis(book_id, chapter_index)
     return analysis
@@ -76,7 +210,10 @@ async def analyze_chapter(book_id: str, chapter_index: int) -> ChapterAnalysis:
     chapter = book.chapters[chapter_index]
     content = book.content[chapter.start:chapter.end + 1]
 
-    analysis = await analyzer.analyze(chapter_index, chapter.title, content)
+    try:
+        analysis = await analyzer.analyze(chapter_index, chapter.title, content)
+    except LLMResponseError as e:
+        raise HTTPException(status_code=502, detail=f"Model returned an invalid response: {e}")
     BookManager.save_chapter_analysis(book_id, analysis)
 
     return analysis
@@ -124,22 +261,24 @@ async def _run_batch_analysis(
 
     analyzer = ChapterAnalyzer()
 
-    for i in range(start, end):
-        # Skip if already analyzed
-        existing = BookManager.get_chapter_analysis(book_id, i)
-        if existing:
-            continue
+    # 后台批量任务使用最低优先级，不挤占交互请求的模型配额
+    with llm_priority("batch"), collect_usage(f"batch/{book_id}"):
+        for i in range(start, end):
+            # Skip if already analyzed
+            existing = BookManager.get_chapter_analysis(book_id, i)
+            if existing:
+                continue
 
-        chapter = book.chapters[i]
-        content = book.content[chapter.start:chapter.end + 1]
+            chapter = book.chapters[i]
+            content = book.content[chapter.start:chapter.end + 1]
 
-        try:
-            analysis = await analyzer.analyze(i, chapter.title, content)
-            BookManager.save_chapter_analysis(book_id, analysis)
-            logger.info(f"Chapter {i} analyzed successfully")
-        except Exception as e:
-            # FIXED: 使用日志替代 print，记录完整错误信息
-            logger.error(f"Error analyzing chapter {i}: {e}", exc_info=True)
+            try:
+                analysis = await analyzer.analyze(i, chapter.title, content)
+                BookManager.save_chapter_analysis(book_id, analysis)
+                logger.info(f"Chapter {i} analyzed successfully")
+            except Exception as e:
+                # FIXED: 使用日志替代 print，记录完整错误信息
+                logger.error(f"Error analyzing chapter {i}: {e}", exc_info=True)
 
 
 # ===== 人物按需分析端点 =====
@@ -169,47 +308,61 @@ async def analyze_character(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    # 检查是否已有缓存
-    cached = BookManager.get_detailed_character(book_id, request.name)
+    # 检查是否已有缓存（按规范名，别名不会重复分析）
+    name = AliasRegistry.load(book_id).canonical(request.name)
+    cached = BookManager.get_detailed_character(book_id, name)
     if cached and cached.analysis_status == "completed":
         return cached
 
     analyzer = CharacterOnDemandAnalyzer()
-    result = await analyzer.analyze_full(book, request.name, request.max_chapters)
+    with llm_priority("streaming"):
+        result = await analyzer.analyze_full(
+            book, name, request.max_chapters, request.skip_mentioned_only
+        )
 
     # 保存结果
     if result.analysis_status == "completed" and not result.error_message:
-        BookManager.save_detailed_character(book_id, result)
+        BookManager.save_detailed_character(book_id, result, replace_appearances=True)
 
     return result
 
 
-@router.get("/{book_id}/characters/stream")
-async def analyze_character_stream(book_id: str, name: str):
-    """流式分析人物（SSE，推荐用于前端）"""
-    # FIXED: 添加输入验证
-    name = validate_character_name(name)
-
-    book = BookManager.get_book(book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
+async def _recorded_events(
+    book_id: str,
+    name: str,
+    operation: str,
+    checkpoint: dict | None,
+    events: AsyncIterator[dict],
+) -> AsyncGenerator[dict, None]:
+    """包装分析事件流：逐章写断点，完成时保存结果（先落盘再推送）"""
+    recorder = AnalysisCheckpoint(book_id, name, operation, checkpoint)
+    with llm_priority("streaming"):
+        async for event in events:
+            if event["event"] == "completed" and "error" not in event["data"]:
+                result = DetailedCharacter(**event["data"])
+                if result.analysis_status == "completed":
+                    # 首次分析的出场记录整体替换；继续分析只追加新章节
+                    BookManager.save_detailed_character(
+                        book_id, result, replace_appearances=operation == "analyze"
+                    )
+            recorder.observe(event)
+            yield event
 
-    async def event_generator():
-        analyzer = CharacterOnDemandAnalyzer()
-        result = None
 
-        async for event in analyzer.analyze_stream(book, name):
-            event_type = event["event"]
-            data = json.dumps(event["data"], ensure_ascii=False)
-            yield f"event: {event_type}\ndata: {data}\n\n"
+def _run_stream_response(run: AnalysisRun, attached: bool, last_event_id: str | None) -> StreamingResponse:
+    """把分析任务的事件以 SSE 推送给客户端
 
-            # 保存最终结果
-            if event_type == "completed" and "error" not in event["data"]:
-                result = DetailedCharacter(**event["data"])
+    先推送 task_info（是否附着到已有任务），然后从 Last-Event-ID 之后回放并跟随事件；
+    客户端断开只结束本次推送，不影响任务本身。
+    """
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
 
-        # 保存到文件
-        if result and result.analysis_status == "completed":
-            BookManager.save_detailed_character(book_id, result)
+    async def event_generator():
+        info = {**run.info(), "attached": attached}
+        yield f"event: task_info\ndata: {json.dumps(info, ensure_ascii=False)}\n\n"
+        async for i, event in run.follow(start):
+            data = json.dumps(event["data"], ensure_ascii=False)
+            yield f"id: {i}\nevent: {event['event']}\ndata: {data}\n\n"
 
     return StreamingResponse(
         event_generator(),
@@ -222,12 +375,51 @@ async def analyze_character_stream(book_id: str, name: str):
     )
 
 
+@router.get("/{book_id}/characters/stream")
+async def analyze_character_stream(
+    book_id: str,
+    name: str,
+    skip_mentioned_only: bool | None = None,
+    resume: bool = True,
+    last_event_id: str | None = Header(None),
+):
+    """流式分析人物（SSE，推荐用于前端）
+
+    分析在服务端任务中运行，断开连接不会中断分析；
+    同一人物已有分析在运行时附着到该任务（回放已产生的事件后继续跟随）。
+
+    Args:
+        skip_mentioned_only: 仅被提及的章节跳过模型调用（默认使用配置 SKIP_MENTIONED_ONLY）
+        resume: 存在上次中断的断点时从断点继续（默认开启）
+    """
+    # FIXED: 添加输入验证
+    name = validate_character_name(name)
+
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    name = AliasRegistry.load(book_id).canonical(name)
+
+    def events():
+        checkpoint = AnalysisCheckpoint.load(book_id, name, "analyze") if resume else None
+        analyzer = CharacterOnDemandAnalyzer()
+        return _recorded_events(book_id, name, "analyze", checkpoint, analyzer.analyze_stream(
+            book, name, skip_mentioned_only=skip_mentioned_only, checkpoint=checkpoint
+        ))
+
+    run, created = AnalysisTaskManager.start(book_id, name, "analyze", events)
+    return _run_stream_response(run, not created, None if created else last_event_id)
+
+
 @router.get("/{book_id}/characters/detailed/{character_name}")
 async def get_detailed_character(
     book_id: str,
     character_name: str,
+    request: Request,
+    response: Response,
 ) -> DetailedCharacter | None:
-    """获取已分析的人物详情"""
+    """获取已分析的人物详情（支持按别名查询）"""
     # FIXED: 添加输入验证
     character_name = validate_character_name(character_name)
 
@@ -235,17 +427,88 @@ async def get_detailed_character(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    return BookManager.get_detailed_character(book_id, character_name)
+    character_name = AliasRegistry.load(book_id).canonical(character_name)
+
+    # 只比较该人物画像的写入时间，不加载画像
+    updated_at = BookManager.get_character_updated_at(book_id, character_name)
+    cached = conditional_response(
+        request, response, make_etag(book_id, character_name, updated_at), last_modified=updated_at
+    )
+    if cached is not None:
+        return cached
+
+    character = BookManager.get_detailed_character(book_id, character_name)
+    return json_response(dump_models(character, DetailedCharacter), response)
+
+
+@router.get("/{book_id}/characters/checkpoint/{character_name}")
+async def get_analysis_checkpoint(book_id: str, character_name: str) -> dict:
+    """获取人物分析断点（中断的分析可通过 stream/continue 端点恢复）"""
+    character_name = validate_character_name(character_name)
+
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    character_name = AliasRegistry.load(book_id).canonical(character_name)
+    checkpoint = BookManager.get_checkpoint(book_id, character_name)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="No checkpoint")
+
+    return {
+        "name": character_name,
+        "operation": checkpoint.get("operation"),
+        "planned_chapters": len(checkpoint.get("chapters", [])),
+        "completed_chapters": len(checkpoint.get("appearances", [])),
+        "updated_at": checkpoint.get("updated_at"),
+    }
 
 
 @router.get("/{book_id}/characters/detailed")
-async def list_detailed_characters(book_id: str) -> list[DetailedCharacter]:
-    """列出所有已分析的人物"""
+async def list_detailed_characters(
+    book_id: str,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+    start: int | None = Query(None, ge=0),
+    end: int | None = Query(None, ge=0),
+) -> list[dict]:
+    """列出已分析的人物（按人物名排序）
+
+    不带参数时返回全部人物的完整画像。
+    - fields: 逗号分隔的返回字段，如 name,summary,role（不含 appearances 时跳过其解析）
+    - start/end: 只返回该章节范围（含两端）内的 appearances
+    - limit: 每页条数；还有下一页时响应头 X-Next-Cursor 给出游标，作为 cursor 参数获取下一页
+    """
     book = BookManager.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    return BookManager.get_detailed_characters(book_id)
+    field_set = _parse_fields(fields, DetailedCharacter)
+
+    # 304 响应不带 X-Next-Cursor，翻页请求不做条件缓存；ETag 区分范围和字段投影
+    if limit is None:
+        cached = _revision_cache(
+            request, response, book_id, "characters", start, end, cursor, _fields_key(field_set)
+        )
+        if cached is not None:
+            return cached
+
+    after = _decode_cursor(cursor) if cursor is not None else None
+    characters = BookManager.get_detailed_characters(
+        book_id, after, limit + 1 if limit else None, field_set
+    )
+    if limit and len(characters) > limit:
+        characters = characters[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(characters[-1].name)
+
+    if start is not None or end is not None:
+        low, high = start or 0, end if end is not None else float("inf")
+        for c in characters:
+            c.appearances = [a for a in c.appearances if low <= a.chapter_index <= high]
+    return json_response(dump_models(characters, DetailedCharacter, field_set), response)
 
 
 class CharacterContinueRequest(BaseModel):
@@ -260,14 +523,22 @@ async def continue_analyze_character_stream(
     name: str,
     additional_chapters: int = 30,
     refresh_summary: bool = False,
+    full_rebuild: bool = False,
+    skip_mentioned_only: bool | None = None,
+    resume: bool = True,
+    last_event_id: str | None = Header(None),
 ):
-    """继续分析人物更多章节（SSE 流式）
+    """继续分析人物更多章节（SSE 流式，服务端任务，同一人物去重）
 
     Args:
         book_id: 书籍 ID
         name: 人物名称
         additional_chapters: 要继续分析的章节数
         refresh_summary: 是否刷新总结字段（默认 False，只分析新章节）
+        full_rebuild: 刷新总结时强制全量重建（默认增量刷新）
+        skip_mentioned_only: 仅被提及的章节跳过模型调用（默认使用配置 SKIP_MENTIONED_ONLY）
+        resume: 存在上次中断的断点时从断点继续（默认开启）；
+            首次分析中断的人物也通过该端点恢复
     """
     # FIXED: 添加输入验证
     name = validate_character_name(name)
@@ -276,35 +547,271 @@ async def continue_analyze_character_stream(
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    # 获取已有分析结果
+    name = AliasRegistry.load(book_id).canonical(name)
+
+    # 同一人物已有分析在运行：直接附着
+    active = AnalysisTaskManager.get_active(book_id, name)
+    if active:
+        return _run_stream_response(active, True, last_event_id)
+
+    # 获取已有分析结果（按规范名）
     existing = BookManager.get_detailed_character(book_id, name)
     if not existing:
         raise HTTPException(status_code=404, detail="Character not found. Please analyze first.")
 
-    async def event_generator():
+    # 首次分析中断：按原计划继续首次分析；否则继续分析（可能从断点恢复）
+    if existing.analysis_status == "analyzing":
+        operation = "analyze"
+        checkpoint = AnalysisCheckpoint.load(book_id, name, operation)
+        if not checkpoint:
+            raise HTTPException(status_code=409, detail="Analysis checkpoint missing. Please analyze again.")
+    else:
+        operation = "continue"
+        checkpoint = AnalysisCheckpoint.load(book_id, name, operation) if resume else None
+
+    def events():
         analyzer = CharacterOnDemandAnalyzer()
-        result = None
+        if operation == "analyze":
+            analysis = analyzer.analyze_stream(
+                book, name, skip_mentioned_only=skip_mentioned_only, checkpoint=checkpoint
+            )
+        else:
+            analysis = analyzer.analyze_continue(
+                book, existing, additional_chapters, refresh_summary, full_rebuild,
+                skip_mentioned_only, checkpoint,
+            )
+        return _recorded_events(book_id, name, operation, checkpoint, analysis)
+
+    run, created = AnalysisTaskManager.start(book_id, name, operation, events)
+    return _run_stream_response(run, not created, None if created else last_event_id)
+
+
+# ===== 分析任务端点 =====
+
+@router.get("/{book_id}/characters/tasks")
+async def list_analysis_tasks(book_id: str) -> list[dict]:
+    """列出本书正在运行和最近结束的人物分析任务"""
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
 
-        async for event in analyzer.analyze_continue(
-            book, existing, additional_chapters, refresh_summary
-        ):
-            event_type = event["event"]
-            data = json.dumps(event["data"], ensure_ascii=False)
-            yield f"event: {event_type}\ndata: {data}\n\n"
+    return [run.info() for run in AnalysisTaskManager.list_runs(book_id)]
 
-            if event_type == "completed" and "error" not in event["data"]:
-                result = DetailedCharacter(**event["data"])
 
-        # 保存更新后的结果
-        if result and result.analysis_status == "completed":
-            BookManager.save_detailed_character(book_id, result)
+@router.get("/{book_id}/characters/tasks/{character_name}/events")
+async def attach_analysis_task(
+    book_id: str,
+    character_name: str,
+    last_event_id: str | None = Header(None),
+):
+    """附着到人物分析任务（SSE）：回放已产生的事件，然后跟随实时事件"""
+    character_name = validate_character_name(character_name)
 
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    character_name = AliasRegistry.load(book_id).canonical(character_name)
+
+    run = AnalysisTaskManager.get(book_id, character_name)
+    if not run:
+        raise HTTPException(status_code=404, detail="No analysis task")
+
+    return _run_stream_response(run, True, last_event_id)
+
+
+@router.delete("/{book_id}/characters/tasks/{character_name}")
+async def cancel_analysis_task(book_id: str, character_name: str) -> dict:
+    """取消正在运行的人物分析（已完成的章节保留在断点中，可恢复）"""
+    character_name = validate_character_name(character_name)
+
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    character_name = AliasRegistry.load(book_id).canonical(character_name)
+
+    if not AnalysisTaskManager.cancel(book_id, character_name):
+        raise HTTPException(status_code=404, detail="No running analysis task")
+
+    return {"status": "cancelled", "name": character_name}
+
+
+# ===== 全书人物发现端点 =====
+
+@router.post("/{book_id}/characters/discover")
+async def discover_characters(
+    book_id: str,
+    request: CharacterDiscoverRequest,
+) -> list[CastMember]:
+    """发现全书人物（本地候选抽取 + 可选的批量模型确认）"""
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    with llm_priority("batch"), collect_usage(f"discovery/{book_id}"):
+        cast = await CharacterDiscovery().discover(book, request.top_n, request.confirm)
+    BookManager.save_cast(book_id, cast)
+
+    # 把模型确认的别名登记到别名表（已有归属的别名不覆盖）
+    if request.register_aliases:
+        registry = AliasRegistry.load(book_id)
+        alias_map = BookManager.get_alias_map(book_id)
+        for member in cast:
+            added = registry.add(member.name, member.aliases)
+            if added:
+                name = registry.canonical(member.name)
+                alias_map[name] = list(dict.fromkeys([*alias_map.get(name, []), *added]))
+        BookManager.save_alias_map(book_id, alias_map)
+
+    return cast
+
+
+@router.get("/{book_id}/characters/cast")
+async def get_cast(book_id: str, request: Request, response: Response) -> list[CastMember]:
+    """获取上次人物发现的结果"""
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    version = _analysis_files_version(book_id, "cast.json")
+    if (cached := conditional_response(request, response, make_etag(book_id, version))) is not None:
+        return cached
+
+    return BookManager.get_cast(book_id)
+
+
+@router.get("/{book_id}/characters/cooccurrence")
+async def get_cooccurrence(
+    book_id: str,
+    request: Request,
+    response: Response,
+    names: str | None = None,
+    slices: int | None = None,
+    min_weight: float = 0.0,
+    max_edges: int = 500,
+) -> CooccurrenceGraph:
+    """获取人物共现图（本地计算，供关系图展示）
+
+    Args:
+        names: 逗号分隔的人物名；默认使用人物发现结果和已分析人物
+        slices: 时间切片数
+        min_weight: 只返回权重不低于该值的边
+        max_edges: 最多返回的边数（按权重降序）
+    """
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    selected = None
+    if names:
+        selected = [validate_character_name(n) for n in names.split(",") if n.strip()]
+
+    # 共现图由书籍文本、人物发现结果和别名计算得出；ETag 还要区分查询参数
+    versions = (
+        file_version(BookManager.get_book_path(book_id)),
+        _analysis_files_version(book_id, "cast.json", *ALIAS_FILES),
+    )
+    params = (
+        tuple(sorted(selected)) if selected is not None else None,
+        slices or settings.cooccurrence_slices, min_weight, max_edges,
+    )
+    if (cached := conditional_response(request, response, make_etag(book_id, versions, params))) is not None:
+        return cached
+
+    characters = character_forms(book_id, selected)
+
+    graph = compute_cooccurrence(book, characters, slices)
+    edges = [e for e in graph.edges if e.weight >= min_weight][:max(0, max_edges)]
+    return json_response(dump_models(graph.model_copy(update={"edges": edges}), CooccurrenceGraph), response)
+
+
+# ===== 人物别名端点 =====
+
+@router.get("/{book_id}/aliases")
+async def get_aliases(book_id: str, request: Request, response: Response) -> dict[str, list[str]]:
+    """获取人物别名表（规范名 -> 别名）"""
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    version = _analysis_files_version(book_id, *ALIAS_FILES)
+    if (cached := conditional_response(request, response, make_etag(book_id, version))) is not None:
+        return cached
+
+    return AliasRegistry.load(book_id).to_dict()
+
+
+@router.put("/{book_id}/aliases")
+async def set_aliases(book_id: str, request: CharacterAliasRequest) -> dict:
+    """设置人物别名（之后的搜索和分析会一次覆盖所有称呼）"""
+    name = validate_character_name(request.name)
+    aliases = [validate_character_name(a) for a in request.aliases if a.strip()]
+
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    registry = AliasRegistry.load(book_id)
+    name = registry.canonical(name)
+
+    # 只写入生效的别名（已属于其他人物的别名会被拒绝）
+    registry.add(name, aliases)
+    accepted = [a for a in aliases if a != name and registry.canonical(a) == name]
+    alias_map = BookManager.get_alias_map(book_id)
+    alias_map[name] = accepted
+    BookManager.save_alias_map(book_id, alias_map)
+
+    return {
+        "name": name,
+        "aliases": AliasRegistry.load(book_id).aliases(name),
+        "rejected": [a for a in aliases if a != name and a not in accepted],
+    }
+
+
+@router.post("/{book_id}/characters/merge")
+async def merge_character(book_id: str, request: CharacterMergeRequest) -> DetailedCharacter:
+    """把按别名单独分析的人物合并到规范名下，并登记为别名"""
+    name = validate_character_name(request.name)
+    duplicate_name = validate_character_name(request.duplicate)
+    if name == duplicate_name:
+        raise HTTPException(status_code=400, detail="Cannot merge a character into itself")
+
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    primary = BookManager.get_detailed_character(book_id, name)
+    if not primary:
+        raise HTTPException(status_code=404, detail="Character not found. Please analyze first.")
+
+    # 登记别名：重复人物名本身及其手动登记的别名都归到规范名下
+    alias_map = BookManager.get_alias_map(book_id)
+    duplicate_aliases = alias_map.pop(duplicate_name, [])
+    alias_map[name] = [
+        alias for alias in dict.fromkeys([*alias_map.get(name, []), duplicate_name, *duplicate_aliases])
+        if alias != name
+    ]
+    BookManager.save_alias_map(book_id, alias_map)
+
+    merged = primary.model_copy(update={
+        "aliases": list(dict.fromkeys([*primary.aliases, duplicate_name, *duplicate_aliases])),
+    })
+    duplicate = BookManager.get_detailed_character(book_id, duplicate_name)
+    if duplicate:
+        merged = merge_character_profiles(merged, duplicate)
+
+    # 按合并后的全部称呼重新统计出现章节
+    search_result = CharacterOnDemandAnalyzer().search(book, name)
+    if search_result.found_in_chapters:
+        merged = merged.model_copy(update={
+            "first_appearance": search_result.found_in_chapters[0],
+            "last_appearance": search_result.found_in_chapters[-1],
+            "total_chapters": len(search_result.found_in_chapters),
+        })
+
+    # 保存合并结果并删除重复人物（索引只更新一次）
+    BookManager.save_detailed_characters(
+        book_id, [merged], removals={duplicate_name} if duplicate else set()
     )
+    return merged
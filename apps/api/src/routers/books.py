@@ -1,12 +1,29 @@
 """Book management routes."""
 
-from fastapi import APIRouter, UploadFile, HTTPException
+from fastapi import APIRouter, UploadFile, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 
+from ..config import settings
+from ..core.analysis_profile import POV_MODES, load_analysis_profile, save_analysis_profile
 from ..core.book import BookManager, Book
+from ..knowledge.models import AnalysisProfile
+from ..utils.http_cache import (
+    book_cache_control,
+    conditional_response,
+    file_version,
+    make_etag,
+)
+from ..utils.responses import dump_json, dump_models, json_response, stream_response
 
 router = APIRouter()
 
+# 章节范围端点单次最多返回的章节数
+MAX_CHAPTER_RANGE = 50
+CHAPTER_RANGE_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "text": "text/plain; charset=utf-8",
+}
+
 
 class BookResponse(BaseModel):
     """Book response model."""
@@ -25,9 +42,32 @@ class ChapterResponse(BaseModel):
     end: int
 
 
+def _book_cache(request: Request, response: Response, book_id: str, *parts) -> Response | None:
+    """书籍内容按文本文件的修改时间和大小生成 ETag（不存在时 404）"""
+    path = BookManager.get_book_path(book_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    version = file_version(path)
+    return conditional_response(
+        request, response, make_etag(book_id, version, *parts),
+        last_modified=version[0] / 1e9 if version else None,
+        cache_control=book_cache_control(),
+    )
+
+
 @router.get("")
-async def list_books() -> list[BookResponse]:
+async def list_books(request: Request, response: Response) -> list[BookResponse]:
     """List all books."""
+    files = sorted(settings.books_dir.glob("*.txt")) if settings.books_dir.exists() else []
+    versions = [(f.name, file_version(f)) for f in files]
+    mtimes = [v[0] for _, v in versions if v]
+    cached = conditional_response(
+        request, response, make_etag(versions),
+        last_modified=max(mtimes) / 1e9 if mtimes else None,
+    )
+    if cached is not None:
+        return cached
+
     books = BookManager.list_books()
     return [
         BookResponse(
@@ -42,11 +82,11 @@ async def list_books() -> list[BookResponse]:
 
 
 @router.get("/{book_id}")
-async def get_book(book_id: str) -> BookResponse:
+async def get_book(book_id: str, request: Request, response: Response) -> BookResponse:
     """Get book details."""
+    if (cached := _book_cache(request, response, book_id)) is not None:
+        return cached
     book = BookManager.get_book(book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
     return BookResponse(
         id=book.id,
         title=book.title,
@@ -57,12 +97,12 @@ async def get_book(book_id: str) -> BookResponse:
 
 
 @router.get("/{book_id}/chapters")
-async def get_chapters(book_id: str) -> list[ChapterResponse]:
+async def get_chapters(book_id: str, request: Request, response: Response) -> list[ChapterResponse]:
     """Get book chapters."""
+    if (cached := _book_cache(request, response, book_id, "chapters")) is not None:
+        return cached
     book = BookManager.get_book(book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    return [
+    chapters = [
         ChapterResponse(
             index=ch.index,
             title=ch.title,
@@ -71,31 +111,126 @@ async def get_chapters(book_id: str) -> list[ChapterResponse]:
         )
         for ch in book.chapters
     ]
+    return json_response(dump_models(chapters, ChapterResponse), response)
 
 
 @router.get("/{book_id}/chapters/{chapter_index}/content")
-async def get_chapter_content(book_id: str, chapter_index: int) -> dict:
+async def get_chapter_content(
+    book_id: str, chapter_index: int, request: Request, response: Response
+) -> dict:
     """Get chapter content."""
     book = BookManager.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     if chapter_index < 0 or chapter_index >= len(book.chapters):
         raise HTTPException(status_code=404, detail="Chapter not found")
+    if (cached := _book_cache(request, response, book_id, chapter_index)) is not None:
+        return cached
 
     chapter = book.chapters[chapter_index]
     content = book.content[chapter.start:chapter.end + 1]
-    return {
+    return json_response({
         "index": chapter.index,
         "title": chapter.title,
         "content": content,
-    }
+    }, response)
+
+
+@router.get("/{book_id}/chapters/range")
+async def get_chapter_range(
+    book_id: str,
+    request: Request,
+    response: Response,
+    start: int = Query(0, ge=0),
+    count: int | None = Query(None, ge=1, le=MAX_CHAPTER_RANGE),
+    fmt: str = Query("ndjson", alias="format"),
+):
+    """流式返回从 start 开始的连续 count 章正文（连续阅读时一次预取后续章节）
+
+    - count: 章节数，默认 READER_PREFETCH_CHAPTERS
+    - format: ndjson（每行一章，结构同 /chapters/{i}/content）或 text（按原文拼接）
+    - 预取提示：响应头 X-Next-Chapter 和 Link rel="next" 给出下一段的起始章节（已到末尾时不返回），
+      X-Total-Chapters 为总章节数
+    """
+    if fmt not in CHAPTER_RANGE_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format '{fmt}', expected one of: {', '.join(CHAPTER_RANGE_MEDIA_TYPES)}",
+        )
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    if start >= len(book.chapters):
+        raise HTTPException(status_code=404, detail="Chapter not found")
+
+    count = count or settings.reader_prefetch_chapters
+    chapters = book.chapters[start:start + count]
+    next_start = start + len(chapters)
+
+    hints = {"X-Total-Chapters": str(len(book.chapters))}
+    if next_start < len(book.chapters):
+        next_url = request.url.include_query_params(start=next_start, count=count)
+        hints["X-Next-Chapter"] = str(next_start)
+        hints["Link"] = f'<{next_url}>; rel="next"'
+
+    if (cached := _book_cache(request, response, book_id, "range", start, count, fmt)) is not None:
+        cached.headers.update(hints)
+        return cached
+    response.headers.update(hints)
+
+    content = book.content
+
+    async def chunks():
+        # 每章单独切片、单独发送，前面的章节不必等整段准备好
+        for chapter in chapters:
+            text = content[chapter.start:chapter.end + 1]
+            if fmt == "text":
+                yield text
+            else:
+                yield dump_json({"index": chapter.index, "title": chapter.title, "content": text}) + b"\n"
+
+    return stream_response(chunks(), CHAPTER_RANGE_MEDIA_TYPES[fmt], response)
+
+
+@router.get("/{book_id}/analysis-profile")
+async def get_analysis_profile(
+    book_id: str, request: Request, response: Response
+) -> AnalysisProfile:
+    """获取书籍分析配置（未手动配置时返回本地检测结果，detected=true）"""
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    # 检测结果取决于书籍文本，手动配置取决于配置文件
+    versions = (
+        file_version(BookManager.get_book_path(book_id)),
+        file_version(settings.analysis_dir / book_id / "analysis_profile.json"),
+    )
+    cached = conditional_response(request, response, make_etag(book_id, versions))
+    if cached is not None:
+        return cached
+    return load_analysis_profile(book)
+
+
+@router.put("/{book_id}/analysis-profile")
+async def update_analysis_profile(book_id: str, profile: AnalysisProfile) -> AnalysisProfile:
+    """设置书籍分析配置（叙述视角、叙述者、题材提示），之后的人物分析按此生成 prompt"""
+    book = BookManager.get_book(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    if profile.pov not in POV_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid pov '{profile.pov}', expected one of: {', '.join(POV_MODES)}",
+        )
+
+    save_analysis_profile(book_id, profile)
+    return load_analysis_profile(book)
 
 
 @router.post("/upload")
 async def upload_book(file: UploadFile) -> BookResponse:
     """Upload a new book."""
-    from ..config import settings
-
     if not file.filename or not file.filename.endswith(".txt"):
         raise HTTPException(status_code=400, detail="Only .txt files are supported")
 
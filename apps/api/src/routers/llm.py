@@ -0,0 +1,34 @@
+"""LLM scheduler routes."""
+
+from fastapi import APIRouter, HTTPException
+
+from ..ai.resilience import call_stats
+from ..ai.scheduler import scheduler
+from ..ai.telemetry import recent_jobs, totals
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_llm_metrics() -> dict:
+    """模型调用统计：各优先级的队列深度、运行数、等待时间、token 用量，
+    以及重试、对冲、JSON 修复等调用结果计数"""
+    return {**scheduler.snapshot(), "outcomes": dict(call_stats)}
+
+
+@router.get("/usage")
+async def get_llm_usage() -> dict:
+    """按功能分类的 token 用量和耗时（进程累计 + 最近任务）"""
+    return {
+        "totals": totals.to_dict(),
+        "jobs": {job_id: c.to_dict()["total"] for job_id, c in reversed(recent_jobs.items())},
+    }
+
+
+@router.get("/usage/{job_id:path}")
+async def get_job_usage(job_id: str) -> dict:
+    """单个任务的用量明细，如 character/{book_id}/{name}、batch/{book_id}"""
+    collector = recent_jobs.get(job_id)
+    if collector is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, **collector.to_dict()}
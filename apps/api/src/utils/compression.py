@@ -0,0 +1,151 @@
+"""Response compression middleware (gzip, optional brotli).
+
+一次性返回的响应体（普通 JSON/文本响应）超过阈值时整体压缩；分多次发送的 NDJSON/纯文本流逐块压缩，
+每块都 flush，客户端收到即可解码，不会因为缓冲而延迟。SSE 原样透传。
+brotli 需要安装 brotli 包，未安装时只使用 gzip。
+"""
+
+import gzip
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+# 值得压缩的内容类型（图片等已压缩的格式不处理）
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# 可以逐块压缩的流式响应（SSE 经代理时压缩容易被缓冲，不处理）
+STREAM_COMPRESSIBLE_TYPES = ("application/x-ndjson", "text/plain")
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """按 Accept-Encoding 选择编码：br（已安装 brotli）优先，其次 gzip"""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        token, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(token.strip())
+
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def _compressible(headers: MutableHeaders, types: tuple[str, ...] = COMPRESSIBLE_TYPES) -> bool:
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(types) and "content-encoding" not in headers
+
+
+class _StreamCompressor:
+    """流式压缩：每块输出都 flush 到字节边界"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip 头
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """按响应大小阈值压缩响应体"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+        stream: _StreamCompressor | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            more_body = message.get("more_body", False)
+            if stream is not None:
+                body = stream.compress(message.get("body", b""))
+                if not more_body:
+                    body += stream.finish()
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            compressible = _compressible(headers)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+
+            # 可逐块压缩的流：从第一块开始压缩
+            if more_body and _compressible(headers, STREAM_COMPRESSIBLE_TYPES):
+                stream = _StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                if "content-length" in headers:
+                    del headers["content-length"]
+                await send(start)
+                await send({"type": "http.response.body", "body": stream.compress(body), "more_body": True})
+                return
+
+            # 其他流式响应或小响应：原样发送
+            if not compressible or more_body or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
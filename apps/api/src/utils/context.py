@@ -0,0 +1,24 @@
+"""Context variable helpers."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+@contextmanager
+def context_value(var: ContextVar[T], value: T) -> Iterator[None]:
+    """在上下文中设置 ContextVar，退出时恢复原值
+
+    在异步生成器中跨 yield 使用时，未消费完的生成器可能在其他上下文中被关闭，
+    此时 reset 会抛出 ValueError；当前上下文中的值与本上下文无关，无需恢复。
+    """
+    token = var.set(value)
+    try:
+        yield
+    finally:
+        try:
+            var.reset(token)
+        except ValueError:
+            pass
@@ -0,0 +1,85 @@
+"""HTTP conditional request utilities (ETag / Last-Modified / 304)."""
+
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+from fastapi import Request, Response
+
+from ..config import settings
+
+# 分析结果：浏览器可缓存，但每次使用前都要用 ETag 重新验证（未变化时返回 304）
+REVALIDATE = "private, no-cache"
+
+
+def book_cache_control() -> str:
+    """书籍正文/章节列表：只有重新上传同名文件才会变化，允许短时间内直接使用缓存"""
+    return f"private, max-age={settings.book_cache_max_age}"
+
+
+def file_version(path: Path) -> tuple[int, int] | None:
+    """文件版本（修改时间 + 大小），文件不存在时为 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def make_etag(*parts) -> str:
+    """由数据版本生成弱 ETag（同一版本的不同压缩/序列化结果视为等价）"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _not_modified_since(header: str, last_modified: float) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP 日期精度为秒
+    return int(last_modified) <= since
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: float | None = None,
+    cache_control: str = REVALIDATE,
+) -> Response | None:
+    """处理条件请求：未变化时返回 304 响应，否则把缓存头写入 response 并返回 None
+
+    用法（在加载和序列化数据之前调用）::
+
+        if (cached := conditional_response(request, response, etag)) is not None:
+            return cached
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    # If-None-Match 优先于 If-Modified-Since（RFC 9110 13.2.2）
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(
+            last_modified and if_modified_since
+            and _not_modified_since(if_modified_since, last_modified)
+        )
+
+    if not_modified:
+        # 与 200 响应一致（压缩中间件给 200 加 Vary，304 不经过压缩，需要在这里带上）
+        return Response(status_code=304, headers={**headers, "Vary": "Accept-Encoding"})
+    response.headers.update(headers)
+    return None
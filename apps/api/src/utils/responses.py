@@ -0,0 +1,84 @@
+"""Fast JSON responses for large payloads.
+
+大列表和长正文直接序列化为 JSON 字节返回：
+
+- pydantic 模型用 TypeAdapter.dump_json（pydantic-core 序列化），不经过 model_dump 生成的中间 dict，
+  也不经过 FastAPI 对返回值的再次校验
+- 普通 dict/list 安装了 orjson 时用 orjson，否则用紧凑的 json.dumps
+
+路由中设置在注入的 Response 上的响应头（ETag、X-Next-Cursor 等）会复制到返回的响应（包括流式响应）上。
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, AsyncIterable
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+
+def dump_json(content: Any) -> bytes:
+    """普通 dict/list 序列化为紧凑的 JSON 字节（有 orjson 时用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON 响应：内容为 bytes 时视为已序列化的 JSON"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def dump_models(
+    data: BaseModel | list[BaseModel] | None,
+    model: type[BaseModel],
+    include: set[str] | None = None,
+) -> bytes:
+    """把模型（或模型列表）序列化为 JSON 字节，include 为字段投影"""
+    if data is None:
+        return b"null"
+    if isinstance(data, BaseModel):
+        return data.model_dump_json(include=include).encode("utf-8")
+    return _list_adapter(model).dump_json(
+        data, include={"__all__": include} if include is not None else None
+    )
+
+
+def _copy_headers(source: Response | None, target: Response) -> None:
+    if source is not None:
+        for key, value in source.headers.items():
+            if key not in ("content-length", "content-type"):
+                target.headers.append(key, value)
+
+
+def json_response(content: Any, response: Response | None = None) -> FastJSONResponse:
+    """构造 JSON 响应，并带上路由在注入的 response 上设置的响应头"""
+    result = FastJSONResponse(content)
+    _copy_headers(response, result)
+    return result
+
+
+def stream_response(
+    chunks: AsyncIterable[str | bytes], media_type: str, response: Response | None = None
+) -> StreamingResponse:
+    """构造流式响应（逐块发送），并带上注入的 response 上的响应头"""
+    result = StreamingResponse(chunks, media_type=media_type)
+    _copy_headers(response, result)
+    return result
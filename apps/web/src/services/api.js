@@ -12,6 +12,19 @@ export const booksApi = {
   getChapters: (bookId) => api.get(`/books/${bookId}/chapters`).then((r) => r.data),
   getChapterContent: (bookId, chapterIndex) =>
     api.get(`/books/${bookId}/chapters/${chapterIndex}/content`).then((r) => r.data),
+  // 连续阅读预取：一次取 start 起的 count 章（NDJSON），nextChapter 为下一段起点（已到末尾时为 null）
+  getChapterRange: (bookId, start, count) =>
+    api
+      .get(`/books/${bookId}/chapters/range`, {
+        params: { start, count },
+        responseType: 'text',
+        transformResponse: (data) => data,
+      })
+      .then((r) => ({
+        chapters: r.data.split('\n').filter(Boolean).map((line) => JSON.parse(line)),
+        nextChapter: r.headers['x-next-chapter'] ? Number(r.headers['x-next-chapter']) : null,
+        totalChapters: Number(r.headers['x-total-chapters']),
+      })),
   upload: (file) => {
     const formData = new FormData()
     formData.append('file', file)
@@ -98,6 +98,7 @@ def analyze_character(
     continue_mode: bool = False,
     additional_chapters: int | None = None,
     refresh_summary: bool = False,
+    full_rebuild: bool = False,
     interactive: bool = True,
 ) -> bool:
     """分析单个人物
@@ -109,6 +110,7 @@ def analyze_character(
         continue_mode: 是否为增量分析模式
         additional_chapters: 要分析的章节数（None 表示交互式询问）
         refresh_summary: 是否刷新总结字段
+        full_rebuild: 刷新总结时强制全量重建（默认增量刷新）
         interactive: 是否允许交互式询问
     """
     print_header(f"{'继续分析' if continue_mode else '分析人物'}: {name}")
@@ -151,7 +153,7 @@ def analyze_character(
 
         # 调用继续分析 API
         stream = client.stream_continue_analysis(
-            book_id, name, additional_chapters, refresh_summary
+            book_id, name, additional_chapters, refresh_summary, full_rebuild
         )
     else:
         if existing:
@@ -193,12 +195,21 @@ def analyze_character(
                     print(f"智能采样: {len(sample)} 章")
                     print(f"  范围: {min(sample)} - {max(sample)}")
 
+            elif event.event == "resume_info":
+                chapters_analyzed = event.data.get("completed", 0)
+                print(f"从断点恢复: 已完成 {chapters_analyzed} 章，剩余 {event.data.get('remaining', 0)} 章")
+
             elif event.event == "chapter_analyzed":
                 chapters_analyzed += 1
                 to_analyze = event.data.get("chapters_to_analyze", total_chapters)
                 if to_analyze > 0:
                     print_progress(chapters_analyzed, to_analyze, "分析进度: ")
 
+            elif event.event == "refresh_info":
+                mode = "增量刷新" if event.data.get("mode") == "incremental" else "全量重建"
+                print()  # 换行
+                print(f"总结刷新模式: {mode}")
+
             elif event.event == "summary_skipped":
                 print()  # 换行
                 print(f"提示: {event.data.get('message', '总结字段保持不变')}")
@@ -410,6 +421,8 @@ def main():
                         help="继续分析时的章节数（不指定则交互式询问）")
     parser.add_argument("--refresh-summary", dest="refresh_summary", action="store_true",
                         help="分析完成后刷新总结字段")
+    parser.add_argument("--full-rebuild", dest="full_rebuild", action="store_true",
+                        help="刷新总结时基于全部已分析章节全量重建（默认增量刷新）")
     parser.add_argument("--refresh-summary-only", dest="refresh_summary_only", action="store_true",
                         help="仅刷新总结（不分析新章节）")
     parser.add_argument("--status", action="store_true", help="查看人物分析状态")
@@ -454,6 +467,7 @@ def main():
                 continue_mode=args.continue_mode,
                 additional_chapters=args.chapters,
                 refresh_summary=args.refresh_summary,
+                full_rebuild=args.full_rebuild,
                 interactive=interactive,
             ):
                 success_count += 1
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+章节切分对比脚本
+
+对比两种章节切分实现，并校验结果完全一致（不一致时以非零状态退出，可用于回归检查）：
+
+- regex:   MULTILINE 组合正则 finditer，每次匹配重建上一章的 Chapter（旧实现）
+- scan:    行首字符预筛选 + 只在候选行上匹配，扫描时只记录偏移，最后构造 Chapter（core/chapters.py）
+
+默认生成约 500 万字的样例小说，包含各种标题写法（阿拉伯/中文数字、"掌""地"错别字、缺少"章"字、
+Chapter N）、以"第""地""C"开头的非标题行、跨行标题和 CRLF 换行。
+
+用法:
+    python scripts/bench_chapter_detection.py
+    python scripts/bench_chapter_detection.py --chars 20000000 --repeat 3
+    python scripts/bench_chapter_detection.py --file 某书.txt
+    python scripts/bench_chapter_detection.py --books   # 额外校验数据目录中的所有书籍
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# 后端代码目录（settings 中的数据路径相对于该目录）
+API_DIR = Path(__file__).resolve().parent.parent / "apps" / "api"
+CALLER_DIR = Path.cwd()
+sys.path.insert(0, str(API_DIR))
+os.chdir(API_DIR)
+
+from src.config import settings  # noqa: E402
+from src.core.chapters import CHAPTER_PATTERN, detect_chapters, scan_chapter_titles  # noqa: E402
+from src.knowledge.models import Chapter  # noqa: E402
+
+CN_DIGITS = "零一二三四五六七八九"
+
+
+def legacy_detect_chapters(content: str) -> list[Chapter]:
+    """旧实现（BookManager._detect_chapters 原逻辑），作为对照基准"""
+    chapters = []
+    for match in CHAPTER_PATTERN.finditer(content):
+        title = match.group(0).strip()
+        if title:
+            if chapters:
+                chapters[-1] = Chapter(
+                    index=chapters[-1].index,
+                    title=chapters[-1].title,
+                    start=chapters[-1].start,
+                    end=match.start() - 1,
+                )
+            chapters.append(Chapter(
+                index=len(chapters),
+                title=title,
+                start=match.start(),
+                end=len(content) - 1,
+            ))
+    return chapters
+
+
+def chinese_number(n: int) -> str:
+    """简单的中文数字（一百二十三），只用于生成标题"""
+    if n == 0:
+        return "零"
+    result = ""
+    for value, unit in ((1000, "千"), (100, "百"), (10, "十")):
+        if n >= value:
+            result += CN_DIGITS[n // value] + unit
+            n %= value
+    if n:
+        result += CN_DIGITS[n]
+    return result
+
+
+def make_novel(chars: int, seed: int) -> str:
+    """生成约 chars 字的样例小说"""
+    rng = random.Random(seed)
+    sentences = [
+        "他推开教室的门，阳光从窗外照进来，同桌正低头看书。",
+        "“早啊。”她抬起头笑了笑，把一本书推了过来。",
+        "第二天早上，地上铺满了落叶，操场上空无一人。",
+        "窗外的风吹进来，桌上的试卷哗哗作响。",
+        "Chapter by chapter, the story unfolds slowly.",
+    ]
+    # 以"第""地""C"开头但不是标题的行
+    false_heads = ["第二天，他很早就醒了。", "地上全是水。", "Chapters are long.", "第一次见面时", "chapter x"]
+    headings = [
+        lambda i: f"第{i}章 {rng.choice(['初见', '雨夜', '归来'])}",
+        lambda i: f"第{chinese_number(i)}章：{rng.choice(['初见', '雨夜'])}",
+        lambda i: f"地{i}掌 错别字标题",
+        lambda i: f"第{i} 缺少章字",
+        lambda i: f"第{chinese_number(i)} 缺少章字",
+        lambda i: f"Chapter {i}: The Return",
+        lambda i: f"CHAPTER {i}",
+        lambda i: f"第{i}章",             # 无标题，正则会吞掉下一行
+        lambda i: f"第{i}\n跨行标题",      # \s+ 跨行
+    ]
+
+    parts = ["书名：样例小说\n作者：某人\n简介：仅用于测试。\n\n"]
+    size = sum(len(p) for p in parts)
+    index = 1
+    while size < chars:
+        lines = [headings[rng.randrange(len(headings))](index)]
+        for _ in range(rng.randint(20, 80)):
+            if rng.random() < 0.05:
+                lines.append(rng.choice(false_heads))
+            else:
+                lines.append("".join(rng.choices(sentences, k=rng.randint(1, 4))))
+        newline = "\r\n" if rng.random() < 0.1 else "\n"
+        chapter = newline.join(lines) + newline
+        parts.append(chapter)
+        size += len(chapter)
+        index += 1
+    return "".join(parts)
+
+
+def timed(func, content: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(content)
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def compare(name: str, content: str, repeat: int) -> bool:
+    expected, legacy_ms = timed(legacy_detect_chapters, content, repeat)
+    actual, scan_ms = timed(detect_chapters, content, repeat)
+    _, titles_ms = timed(scan_chapter_titles, content, repeat)
+    same = actual == expected
+
+    print(f"{name}: {len(content):,} 字，{len(expected):,} 章")
+    print(f"  regex（旧）    {legacy_ms:10.1f} ms")
+    print(f"  scan           {scan_ms:10.1f} ms  （{legacy_ms / scan_ms:.1f}x，其中扫描 {titles_ms:.1f} ms）")
+    print(f"  结果一致       {'是' if same else '否'}")
+    if not same:
+        for i, (a, b) in enumerate(zip(actual, expected)):
+            if a != b:
+                print(f"  第一个差异 #{i}: scan={a!r} regex={b!r}")
+                break
+        else:
+            print(f"  章节数不同: scan={len(actual)} regex={len(expected)}")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比章节切分实现的速度并校验结果一致")
+    parser.add_argument("--chars", type=int, default=5_000_000, help="样例小说字数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最快一次）")
+    parser.add_argument("--file", type=Path, help="使用指定的 txt 文件")
+    parser.add_argument("--books", action="store_true", help="额外校验数据目录中的所有书籍")
+    args = parser.parse_args()
+
+    if args.file:
+        path = CALLER_DIR / args.file
+        samples = [(path.name, path.read_text(encoding="utf-8"))]
+    else:
+        samples = [(f"样例小说（seed={args.seed}）", make_novel(args.chars, args.seed))]
+    if args.books:
+        samples += [(p.name, p.read_text(encoding="utf-8")) for p in sorted(settings.books_dir.glob("*.txt"))]
+
+    ok = True
+    for name, content in samples:
+        ok = compare(name, content, args.repeat) and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+模型批量加载对比脚本
+
+对比从分析数据库读出的记录解析为 ChapterAnalysis / DetailedCharacter 的几种方式：
+
+- dict:      json.loads 后 Model(**data) 逐条校验（旧实现）
+- json:      Model.model_validate_json 逐条直接从字节解析（当前人物画像的实现）
+- adapter:   整页记录拼成 JSON 数组，TypeAdapter(list[Model]).validate_json 一次解析（当前章节分析的实现）
+- construct: json.loads 后递归 model_construct，跳过校验（信任自己写入的数据）
+
+construct 需要在 Python 中逐个字段处理嵌套模型，实测比 pydantic-core 中完成的校验慢得多，未采用。
+
+只读取数据、不修改数据库。不指定书籍或书籍没有分析数据时用生成的样例数据。
+
+用法:
+    python scripts/bench_model_loading.py
+    python scripts/bench_model_loading.py --characters 200 --appearances 300
+    python scripts/bench_model_loading.py --book-id a04f9ba66252
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import typing
+from pathlib import Path
+
+# 后端代码目录（settings 中的数据路径相对于该目录）
+API_DIR = Path(__file__).resolve().parent.parent / "apps" / "api"
+sys.path.insert(0, str(API_DIR))
+os.chdir(API_DIR)
+
+from pydantic import BaseModel, TypeAdapter  # noqa: E402
+
+from src.core import serialization  # noqa: E402
+from src.core.analysis_store import DB_FILENAME, AnalysisStore  # noqa: E402
+from src.core.book import _character_json, _json_array  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.knowledge.models import (  # noqa: E402
+    CharacterAppearance,
+    CharacterInteraction,
+    CharacterRelation,
+    ChapterAnalysis,
+    DetailedCharacter,
+    KeyMoment,
+)
+
+
+METHODS = ("dict", "json", "adapter", "construct")
+
+
+def construct(model: type[BaseModel], data: dict) -> BaseModel:
+    """递归 model_construct（model_construct 本身不处理嵌套模型）"""
+    hints = typing.get_type_hints(model)
+    values = {}
+    for key, value in data.items():
+        hint = hints.get(key)
+        args = typing.get_args(hint)
+        if isinstance(hint, type) and issubclass(hint, BaseModel) and isinstance(value, dict):
+            value = construct(hint, value)
+        elif (
+            typing.get_origin(hint) is list and args and isinstance(args[0], type)
+            and issubclass(args[0], BaseModel) and isinstance(value, list)
+        ):
+            value = [construct(args[0], v) for v in value]
+        values[key] = value
+    return model.model_construct(**values)
+
+
+def sample_rows(chapters: int, characters: int, appearances: int) -> tuple[list, list]:
+    """生成样例记录：章节分析 JSON、(画像头部, 出场记录) JSON"""
+    chapter_rows = [
+        ChapterAnalysis(
+            chapter_index=i, title=f"第{i + 1}章", summary="主角在教室里遇到了同桌，" * 8,
+            characters=["张成", "赵秦", "夏诗"], events=["事件描述" * 5] * 4, keywords=["校园", "青春"],
+        ).model_dump_json()
+        for i in range(chapters)
+    ]
+    shards = [
+        CharacterAppearance(
+            chapter_index=i, chapter_title=f"第{i + 1}章", events=["参与的事件" * 6] * 3,
+            interactions=[CharacterInteraction(character="张成", description="互动描述" * 8)] * 3,
+            quote="人物的代表性台词" * 3,
+        ).model_dump_json()
+        for i in range(appearances)
+    ]
+    relations = [
+        CharacterRelation(
+            target_name=f"人物{k}", relation_type="friend", description="关系描述" * 10,
+            key_moments=[KeyMoment(chapter_index=k, description="关键时刻" * 5)] * 3,
+        )
+        for k in range(8)
+    ]
+    character_rows = [
+        (
+            DetailedCharacter(
+                name=f"人物{k:04d}", description="人物简介" * 30, relations=relations,
+                analysis_status="completed",
+            ).model_dump_json(exclude={"appearances"}),
+            shards,
+        )
+        for k in range(characters)
+    ]
+    return chapter_rows, character_rows
+
+
+def book_rows(book_id: str) -> tuple[list, list] | None:
+    if not (settings.analysis_dir / book_id / DB_FILENAME).exists():
+        return None
+    store = AnalysisStore.for_book(book_id)
+    return store.list_chapter_analyses(), store.list_characters()
+
+
+def character_dict(row) -> dict:
+    header, appearances = row
+    data = serialization.decode(header)
+    data["appearances"] = [serialization.decode(a) for a in appearances]
+    return data
+
+
+def load(method: str, model: type[BaseModel], rows: list, to_json, to_dict) -> list:
+    if method == "dict":
+        return [model(**to_dict(row)) for row in rows]
+    if method == "json":
+        return [model.model_validate_json(to_json(row)) for row in rows]
+    if method == "adapter":
+        return TypeAdapter(list[model]).validate_json(_json_array([to_json(row) for row in rows]))
+    return [construct(model, to_dict(row)) for row in rows]
+
+
+def bench(title: str, model: type[BaseModel], rows: list, to_json, to_dict, repeat: int) -> None:
+    print(f"\n{title}")
+    print(f"  {'方式':<12}{'耗时(ms)':>12}{'相对 dict':>12}")
+    baseline = None
+    for method in METHODS:
+        load(method, model, rows, to_json, to_dict)  # 预热（TypeAdapter 构建等）
+        start = time.perf_counter()
+        for _ in range(repeat):
+            load(method, model, rows, to_json, to_dict)
+        ms = (time.perf_counter() - start) * 1000 / repeat
+        baseline = baseline or ms
+        print(f"  {method:<12}{ms:>12.1f}{ms / baseline:>12.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比模型批量加载方式的耗时")
+    parser.add_argument("--book-id", help="使用该书的分析数据库")
+    parser.add_argument("--chapters", type=int, default=2000, help="样例章节分析数")
+    parser.add_argument("--characters", type=int, default=100, help="样例人物数")
+    parser.add_argument("--appearances", type=int, default=200, help="样例每个人物的出场记录数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    rows = book_rows(args.book_id) if args.book_id else None
+    if rows is None:
+        if args.book_id:
+            print(f"书籍 {args.book_id} 没有分析数据库，使用生成的样例数据")
+        rows = sample_rows(args.chapters, args.characters, args.appearances)
+    chapter_rows, character_rows = rows
+
+    if chapter_rows:
+        bench(
+            f"章节分析 x{len(chapter_rows)}", ChapterAnalysis, chapter_rows,
+            serialization.json_bytes, serialization.decode, args.repeat,
+        )
+    if character_rows:
+        total = sum(len(a) for _, a in character_rows)
+        bench(
+            f"人物画像 x{len(character_rows)}（出场记录共 {total} 条）", DetailedCharacter,
+            character_rows, _character_json, character_dict, args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Prompt 前缀缓存对比脚本
+
+对同一人物的若干章节分别用两种 prompt 布局调用单章出场分析，
+对比服务端返回的缓存 token 占比（usage.prompt_tokens_details.cached_tokens）和平均耗时：
+
+- inline: 旧布局。system 只有一句角色设定，背景、人物名、章节内容和任务说明混在 user 消息中，
+  人物名插在任务说明里，每次调用的公共前缀只有开头的背景段落
+- prefix: 当前布局。角色设定 + 背景 + 任务说明全部放在 system（逐字固定），
+  人物名和章节内容放在 user 消息末尾
+
+直接调用后端代码（需要 apps/api/.env 中配置 LLM_API_KEY），会产生真实的模型调用费用。
+
+用法:
+    python scripts/bench_prompt_cache.py 赵秦
+    python scripts/bench_prompt_cache.py 赵秦 --chapters 20 --layout prefix
+    python scripts/bench_prompt_cache.py 赵秦 --book-id a04f9ba66252
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# 后端代码目录（settings 中的数据路径相对于该目录）
+API_DIR = Path(__file__).resolve().parent.parent / "apps" / "api"
+sys.path.insert(0, str(API_DIR))
+os.chdir(API_DIR)
+
+from src.ai.client import chat_json  # noqa: E402
+from src.ai.tasks.character_analyzer import CharacterOnDemandAnalyzer  # noqa: E402
+from src.ai.telemetry import collect_usage  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.core.analysis_profile import compile_narrator_context, load_analysis_profile  # noqa: E402
+from src.core.book import BookManager  # noqa: E402
+
+
+# 默认书籍 ID（那些热血飞扬的日子）
+DEFAULT_BOOK_ID = "a04f9ba66252"
+
+LAYOUTS = ("inline", "prefix")
+
+
+async def run_inline(
+    analyzer: CharacterOnDemandAnalyzer, book, name: str, title: str, content: str
+) -> None:
+    """旧布局：背景 + 可变内容 + 带人物名的任务说明，全部放在 user 消息"""
+    task = "\n".join(
+        line for line in analyzer.APPEARANCE_TASK.splitlines() if "用户消息" not in line
+    )
+    task = task.replace("目标人物", f'人物"{name}"').replace("该人物", name)
+    prompt = f"""{compile_narrator_context(load_analysis_profile(book))}
+章节：{title}
+内容：
+{content}
+{task}"""
+    await chat_json(
+        prompt,
+        system="你是专业的小说分析师，擅长从小说叙述中提取客观信息。要全面、准确、结构化。",
+        feature="appearance",
+    )
+
+
+async def run_layout(layout: str, book, name: str, chapters: list[int]) -> dict:
+    """按指定布局顺序分析各章节，返回该布局的用量统计"""
+    analyzer = CharacterOnDemandAnalyzer()
+    max_len = settings.max_chapter_content_length
+    with collect_usage() as usage:
+        for i, chapter_index in enumerate(chapters, 1):
+            chapter = book.chapters[chapter_index]
+            content = book.content[chapter.start:chapter.end + 1]
+            if layout == "inline":
+                await run_inline(analyzer, book, name, chapter.title, content[:max_len])
+            else:
+                await analyzer.analyze_chapter_appearance(
+                    name, chapter_index, chapter.title, content, book=book
+                )
+            print(f"  [{layout}] {i}/{len(chapters)} {chapter.title}")
+    return usage.to_dict()["total"]
+
+
+def print_report(results: dict[str, dict]) -> None:
+    """打印对比结果"""
+    print()
+    print(f"{'layout':<8} {'calls':>6} {'prompt':>10} {'cached':>10} {'ratio':>7} {'avg ms':>9} {'max ms':>9}")
+    for layout, total in results.items():
+        prompt = total["prompt_tokens"]
+        ratio = total["cached_tokens"] / prompt if prompt else 0.0
+        print(
+            f"{layout:<8} {total['calls']:>6} {prompt:>10} {total['cached_tokens']:>10} "
+            f"{ratio:>6.1%} {total['avg_latency_ms']:>9.0f} {total['max_latency_ms']:>9.0f}"
+        )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="对比 prompt 布局的前缀缓存命中率和耗时")
+    parser.add_argument("name", help="人物名")
+    parser.add_argument("--book-id", default=DEFAULT_BOOK_ID, help="书籍 ID")
+    parser.add_argument("--chapters", type=int, default=10, help="分析的章节数（默认 10）")
+    parser.add_argument("--layout", choices=[*LAYOUTS, "both"], default="both", help="测试的布局")
+    args = parser.parse_args()
+
+    book = BookManager.get_book(args.book_id)
+    if not book:
+        print(f"书籍不存在: {args.book_id}")
+        return 1
+
+    analyzer = CharacterOnDemandAnalyzer()
+    search = analyzer.search(book, args.name)
+    chapters = search.found_in_chapters[:args.chapters]
+    if not chapters:
+        print(f"未找到人物: {args.name}")
+        return 1
+
+    name = search.name
+    # 两种布局使用相同的章节内容（整章截断），只比较 prompt 布局的差异
+    settings.context_extraction = False
+    print(f"人物: {name}，章节数: {len(chapters)}")
+
+    layouts = LAYOUTS if args.layout == "both" else (args.layout,)
+    results = {}
+    for layout in layouts:
+        results[layout] = await run_layout(layout, book, name, chapters)
+
+    print_report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+大响应的序列化与压缩对比脚本
+
+对正文、章节列表、章节分析列表、人物画像列表等大响应：
+
+1. 序列化：model_dump + json.dumps（旧实现）对比 dump_models（pydantic-core 直接输出 JSON 字节）
+2. 压缩：原始 / gzip / br（安装 brotli 时）的响应体积
+3. 端到端：通过 ASGI 直接调用应用（含压缩中间件），不同 Accept-Encoding 下的平均耗时
+
+应用只挂载 books/analysis 路由（不依赖 RAG 组件）。默认在临时目录生成样例书籍和分析数据；
+指定 --book-id 时使用 apps/api 配置的数据目录中的已有数据（只读）。
+
+用法:
+    python scripts/bench_responses.py
+    python scripts/bench_responses.py --chapters 2000 --characters 50
+    python scripts/bench_responses.py --book-id a04f9ba66252
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 后端代码目录（settings 中的数据路径相对于该目录）
+API_DIR = Path(__file__).resolve().parent.parent / "apps" / "api"
+sys.path.insert(0, str(API_DIR))
+os.chdir(API_DIR)
+
+if "--book-id" not in sys.argv:
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench_responses_")
+
+from fastapi import FastAPI  # noqa: E402
+
+from src.config import settings  # noqa: E402
+from src.core.book import BookManager  # noqa: E402
+from src.knowledge.models import (  # noqa: E402
+    CharacterAppearance,
+    CharacterInteraction,
+    ChapterAnalysis,
+    DetailedCharacter,
+)
+from src.routers import analysis, books  # noqa: E402
+from src.utils import compression  # noqa: E402
+from src.utils.compression import CompressionMiddleware  # noqa: E402
+from src.utils.responses import dump_models  # noqa: E402
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+    app.include_router(books.router, prefix="/api/books")
+    app.include_router(analysis.router, prefix="/api/analysis")
+    return app
+
+
+def make_sample(chapters: int, characters: int) -> str:
+    """生成样例书籍和分析数据，返回书籍 ID"""
+    settings.books_dir.mkdir(parents=True, exist_ok=True)
+    paragraph = "他推开教室的门，阳光从窗外照进来，同桌正低头看书。“早啊。”她抬起头笑了笑。\n"
+    text = "书名：样例\n作者：某人\n" + "".join(
+        f"第{i + 1}章 标题{i + 1}\n" + paragraph * 60 for i in range(chapters)
+    )
+    (settings.books_dir / "样例.txt").write_text(text, encoding="utf-8")
+    book_id = BookManager._file_to_id("样例.txt")
+
+    for i in range(chapters):
+        BookManager.save_chapter_analysis(book_id, ChapterAnalysis(
+            chapter_index=i, title=f"第{i + 1}章 标题{i + 1}", summary="主角在教室里遇到了同桌，" * 10,
+            characters=["张成", "赵秦", "夏诗"], events=["发生的事件描述" * 4] * 4, keywords=["校园", "青春"],
+        ))
+    appearances = [
+        CharacterAppearance(
+            chapter_index=i, chapter_title=f"第{i + 1}章", events=["参与的事件" * 6] * 3,
+            interactions=[CharacterInteraction(character="张成", description="互动描述" * 8)] * 2,
+            quote="人物的代表性台词" * 3,
+        )
+        for i in range(0, chapters, 3)
+    ]
+    BookManager.save_detailed_characters(book_id, [
+        DetailedCharacter(
+            name=f"人物{k:03d}", description="人物简介" * 30, appearances=appearances,
+            analysis_status="completed",
+        )
+        for k in range(characters)
+    ])
+    return book_id
+
+
+async def request(app: FastAPI, path: str, accept_encoding: str) -> tuple[int, dict, bytes]:
+    """直接以 ASGI 调用应用，返回 (状态码, 响应头, 响应体)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else [],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+def legacy_dump(data) -> bytes:
+    """旧实现：model_dump 生成 dict 后 json.dumps"""
+    if isinstance(data, list):
+        data = [item.model_dump() for item in data]
+    else:
+        data = data.model_dump()
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="对比大响应的序列化和压缩效果")
+    parser.add_argument("--book-id", help="使用已有书籍数据")
+    parser.add_argument("--chapters", type=int, default=1000, help="样例章节数")
+    parser.add_argument("--characters", type=int, default=30, help="样例人物数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    book_id = args.book_id or make_sample(args.chapters, args.characters)
+    app = build_app()
+
+    print("序列化（ms）")
+    analyses = BookManager.get_analyses(book_id)
+    characters = BookManager.get_detailed_characters(book_id)
+    for title, data, model in [
+        (f"章节分析 x{len(analyses)}", analyses, ChapterAnalysis),
+        (f"人物画像 x{len(characters)}", characters, DetailedCharacter),
+    ]:
+        legacy = timed(lambda: legacy_dump(data), args.repeat)
+        fast = timed(lambda: dump_models(data, model), args.repeat)
+        print(f"  {title:<20} model_dump+json.dumps {legacy:8.1f}   dump_models {fast:8.1f}")
+
+    encodings = ["", "gzip"] + (["br"] if compression.brotli is not None else [])
+    if compression.brotli is None:
+        print("\n未安装 brotli，跳过 br")
+
+    paths = [
+        ("章节正文", f"/api/books/{book_id}/chapters/0/content"),
+        ("章节列表", f"/api/books/{book_id}/chapters"),
+        ("章节分析列表", f"/api/analysis/{book_id}/chapters"),
+        ("人物画像列表", f"/api/analysis/{book_id}/characters/detailed"),
+    ]
+    print(f"\n端到端（压缩阈值 {settings.compression_min_size} 字节）")
+    print(f"  {'端点':<14}{'编码':<10}{'体积(KB)':>12}{'相对原始':>10}{'耗时(ms)':>12}")
+    for title, path in paths:
+        raw_size = None
+        for encoding in encodings:
+            status, headers, body = await request(app, path, encoding)
+            if status != 200:
+                print(f"  {title:<14}HTTP {status}")
+                break
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                await request(app, path, encoding)
+            ms = (time.perf_counter() - start) * 1000 / args.repeat
+            raw_size = raw_size or len(body)
+            label = headers.get("content-encoding", "identity")
+            print(f"  {title:<14}{label:<10}{len(body) / 1024:>12.1f}{len(body) / raw_size:>10.0%}{ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+分析数据存储格式对比脚本
+
+用一本书已保存的章节分析、人物画像和章节正文，对比各存储格式的体积和读取耗时：
+
+- legacy:  旧格式，indent=2 的 JSON
+- json:    紧凑 JSON（默认）
+- zstd:    zstd 压缩的紧凑 JSON（需要 zstandard）
+- msgpack: MessagePack（需要 msgpack）
+
+读取耗时包含解码和 pydantic 模型校验（章节正文只解码）。只在内存中编码/解码，不修改数据。
+书籍没有分析数据时用生成的样例数据代替。
+
+用法:
+    python scripts/bench_storage_format.py
+    python scripts/bench_storage_format.py --book-id a04f9ba66252 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# 后端代码目录（settings 中的数据路径相对于该目录）
+API_DIR = Path(__file__).resolve().parent.parent / "apps" / "api"
+sys.path.insert(0, str(API_DIR))
+os.chdir(API_DIR)
+
+from src.core import serialization  # noqa: E402
+from src.core.book import BookManager  # noqa: E402
+from src.knowledge.models import (  # noqa: E402
+    CharacterAppearance,
+    CharacterInteraction,
+    ChapterAnalysis,
+    DetailedCharacter,
+)
+
+
+# 默认书籍 ID（那些热血飞扬的日子）
+DEFAULT_BOOK_ID = "a04f9ba66252"
+
+FORMATS = ("legacy", *serialization.STORAGE_FORMATS)
+
+
+def sample_data(chapters: int = 500) -> tuple[list, list, list]:
+    """生成样例数据：章节分析、人物画像、章节正文"""
+    analyses = [
+        ChapterAnalysis(
+            chapter_index=i, title=f"第{i + 1}章", summary="主角在教室里遇到了同桌，" * 8,
+            characters=["张成", "赵秦", "夏诗"], events=["事件描述" * 5] * 4,
+            sentiment="平静", keywords=["校园", "青春", "友情"],
+        )
+        for i in range(chapters)
+    ]
+    appearances = [
+        CharacterAppearance(
+            chapter_index=i, chapter_title=f"第{i + 1}章", events=["参与的事件" * 6] * 3,
+            interactions=[CharacterInteraction(character="张成", description="互动描述" * 8)] * 3,
+            quote="人物的代表性台词" * 3, emotional_state="平静", chapter_significance="medium",
+        )
+        for i in range(0, chapters, 2)
+    ]
+    characters = [
+        DetailedCharacter(
+            name=f"人物{k}", description="人物简介" * 30, personality=["冷静", "聪明"],
+            appearances=appearances, analysis_status="completed",
+        )
+        for k in range(5)
+    ]
+    texts = [{"index": i, "title": f"第{i + 1}章", "content": "正文内容，" * 800} for i in range(chapters)]
+    return analyses, characters, texts
+
+
+def load_data(book_id: str) -> tuple[list, list, list] | None:
+    """读取书籍已保存的数据"""
+    book = BookManager.get_book(book_id)
+    analyses = BookManager.get_analyses(book_id)
+    characters = BookManager.get_detailed_characters(book_id)
+    if not book or not (analyses or characters):
+        return None
+    texts = [
+        {"index": c.index, "title": c.title, "content": book.content[c.start:c.end + 1]}
+        for c in book.chapters
+    ]
+    return analyses, characters, texts
+
+
+def encode(item, fmt: str) -> str | bytes:
+    if fmt == "legacy":
+        data = item.model_dump() if hasattr(item, "model_dump") else item
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    return serialization.encode(item, fmt)
+
+
+def size_of(encoded: str | bytes) -> int:
+    return len(encoded.encode("utf-8")) if isinstance(encoded, str) else len(encoded)
+
+
+def bench(items: list, model, fmt: str, repeat: int) -> tuple[int, float]:
+    """返回 (总字节数, 全部读取一次的平均毫秒数)"""
+    encoded = [encode(item, fmt) for item in items]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for raw in encoded:
+            data = serialization.decode(raw)
+            if model is not None:
+                model.model_validate(data)
+    elapsed = (time.perf_counter() - start) * 1000 / repeat
+    return sum(size_of(e) for e in encoded), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比分析数据存储格式的体积和读取耗时")
+    parser.add_argument("--book-id", default=DEFAULT_BOOK_ID, help="书籍 ID")
+    parser.add_argument("--repeat", type=int, default=3, help="读取重复次数")
+    args = parser.parse_args()
+
+    data = load_data(args.book_id)
+    if data is None:
+        print(f"书籍 {args.book_id} 没有分析数据，使用生成的样例数据")
+        data = sample_data()
+    analyses, characters, texts = data
+
+    available = [f for f in FORMATS if f == "legacy" or serialization.resolve_format(f) == f]
+    skipped = [f for f in FORMATS if f not in available]
+    if skipped:
+        print(f"跳过未安装依赖的格式: {', '.join(skipped)}")
+
+    groups = [
+        (f"章节分析 x{len(analyses)}", analyses, ChapterAnalysis),
+        (f"人物画像 x{len(characters)}", characters, DetailedCharacter),
+        (f"章节正文 x{len(texts)}", texts, None),
+    ]
+    for title, items, model in groups:
+        if not items:
+            continue
+        print(f"\n{title}")
+        print(f"  {'格式':<10}{'体积(KB)':>12}{'相对 legacy':>14}{'读取(ms)':>12}")
+        baseline = None
+        for fmt in available:
+            size, ms = bench(items, model, fmt, args.repeat)
+            baseline = baseline or size
+            print(f"  {fmt:<10}{size / 1024:>12.1f}{size / baseline:>13.0%}{ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -77,6 +77,7 @@ class APIClient:
         name: str,
         additional_chapters: int = 100,
         refresh_summary: bool = False,
+        full_rebuild: bool = False,
         timeout: int = 600
     ) -> Generator[SSEEvent, None, None]:
         """继续分析更多章节（SSE）
@@ -86,12 +87,14 @@ class APIClient:
             name: 人物名称
             additional_chapters: 要分析的章节数
             refresh_summary: 是否刷新总结字段
+            full_rebuild: 刷新总结时强制全量重建（默认增量刷新）
             timeout: 超时时间（秒）
         """
         encoded_name = urllib.parse.quote(name)
         url = f"{self.base_url}/api/analysis/{book_id}/characters/continue"
         url += f"?name={encoded_name}&additional_chapters={additional_chapters}"
         url += f"&refresh_summary={str(refresh_summary).lower()}"
+        url += f"&full_rebuild={str(full_rebuild).lower()}"
         yield from self._sse_request(url, timeout)
 
     # ===== 内部方法 =====
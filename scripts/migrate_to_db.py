@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+分析数据迁移脚本：JSON 文件 -> 每本书一个 SQLite 数据库
+
+将 analysis/{book_id}/chapters/{index}.json 和 characters/{name}/profile.json
+导入 analysis/{book_id}/analysis.db（后端首次访问时也会自动导入，本脚本用于批量迁移和清理）。
+
+用法:
+    python scripts/migrate_to_db.py [--dry-run] [--book-id BOOK_ID] [--replace] [--cleanup]
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# 后端代码目录（settings 中的数据路径相对于该目录）
+API_DIR = Path(__file__).resolve().parent.parent / "apps" / "api"
+sys.path.insert(0, str(API_DIR))
+os.chdir(API_DIR)
+
+from src.config import settings  # noqa: E402
+from src.core.analysis_store import DB_FILENAME, AnalysisStore  # noqa: E402
+
+
+def legacy_files(book_dir: Path) -> tuple[list[Path], list[Path]]:
+    """旧布局的章节分析文件和人物画像文件"""
+    chapters = sorted((book_dir / "chapters").glob("*.json"))
+    profiles = sorted((book_dir / "characters").glob("*/profile.json"))
+    return chapters, profiles
+
+
+def migrate_book(book_id: str, dry_run: bool, replace: bool, cleanup: bool) -> dict:
+    """迁移单本书，返回导入数量"""
+    book_dir = settings.analysis_dir / book_id
+    chapters, profiles = legacy_files(book_dir)
+    if not chapters and not profiles:
+        return {"status": "skip", "reason": "无旧格式数据"}
+
+    if dry_run:
+        db_state = "已存在" if (book_dir / DB_FILENAME).exists() else "将创建"
+        print(f"  [DRY-RUN] 数据库{db_state}: {len(chapters)} 个章节分析, {len(profiles)} 个人物画像")
+        return {"status": "success", "chapters": len(chapters), "characters": len(profiles)}
+
+    created = not (book_dir / DB_FILENAME).exists()
+    store = AnalysisStore.for_book(book_id)
+    # 新建数据库时已自动导入一次（此时库中没有其他数据，--replace 也无需再导入），报告那次导入的数量
+    counts = store.legacy_import if created else store.import_legacy(replace=replace)
+    print(f"  导入: {counts['chapters']} 个章节分析, {counts['characters']} 个人物画像")
+
+    if cleanup:
+        for path in [*chapters, *profiles]:
+            path.unlink()
+        chapters_dir = book_dir / "chapters"
+        if chapters_dir.exists() and not any(chapters_dir.iterdir()):
+            chapters_dir.rmdir()
+        print(f"  已删除旧文件: {len(chapters) + len(profiles)} 个")
+
+    return {"status": "success", **counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="迁移分析数据到 SQLite 数据库")
+    parser.add_argument("--dry-run", action="store_true", help="仅预览，不实际执行")
+    parser.add_argument("--book-id", help="指定书籍 ID，不指定则迁移所有")
+    parser.add_argument("--replace", action="store_true", help="用 JSON 文件覆盖数据库中已有的记录")
+    parser.add_argument("--cleanup", action="store_true", help="导入后删除旧格式文件（保留断点文件）")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Book Insight 分析数据迁移（JSON -> SQLite）")
+    print("=" * 60)
+
+    if args.dry_run:
+        print("[DRY-RUN 模式] 不会实际修改任何文件")
+
+    analysis_dir = settings.analysis_dir
+    if args.book_id:
+        book_ids = [args.book_id]
+    elif analysis_dir.exists():
+        book_ids = [d.name for d in analysis_dir.iterdir() if d.is_dir()]
+    else:
+        book_ids = []
+
+    if not book_ids:
+        print("未找到任何书籍数据")
+        return
+
+    total_chapters = total_characters = 0
+    for book_id in book_ids:
+        print(f"\n[{book_id}]")
+        result = migrate_book(book_id, args.dry_run, args.replace, args.cleanup)
+        if result["status"] == "skip":
+            print(f"  跳过: {result['reason']}")
+            continue
+        total_chapters += result["chapters"]
+        total_characters += result["characters"]
+
+    print()
+    print("=" * 60)
+    print(f"迁移完成: 共 {total_chapters} 个章节分析, {total_characters} 个人物画像")
+    if not args.cleanup and not args.dry_run:
+        print("提示: 使用 --cleanup 参数可删除旧格式文件")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()